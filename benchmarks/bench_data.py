@@ -0,0 +1,74 @@
+import os
+import tempfile
+
+import numpy as np
+
+from nn_sim.data.dataset_loader import ArrayDataset, DataLoader, DatasetNN
+
+from .common import benchmark, measure
+
+
+def write_dataset(file_path: str, n_samples: int, n_inputs: int, n_outputs: int):
+    """Synthetic .nnset file (see docs/02_datasets.md)."""
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(n_samples, n_inputs))
+    Y = rng.integers(0, 2, size=(n_samples, n_outputs))
+    with open(file_path, "w") as fp:
+        fp.write("Synthetic dataset\n")
+        fp.write(f"{n_inputs}\n")
+        fp.write(", ".join(f"x{idx}" for idx in range(n_inputs)) + "\n")
+        fp.write(f"{n_outputs}\n")
+        fp.write(", ".join(f"y{idx}" for idx in range(n_outputs)) + "\n")
+        for x, y in zip(X, Y):
+            fp.write(
+                ", ".join(f"{v:.6f}" for v in x)
+                + "; "
+                + ", ".join(str(v) for v in y)
+                + "\n"
+            )
+
+
+@benchmark("data.dataset_load")
+def bench_dataset_load(quick: bool) -> list[dict]:
+    sizes = [1_000, 10_000] if quick else [1_000, 10_000, 100_000]
+    cases = list()
+    with tempfile.TemporaryDirectory() as directory:
+        for n_samples in sizes:
+            file_path = os.path.join(directory, f"synthetic_{n_samples}.nnset")
+            write_dataset(file_path, n_samples, 8, 3)
+            cases.append(
+                measure(
+                    lambda: DatasetNN(file_path),
+                    repeat=3,
+                    n_samples=n_samples,
+                    file_bytes=os.path.getsize(file_path),
+                )
+            )
+    return cases
+
+
+@benchmark("data.data_loader")
+def bench_data_loader(quick: bool) -> list[dict]:
+    n_samples = 10_000 if quick else 100_000
+    rng = np.random.default_rng(0)
+    dataset = ArrayDataset(
+        rng.normal(size=(n_samples, 16)), rng.normal(size=(n_samples, 4))
+    )
+
+    def iterate(data_loader: DataLoader) -> None:
+        for _ in data_loader:
+            pass
+
+    cases = list()
+    for batch_size in [32, 256]:
+        for shuffle in [False, True]:
+            data_loader = DataLoader(dataset, batch_size, shuffle)
+            cases.append(
+                measure(
+                    lambda: iterate(data_loader),
+                    n_samples=n_samples,
+                    batch_size=batch_size,
+                    shuffle=shuffle,
+                )
+            )
+    return cases
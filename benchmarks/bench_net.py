@@ -0,0 +1,254 @@
+import contextlib
+import io
+import os
+import time
+
+import numpy as np
+
+from nn_sim.data.dataset_loader import ArrayDataset
+from nn_sim.net.callbacks import TrainCallback
+from nn_sim.net.feedfoward import FeedFowardNeuralNetwork
+from nn_sim.net.jit import JIT_AVAILABLE, fit_jit
+from nn_sim.net.layers import (
+    BinaryCrossEntropyLoss,
+    CategoricalCrossEntropyLoss,
+    MAELoss,
+    MSELoss,
+    ReLU,
+    SSELoss,
+    Sigmoid,
+    Softmax,
+)
+from nn_sim.net.metrics import confusion_matrix
+from nn_sim.net.parallel import fit_data_parallel
+from nn_sim.net.telemetry import TelemetryChannel, TelemetryPublisher
+from nn_sim.net.train import fit
+from nn_sim.net.optimizers import (
+    SGD,
+    SGDMomentum,
+    Nesterov,
+    RMSprop,
+    Adagrad,
+    Adam,
+    AdamW,
+    LBFGS,
+)
+
+from .common import benchmark, measure, summarize
+
+OPTIMIZERS = {
+    "SGD": lambda net: SGD(net, 0.01),
+    "SGD with Momentum": lambda net: SGDMomentum(net, 0.01, 0.9),
+    "SGD with Nesterov Momentum": lambda net: Nesterov(net, 0.01, 0.9),
+    "RMSprop": lambda net: RMSprop(net, 0.001),
+    "Adagrad": lambda net: Adagrad(net, 0.01),
+    "ADAM": lambda net: Adam(net, 0.001),
+    "AdamW": lambda net: AdamW(net, 0.001),
+    "L-BFGS": lambda net: LBFGS(net, 1.0),
+}
+
+
+def create_net(n_inputs: int, width: int, n_outputs: int) -> FeedFowardNeuralNetwork:
+    np.random.seed(0)
+    return FeedFowardNeuralNetwork(
+        n_inputs,
+        [(width, True, ReLU()), (width, True, ReLU()), (n_outputs, True, Softmax())],
+    )
+
+
+def create_batch(n_samples: int, n_inputs: int, n_outputs: int):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(n_samples, n_inputs))
+    Y = np.eye(n_outputs)[rng.integers(0, n_outputs, n_samples)]
+    return X, Y
+
+
+@benchmark("net.forward_backward")
+def bench_forward_backward(quick: bool) -> list[dict]:
+    widths = [8, 64, 256] if quick else [8, 32, 64, 128, 256, 512]
+    batch_size = 256
+    X, Y = create_batch(batch_size, 16, 4)
+    loss_func = CategoricalCrossEntropyLoss()
+
+    cases = list()
+    for width in widths:
+        net = create_net(16, width, 4)
+
+        def forward_backward() -> None:
+            net.zero_gradients()
+            y_pred = net(X)
+            net.backward(y_pred, Y, loss_func, compute_loss=True)
+
+        cases.append(
+            measure(lambda: net(X), width=width, batch_size=batch_size, stage="forward")
+        )
+        cases.append(
+            measure(
+                forward_backward,
+                width=width,
+                batch_size=batch_size,
+                stage="forward+backward",
+            )
+        )
+    return cases
+
+
+LOSSES = {
+    "SSE": SSELoss,
+    "MSE": MSELoss,
+    "MAE": MAELoss,
+    "BCE": BinaryCrossEntropyLoss,
+    "CCE": CategoricalCrossEntropyLoss,
+}
+
+
+@benchmark("net.loss")
+def bench_loss(quick: bool) -> list[dict]:
+    # loss value + derivative of a wide output layer: separate calls against
+    # the fused `loss_and_diff`, with and without the scalar loss
+    n_samples, n_outputs = (1024, 256) if quick else (4096, 1024)
+    rng = np.random.default_rng(0)
+    y_pred = rng.uniform(0.01, 0.99, size=(n_samples, n_outputs))
+    Y = np.eye(n_outputs)[rng.integers(0, n_outputs, n_samples)]
+
+    cases = list()
+    for name, loss_class in LOSSES.items():
+        loss_func = loss_class()
+        for method, func in (
+            ("separate", lambda: (loss_func(y_pred, Y), loss_func.diff(y_pred, Y))),
+            ("fused", lambda: loss_func.loss_and_diff(y_pred, Y)),
+            ("fused, no loss", lambda: loss_func.loss_and_diff(y_pred, Y, False)),
+        ):
+            cases.append(
+                measure(func, loss=name, method=method, shape=[n_samples, n_outputs])
+            )
+    return cases
+
+
+@benchmark("net.optimizer_step")
+def bench_optimizer_step(quick: bool) -> list[dict]:
+    widths = [64] if quick else [64, 512]
+    cases = list()
+    for width in widths:
+        for name, factory in OPTIMIZERS.items():
+            net = create_net(16, width, 4)
+            optimizer = factory(net)
+            for layer in net.layers:
+                layer.grad_weights[...] = 1e-3
+                layer.grad_bias[...] = 1e-3
+            cases.append(measure(optimizer.step, optimizer=name, width=width))
+    return cases
+
+
+@benchmark("net.confusion_matrix")
+def bench_confusion_matrix(quick: bool) -> list[dict]:
+    sizes = [10_000] if quick else [10_000, 100_000, 1_000_000]
+    cases = list()
+    for n_samples in sizes:
+        for n_classes in [2, 10]:
+            rng = np.random.default_rng(0)
+            y_true = np.eye(n_classes)[rng.integers(0, n_classes, n_samples)]
+            y_pred = rng.random((n_samples, n_classes))
+            cases.append(
+                measure(
+                    lambda: confusion_matrix(y_pred, y_true),
+                    n_samples=n_samples,
+                    n_classes=n_classes,
+                )
+            )
+    return cases
+
+
+class EpochTimer(TrainCallback):
+    """Duration of every epoch, between consecutive epoch ends."""
+
+    def __init__(self) -> None:
+        self.times: list[float] = []
+        self._last: float | None = None
+
+    def on_epoch_end(self, net, epoch: int, train_loss: float) -> bool:
+        now = time.perf_counter()
+        if self._last is not None:
+            self.times.append(now - self._last)
+        self._last = now
+        return False
+
+
+@benchmark("net.data_parallel")
+def bench_data_parallel(quick: bool) -> list[dict]:
+    # time per epoch of the data-parallel training by number of workers, the
+    # process start-up is excluded (the first epoch end starts the clock)
+    n_samples = 20_000 if quick else 100_000
+    epochs = 6 if quick else 11
+    width = 256
+    dataset = ArrayDataset(*create_batch(n_samples, 16, 4))
+    cpu_count = os.cpu_count() or 1
+    cases = list()
+    for n_workers in [1, 2, 4, 8]:
+        if n_workers > cpu_count:
+            break
+        net = create_net(16, width, 4)
+        timer = EpochTimer()
+        fit_data_parallel(
+            net,
+            dataset,
+            CategoricalCrossEntropyLoss(),
+            SGD(net, 0.01),
+            epochs,
+            4096,
+            [timer],
+            n_workers=n_workers,
+        )
+        cases.append(
+            summarize(
+                timer.times,
+                n_workers=n_workers,
+                n_samples=n_samples,
+                width=width,
+                batch_size=4096,
+            )
+        )
+    return cases
+
+
+def quiet(func, *args, **kwargs):
+    # the training loops print their progress and final loss
+    with contextlib.redirect_stdout(io.StringIO()):
+        with contextlib.redirect_stderr(io.StringIO()):
+            return func(*args, **kwargs)
+
+
+@benchmark("net.jit")
+def bench_jit(quick: bool) -> list[dict]:
+    # full-batch training of the 2-2-1 XOR preset: NumPy loop vs the compiled
+    # kernel (the NumPy loop again without Numba), with and without telemetry
+    epochs = 2_000 if quick else 20_000
+    dataset = ArrayDataset(
+        np.array([[0, 0], [0, 1], [1, 0], [1, 1]], dtype=np.float64),
+        np.array([[0], [1], [1], [0]], dtype=np.float64),
+    )
+
+    def train(fit_func, telemetry: bool) -> None:
+        np.random.seed(0)
+        net = FeedFowardNeuralNetwork(2, [(2, True, Sigmoid()), (1, True, Sigmoid())])
+        optimizer = SGD(net, 0.5)
+        callbacks = None
+        if telemetry:
+            callbacks = [TelemetryPublisher(TelemetryChannel(), optimizer)]
+        quiet(fit_func, net, dataset, SSELoss(), optimizer, epochs, None, callbacks)
+
+    train(fit_jit, False)  # compile (or load the cached kernel) first
+    backend = "jit" if JIT_AVAILABLE else "numpy (no numba)"
+    cases = list()
+    for loop, fit_func in [("numpy", fit), (backend, fit_jit)]:
+        for telemetry in (False, True):
+            cases.append(
+                measure(
+                    lambda: train(fit_func, telemetry),
+                    repeat=3,
+                    loop=loop,
+                    telemetry=telemetry,
+                    epochs=epochs,
+                )
+            )
+    return cases
@@ -0,0 +1,47 @@
+import os
+import subprocess
+import sys
+import time
+
+from .common import benchmark, summarize
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# run.py until its event loop would start: QApplication.exec processes the
+# pending events once and returns, so the main window is built and shown.
+STARTUP_SCRIPT = """
+import runpy
+from PySide6.QtWidgets import QApplication
+QApplication.exec = lambda self: (self.processEvents(), 0)[1]
+runpy.run_path("run.py", run_name="__main__")
+"""
+
+
+def run_process(code: str) -> float:
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    start_time = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        env=env,
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return time.perf_counter() - start_time
+
+
+def process_stats(code: str, repeat: int, **params) -> dict:
+    run_process(code)  # warm the file system cache and the .pyc files
+    times = [run_process(code) for _ in range(repeat)]
+    return summarize(times, **params)
+
+
+@benchmark("startup.run_py")
+def bench_startup(quick: bool) -> list[dict]:
+    repeat = 3 if quick else 5
+    return [
+        process_stats("pass", repeat, stage="interpreter"),
+        process_stats("import run", repeat, stage="imports"),
+        process_stats(STARTUP_SCRIPT, repeat, stage="main_window_shown"),
+    ]
@@ -0,0 +1,105 @@
+import os
+
+import numpy as np
+
+from .common import benchmark, measure
+
+# the widgets are rendered offscreen, no display is needed
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+def get_application():
+    from PySide6.QtWidgets import QApplication
+
+    return QApplication.instance() or QApplication([])
+
+
+def model_info(n_inputs: int, hidden: list[int], n_outputs: int) -> dict:
+    """model_info as emitted by the ModelArchitectureWidget."""
+    hidden_layers = dict()
+    for idx, n_neurons in enumerate(hidden):
+        hidden_layers[f"layer_n_neurons_{idx:04d}"] = n_neurons
+        hidden_layers[f"layer_bias_{idx:04d}"] = True
+        hidden_layers[f"layer_activation_function_{idx:04d}"] = "Sigmoid"
+    return dict(
+        arch_n_inputs=n_inputs,
+        arch_n_outputs=n_outputs,
+        arch_output_activation_function="Sigmoid",
+        arch_output_bias=True,
+        arch_n_hidden=len(hidden),
+        arch_loss_function="Sum of Squared Errors",
+        hidden_layers=hidden_layers,
+    )
+
+
+def layers_data(info: dict) -> list[np.ndarray]:
+    """Random weights with the bias in the last row, as MainWindow sends them."""
+    rng = np.random.default_rng(0)
+    sizes = [info["arch_n_inputs"]]
+    sizes += [
+        info["hidden_layers"][f"layer_n_neurons_{idx:04d}"]
+        for idx in range(info["arch_n_hidden"])
+    ]
+    sizes.append(info["arch_n_outputs"])
+    return [
+        rng.normal(size=(n_inputs + 1, n_outputs))
+        for n_inputs, n_outputs in zip(sizes[:-1], sizes[1:])
+    ]
+
+
+ARCHITECTURES = {
+    "xor": (2, [2], 1),
+    "iris": (4, [8], 3),
+    "wide": (16, [64, 64], 10),
+    "mnist": (784, [32], 10),
+}
+
+
+@benchmark("ui.graph_view")
+def bench_graph_view(quick: bool) -> list[dict]:
+    app = get_application()
+    from nn_sim.ui.windows.graph_view_widget import GraphViewWidget
+
+    graph_view = GraphViewWidget()
+    graph_view.resize(800, 600)
+    cases = list()
+    for name, (n_inputs, hidden, n_outputs) in ARCHITECTURES.items():
+        if quick and name == "mnist":
+            continue
+        info = model_info(n_inputs, hidden, n_outputs)
+        cases.append(
+            measure(
+                lambda: graph_view.update_graph(info),
+                repeat=3,
+                architecture=name,
+                method="update_graph",
+            )
+        )
+
+        data = layers_data(info)
+        cases.append(
+            measure(
+                lambda: graph_view.update_net_weights_and_bias(data, -1.0, 1.0),
+                repeat=3,
+                architecture=name,
+                method="update_net_weights_and_bias",
+            )
+        )
+
+        # frame time at full quality and while panning or zooming
+        graph_view.show()
+        graph_view.fitInView(graph_view.sceneRect())
+        for mode in ("full", "interactive"):
+            if mode == "interactive":
+                graph_view.begin_interaction()
+            cases.append(
+                measure(
+                    lambda: graph_view.viewport().grab(),
+                    repeat=3,
+                    architecture=name,
+                    method=f"repaint ({mode})",
+                )
+            )
+        graph_view.end_interaction()
+    app.processEvents()
+    return cases
@@ -0,0 +1,57 @@
+import statistics
+import timeit
+from typing import Callable
+
+# Registry of the benchmark suites: name -> function returning the timed
+# cases, each a dict with the case parameters and the timing statistics.
+BENCHMARKS: dict[str, Callable[[bool], list[dict]]] = {}
+
+
+def benchmark(name: str) -> Callable:
+    """Register a benchmark function `func(quick: bool) -> list[dict]`."""
+
+    def register(func: Callable[[bool], list[dict]]) -> Callable:
+        BENCHMARKS[name] = func
+        return func
+
+    return register
+
+
+def measure(
+    func: Callable[[], object],
+    *,
+    repeat: int = 5,
+    min_time: float = 0.2,
+    **params,
+) -> dict:
+    """Time `func` like `timeit`: calls per repeat chosen to last `min_time`.
+
+    Returns:
+        dict: the `params`, the number of calls per repeat and the min,
+        median, mean and stdev of the time per call in seconds.
+    """
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        if timer.timeit(number) >= min_time or number >= 1_000_000:
+            break
+        number *= 10
+    times = [time / number for time in timer.repeat(repeat, number)]
+    return summarize(times, number, **params)
+
+
+def summarize(times: list[float], number: int = 1, **params) -> dict:
+    """Case result from the times per call of every repeat."""
+    return dict(
+        params=params,
+        number=number,
+        min=min(times),
+        median=statistics.median(times),
+        mean=statistics.mean(times),
+        stdev=statistics.stdev(times) if len(times) > 1 else 0.0,
+    )
+
+
+def case_key(case: dict) -> str:
+    """Stable identifier of a case within its benchmark, used by --compare."""
+    return ",".join(f"{key}={value}" for key, value in sorted(case["params"].items()))
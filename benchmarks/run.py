@@ -0,0 +1,123 @@
+"""Run the benchmark suite and store the results as JSON.
+
+From the repository root:
+
+    python -m benchmarks.run                      # all benchmarks
+    python -m benchmarks.run --quick -k net.      # fewer sizes, only net.*
+    python -m benchmarks.run --compare benchmarks/results/OLD.json NEW.json
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+
+import numpy as np
+
+from . import bench_data, bench_net, bench_startup, bench_ui  # noqa: F401 (register)
+from .common import BENCHMARKS, case_key
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(RESULTS_DIR),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_benchmarks(names: list[str], quick: bool) -> dict:
+    results = dict(
+        commit=git_commit(),
+        date=datetime.datetime.now().isoformat(timespec="seconds"),
+        quick=quick,
+        python=platform.python_version(),
+        numpy=np.__version__,
+        platform=platform.platform(),
+        cpu_count=os.cpu_count(),
+        benchmarks=dict(),
+    )
+    for name in names:
+        print(f"{name} ...", flush=True)
+        cases = BENCHMARKS[name](quick)
+        results["benchmarks"][name] = cases
+        for case in cases:
+            print(f"    {case_key(case):60s} {1e3 * case['median']:12.4f} ms")
+    return results
+
+
+def compare(base_path: str, new_path: str, threshold: float) -> int:
+    """Print the median time ratios new / base, returns the number of regressions."""
+    with open(base_path) as fp:
+        base = json.load(fp)
+    with open(new_path) as fp:
+        new = json.load(fp)
+    print(
+        f"base {base['commit']} ({base['date']}) -> new {new['commit']} ({new['date']})"
+    )
+
+    n_regressions = 0
+    for name, cases in new["benchmarks"].items():
+        base_cases = {case_key(case): case for case in base["benchmarks"].get(name, [])}
+        print(name)
+        for case in cases:
+            key = case_key(case)
+            if key not in base_cases:
+                print(f"    {key:60s} {'new':>10s}")
+                continue
+            ratio = case["median"] / base_cases[key]["median"]
+            flag = ""
+            if ratio > 1 + threshold:
+                flag = "  REGRESSION"
+                n_regressions += 1
+            elif ratio < 1 - threshold:
+                flag = "  faster"
+            print(f"    {key:60s} {ratio:9.2f}x{flag}")
+    return n_regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-k", "--filter", default="", help="run names containing it")
+    parser.add_argument("--quick", action="store_true", help="fewer, smaller cases")
+    parser.add_argument("-o", "--output", help="JSON file (default results/<commit>)")
+    parser.add_argument("--list", action="store_true", help="list the benchmarks")
+    parser.add_argument(
+        "--compare", nargs=2, metavar=("BASE", "NEW"), help="compare two results"
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=0.1, help="relative change to report"
+    )
+    args = parser.parse_args()
+
+    if args.list:
+        print("\n".join(BENCHMARKS))
+        return 0
+    if args.compare:
+        return 1 if compare(*args.compare, args.threshold) else 0
+
+    names = [name for name in BENCHMARKS if args.filter in name]
+    results = run_benchmarks(names, args.quick)
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{results['commit']}.json")
+    with open(output, "w") as fp:
+        json.dump(results, fp, indent=2)
+    print(f"results saved to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,17 @@
-from .dataset_loader import Dataset, DatasetNN, DataLoader
+from .dataset_loader import (
+    Dataset,
+    DatasetNN,
+    DataLoader,
+    ArrayDataset,
+    LoadCancelled,
+    split_dataset,
+)
 
-__all__ = ["Dataset", "DatasetNN", "DataLoader"]
+__all__ = [
+    "Dataset",
+    "DatasetNN",
+    "DataLoader",
+    "ArrayDataset",
+    "LoadCancelled",
+    "split_dataset",
+]
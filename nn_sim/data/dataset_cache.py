@@ -0,0 +1,170 @@
+import hashlib
+import os
+from collections import OrderedDict
+from typing import Callable
+
+import numpy as np
+
+from .dataset_loader import DatasetNN, LoadCancelled
+
+# Parsed datasets keyed by the content hash of their file (and the dtypes):
+# reopening an unchanged file costs one hashing pass instead of the parsing.
+# The most recent datasets stay in memory, every parsed dataset is also saved
+# as a .npz file in `directory` for the next sessions. A changed file has a
+# new hash and is parsed again.
+
+DATASET_CACHE_DIR = os.path.join("cache", "datasets")
+HASH_CHUNK_BYTES = 1 << 20
+
+# progress(stage, bytes done, total bytes), stage "hash" or "parse"
+Progress = Callable[[str, int, int], None]
+
+
+def file_hash(
+    file_path: str,
+    progress: Progress | None = None,
+    cancelled: Callable[[], bool] | None = None,
+) -> str:
+    """SHA-1 of the content of a file, read in chunks."""
+    total = os.path.getsize(file_path)
+    digest = hashlib.sha1()
+    n_read = 0
+    with open(file_path, "rb") as fp:
+        while chunk := fp.read(HASH_CHUNK_BYTES):
+            if cancelled is not None and cancelled():
+                raise LoadCancelled(file_path)
+            digest.update(chunk)
+            n_read += len(chunk)
+            if progress is not None:
+                progress("hash", n_read, total)
+    return digest.hexdigest()
+
+
+class DatasetCache:
+    """In-memory and on-disk cache of the parsed .nnset files.
+
+    Args:
+        directory: folder of the .npz files, None keeps the cache in memory.
+        max_memory_entries: datasets kept in memory, least recently used
+            first out.
+    """
+
+    def __init__(
+        self,
+        directory: str | None = DATASET_CACHE_DIR,
+        max_memory_entries: int = 4,
+    ) -> None:
+        self.directory: str | None = directory
+        self.max_memory_entries: int = max(0, max_memory_entries)
+        self._memory: OrderedDict[str, DatasetNN] = OrderedDict()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def _remember(self, key: str, dataset: DatasetNN) -> None:
+        if self.max_memory_entries == 0:
+            return
+        self._memory[key] = dataset
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def clear(self) -> None:
+        self._memory.clear()
+
+    def load(
+        self,
+        file_path: str,
+        progress: Progress | None = None,
+        cancelled: Callable[[], bool] | None = None,
+        *,
+        dtype_inputs: np.dtype = np.float64,
+        dtype_outputs: np.dtype = np.float64,
+    ) -> DatasetNN:
+        """The dataset of a file, parsed only when its content is not cached.
+
+        Raises:
+            LoadCancelled: `cancelled` returned True.
+        """
+        digest = file_hash(file_path, progress, cancelled)
+        key = f"{digest}_{np.dtype(dtype_inputs).name}_{np.dtype(dtype_outputs).name}"
+
+        dataset = self._memory.get(key)
+        if dataset is not None:
+            self._memory.move_to_end(key)
+            return self._renamed(dataset, file_path)
+
+        if self.directory is not None and os.path.exists(self._path(key)):
+            try:
+                with np.load(self._path(key)) as data:
+                    dataset = DatasetNN.from_arrays(
+                        file_path,
+                        str(data["dataset_name"]),
+                        [str(name) for name in data["input_names"]],
+                        [str(name) for name in data["output_names"]],
+                        data["X"],
+                        data["Y"],
+                    )
+            except (OSError, KeyError, ValueError):
+                dataset = None  # unreadable cache file: parse again
+            if dataset is not None:
+                self._remember(key, dataset)
+                return dataset
+
+        def parse_progress(n_read: int, total: int) -> None:
+            progress("parse", n_read, total)
+
+        dataset = DatasetNN(
+            file_path,
+            dtype_inputs=dtype_inputs,
+            dtype_outputs=dtype_outputs,
+            progress=None if progress is None else parse_progress,
+            cancelled=cancelled,
+        )
+        self._remember(key, dataset)
+        if self.directory is not None:
+            self._save(key, dataset)
+        return dataset
+
+    @staticmethod
+    def _renamed(dataset: DatasetNN, file_path: str) -> DatasetNN:
+        # same content under another path: share the arrays
+        if dataset.file_path == file_path:
+            return dataset
+        return DatasetNN.from_arrays(
+            file_path,
+            dataset.dataset_name,
+            dataset.input_names,
+            dataset.output_names,
+            dataset.X,
+            dataset.Y,
+        )
+
+    def _save(self, key: str, dataset: DatasetNN) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        # written next to its final name, renamed when complete
+        tmp_path = self._path(key) + ".tmp"
+        with open(tmp_path, "wb") as fp:
+            np.savez(
+                fp,
+                dataset_name=np.array(dataset.dataset_name),
+                input_names=np.array(dataset.input_names),
+                output_names=np.array(dataset.output_names),
+                X=dataset.X,
+                Y=dataset.Y,
+            )
+        os.replace(tmp_path, self._path(key))
+
+
+if __name__ == "__main__":
+    # python -m nn_sim.data.dataset_cache FILE
+    import sys
+    import time
+
+    cache = DatasetCache()
+    for attempt in ("first load", "memory", "disk"):
+        if attempt == "disk":
+            cache.clear()
+        start = time.perf_counter()
+        dataset = cache.load(sys.argv[1])
+        print(f"{attempt:10s} {time.perf_counter() - start:8.4f} s {dataset}")
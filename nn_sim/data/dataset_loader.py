@@ -1,5 +1,15 @@
+import os
+from typing import Callable
+
 import numpy as np
 
+# bytes parsed between two calls of the progress callback of `DatasetNN`
+PROGRESS_BYTES = 1 << 20
+
+
+class LoadCancelled(Exception):
+    """The loading of a dataset was cancelled by its `cancelled` callback."""
+
 
 class Dataset:
 
@@ -32,7 +42,17 @@ class DatasetNN(Dataset):
         *,
         dtype_inputs: np.dtype = np.float64,
         dtype_outputs: np.dtype = np.float64,
+        progress: Callable[[int, int], None] | None = None,
+        cancelled: Callable[[], bool] | None = None,
     ) -> None:
+        """Parse a .nnset file.
+
+        Args:
+            progress: called with (bytes parsed, file size) every
+                PROGRESS_BYTES, e.g. from a loading thread.
+            cancelled: polled with the progress, returning True stops the
+                parsing with `LoadCancelled`.
+        """
         super().__init__()
 
         self.file_path: str = file_path
@@ -41,27 +61,62 @@ class DatasetNN(Dataset):
         self.output_names: list[str]
         self._X: np.ndarray
         self._Y: np.ndarray
-        self._load(dtype_inputs, dtype_outputs)
+        self._load(dtype_inputs, dtype_outputs, progress, cancelled)
+
+    @classmethod
+    def from_arrays(
+        cls,
+        file_path: str,
+        dataset_name: str,
+        input_names: list[str],
+        output_names: list[str],
+        X: np.ndarray,
+        Y: np.ndarray,
+    ) -> "DatasetNN":
+        """Dataset of a file already parsed (e.g. cached), without reading it."""
+        dataset = cls.__new__(cls)
+        Dataset.__init__(dataset)
+        dataset.file_path = file_path
+        dataset.dataset_name = dataset_name
+        dataset.input_names = list(input_names)
+        dataset.output_names = list(output_names)
+        dataset._X = X
+        dataset._Y = Y
+        return dataset
 
     def _load(
         self,
         dtype_inputs: np.dtype = np.float64,
         dtype_outputs: np.dtype = np.float64,
+        progress: Callable[[int, int], None] | None = None,
+        cancelled: Callable[[], bool] | None = None,
     ):
+        total = os.path.getsize(self.file_path)
+        next_report = PROGRESS_BYTES
 
-        with open(self.file_path, "r") as fp:
-            lines = fp.readlines()
+        with open(self.file_path, "rb") as fp:
+            header = [fp.readline() for _ in range(5)]
+            n_read = sum(len(line) for line in header)
+            header = [line.decode("utf8") for line in header]
 
-            self.dataset_name = lines[0].rstrip()
-            num_inputs = int(lines[1].rstrip())
-            self.input_names = [name for name in lines[1].rstrip().split(",")]
-            num_outputs = int(lines[3].rstrip())
-            self.output_names = [name for name in lines[4].rstrip().split(",")]
+            self.dataset_name = header[0].rstrip()
+            num_inputs = int(header[1].rstrip())
+            self.input_names = [name for name in header[1].rstrip().split(",")]
+            num_outputs = int(header[3].rstrip())
+            self.output_names = [name for name in header[4].rstrip().split(",")]
 
             inputs = []
             outputs = []
 
-            for row, line in enumerate(lines[5:]):
+            for row, line in enumerate(fp):
+                n_read += len(line)
+                if n_read >= next_report:
+                    next_report = n_read + PROGRESS_BYTES
+                    if cancelled is not None and cancelled():
+                        raise LoadCancelled(self.file_path)
+                    if progress is not None:
+                        progress(n_read, total)
+                line = line.decode("utf8")
                 x, y = [p.strip() for p in line.rstrip().split(";")]
 
                 x = [v.strip() for v in x.split(",")]
@@ -82,6 +137,8 @@ class DatasetNN(Dataset):
 
             self._X = np.array(inputs, dtype=dtype_inputs)
             self._Y = np.array(outputs, dtype=dtype_outputs)
+        if progress is not None:
+            progress(total, total)
 
     def __len__(self) -> int:
         return len(self._X)
@@ -95,6 +152,77 @@ class DatasetNN(Dataset):
         return f"DatasetNN ({self.dataset_name}: Input Shape({self.X.shape}); Output Shape{self.Y.shape})"
 
 
+class ArrayDataset(Dataset):
+
+    def __init__(self, X: np.ndarray, Y: np.ndarray, name: str = "") -> None:
+        super().__init__()
+        assert len(X) == len(Y), "X and Y must have the same number of samples."
+        self.dataset_name: str = name
+        self._X = X
+        self._Y = Y
+
+    def __len__(self) -> int:
+        return len(self._X)
+
+    def __getitem__(self, index: int) -> tuple[np.ndarray, np.ndarray]:
+        return self._X[index], self._Y[index]
+
+    def __str__(self) -> str:
+        return f"ArrayDataset ({self.dataset_name}: Input Shape({self.X.shape}); Output Shape{self.Y.shape})"
+
+
+def split_dataset(
+    dataset: Dataset,
+    val_size: float = 0.2,
+    *,
+    shuffle: bool = True,
+    random_state: int | None = None,
+) -> tuple[ArrayDataset, ArrayDataset]:
+    """
+    Split a dataset into training and validation sets.
+
+    Multi-output targets (k-hot encoding) are stratified by class, so every
+    class keeps roughly the same proportion in both splits.
+
+    Parameters:
+        dataset (Dataset): dataset to be split.
+        val_size (float): proportion of samples in the validation split.
+        shuffle (bool): shuffle samples before splitting.
+        random_state (int | None): seed used for shuffling.
+
+    Returns:
+        tuple[ArrayDataset, ArrayDataset]: training and validation datasets.
+    """
+    assert 0.0 <= val_size < 1.0, "val_size must be in the range [0, 1)."
+
+    X = dataset.X
+    Y = dataset.Y
+    indexes = np.arange(len(dataset), dtype=np.int64)
+    if shuffle:
+        np.random.default_rng(random_state).shuffle(indexes)
+
+    if Y.ndim == 2 and Y.shape[1] > 1:
+        labels = np.argmax(Y[indexes], axis=1)
+        val_indexes = []
+        for c in np.unique(labels):
+            class_indexes = indexes[labels == c]
+            n_val = int(round(len(class_indexes) * val_size))
+            val_indexes.append(class_indexes[:n_val])
+        val_indexes = np.concatenate(val_indexes)
+    else:
+        n_val = int(round(len(indexes) * val_size))
+        val_indexes = indexes[:n_val]
+
+    train_mask = np.ones(len(dataset), dtype=bool)
+    train_mask[val_indexes] = False
+    train_indexes = indexes[train_mask[indexes]]
+
+    name = getattr(dataset, "dataset_name", "")
+    train = ArrayDataset(X[train_indexes], Y[train_indexes], f"{name} (train)")
+    val = ArrayDataset(X[val_indexes], Y[val_indexes], f"{name} (validation)")
+    return train, val
+
+
 class DataLoader:
 
     def __init__(
@@ -107,30 +235,27 @@ class DataLoader:
         self.batch_size: int = batch_size
         self.shuffle: bool = shuffle
 
-        if batch_size <= 0:
+        if batch_size <= 0 or batch_size > len(self.dataset):
             self.batch_size = len(self.dataset)
 
-        self.num_splits: int = round(len(self.dataset) / self.batch_size)
-        self.indexes = np.arange(len(self.dataset), dtype=np.int64)
+        # the last batch can be smaller than batch_size
+        self.num_splits: int = -(-len(self.dataset) // self.batch_size)
 
     def __iter__(self):
-
-        indexes = self.indexes
-        if self.shuffle:
-            indexes = np.random.shuffle(indexes)
-
-        for batch_idx in range(0, len(self.dataset), self.batch_size):
-            X = []
-            Y = []
-
-            for sample_idx in range(
-                batch_idx, min(len(self.dataset), batch_idx + self.batch_size)
-            ):
-                x, y = self.dataset[sample_idx]
-                X.append(x)
-                Y.append(y)
-
-            yield np.array(X), np.array(Y)
+        X = self.dataset.X
+        Y = self.dataset.Y
+        n_samples = len(self.dataset)
+
+        if not self.shuffle:
+            for start in range(0, n_samples, self.batch_size):
+                stop = start + self.batch_size
+                yield X[start:stop], Y[start:stop]
+            return
+
+        indexes = np.random.permutation(n_samples)
+        for start in range(0, n_samples, self.batch_size):
+            batch = indexes[start : start + self.batch_size]
+            yield X[batch], Y[batch]
 
     def __len__(self) -> int:
         return self.num_splits
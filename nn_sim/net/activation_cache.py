@@ -0,0 +1,130 @@
+import numpy as np
+
+from .feedfoward import FeedFowardNeuralNetwork
+
+# Everything the sample view shows, for every sample of a dataset, from one
+# batched forward pass: the activations of each layer, the weight x input
+# contributions of the edges (bias as last row) and their min/max over the
+# layers of each sample. Stepping through the samples is then an indexing
+# operation. The cache holds a copy of the weights it was built with; it must
+# be rebuilt when the weights of the network change.
+
+
+class ActivationCache:
+    """Per-sample activations and edge contributions of a network.
+
+    Args:
+        net: network, its weights are copied.
+        X: inputs of all the samples.
+        batch_size: rows per forward pass.
+        max_contributions: the edge contributions of all the samples are
+            stored when they fit in this number of values, otherwise they are
+            computed per sample from the cached activations.
+    """
+
+    def __init__(
+        self,
+        net: FeedFowardNeuralNetwork,
+        X: np.ndarray,
+        batch_size: int = 4096,
+        max_contributions: int = 1 << 22,
+    ) -> None:
+        self.X: np.ndarray = X
+        self.params: list[tuple[np.ndarray, np.ndarray | None]] = [
+            (
+                layer.weights.copy(),
+                np.reshape(layer.bias, (1, -1)).copy() if layer.bias_active else None,
+            )
+            for layer in net.layers
+        ]
+
+        n_samples = len(X)
+        self.activations: list[np.ndarray] = [
+            np.empty((n_samples, weights.shape[1]), dtype=weights.dtype)
+            for weights, _ in self.params
+        ]
+        for start in range(0, n_samples, batch_size):
+            a = X[start : start + batch_size]
+            for layer, activations in zip(net.layers, self.activations):
+                a = layer.predict(a)
+                activations[start : start + batch_size] = a
+
+        # min/max of the contributions: a * W[i, :] is bounded by a * min(W[i, :])
+        # and a * max(W[i, :]), no need to compute every contribution
+        self.weight_ranges = np.empty((n_samples, 2))
+        self.weight_ranges[:, 0] = np.inf
+        self.weight_ranges[:, 1] = -np.inf
+        for inputs, (weights, bias) in zip(self.layer_inputs(), self.params):
+            low = inputs * weights.min(axis=1)
+            high = inputs * weights.max(axis=1)
+            self.weight_ranges[:, 0] = np.minimum(
+                self.weight_ranges[:, 0], np.minimum(low, high).min(axis=1)
+            )
+            self.weight_ranges[:, 1] = np.maximum(
+                self.weight_ranges[:, 1], np.maximum(low, high).max(axis=1)
+            )
+            if bias is not None:
+                np.minimum(
+                    self.weight_ranges[:, 0], bias.min(), self.weight_ranges[:, 0]
+                )
+                np.maximum(
+                    self.weight_ranges[:, 1], bias.max(), self.weight_ranges[:, 1]
+                )
+
+        self.contributions: list[np.ndarray] | None = None
+        n_values = sum(
+            n_samples * (weights.shape[0] + (bias is not None)) * weights.shape[1]
+            for weights, bias in self.params
+        )
+        if n_values <= max_contributions:
+            self.contributions = [
+                self._contributions(inputs, weights, bias)
+                for inputs, (weights, bias) in zip(self.layer_inputs(), self.params)
+            ]
+
+    def __len__(self) -> int:
+        return len(self.X)
+
+    def layer_inputs(self) -> list[np.ndarray]:
+        return [self.X] + self.activations[:-1]
+
+    @staticmethod
+    def _contributions(
+        inputs: np.ndarray, weights: np.ndarray, bias: np.ndarray | None
+    ) -> np.ndarray:
+        """(samples, inputs [+ bias], outputs) contributions of the edges."""
+        n_rows = weights.shape[0] + (bias is not None)
+        out = np.empty(
+            (len(inputs), n_rows, weights.shape[1]),
+            dtype=np.result_type(inputs, weights),
+        )
+        np.multiply(inputs[:, :, None], weights[None], out=out[:, : weights.shape[0]])
+        if bias is not None:
+            out[:, -1] = bias
+        return out
+
+    def sample(
+        self, index: int
+    ) -> tuple[list[np.ndarray], list[np.ndarray], float, float]:
+        """Data of the sample view of one sample.
+
+        Returns:
+            tuple: (neurons_data, layers_data, v_min, v_max), the input and
+            the activations of every layer, the contributions of every layer
+            (bias as last row) and their range.
+        """
+        neurons_data = [self.X[index]]
+        neurons_data += [
+            activations[index : index + 1] for activations in self.activations
+        ]
+
+        if self.contributions is not None:
+            layers_data = [contributions[index] for contributions in self.contributions]
+        else:
+            layers_data = [
+                self._contributions(inputs[index : index + 1], weights, bias)[0]
+                for inputs, (weights, bias) in zip(self.layer_inputs(), self.params)
+            ]
+
+        v_min, v_max = self.weight_ranges[index]
+        return neurons_data, layers_data, float(v_min), float(v_max)
@@ -1,46 +1,192 @@
 import numpy as np
 
+# Activation kernels write into `out` when it is given (it can be `x` itself)
+# and allocate a single output array otherwise.
+# Derivatives receive the activated output, except gelu_derivative which takes
+# the pre-activation input (see `Module.diff_uses_input`). Their `out` buffer
+# must not be the input array.
 
-def sigmoid(x: np.ndarray) -> np.ndarray:
-    x = np.clip(x, -500, 500)
-    return 1.0 / (1 + np.exp(-x))
 
+def _copy_into(x: np.ndarray, out: np.ndarray | None) -> np.ndarray:
+    if out is None:
+        return x.copy(order="C")
+    if out is not x:
+        np.copyto(out, x)
+    return out
+
+
+def sigmoid(x: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    out = np.negative(x, out=out)
+    np.clip(out, -500, 500, out=out)
+    np.exp(out, out=out)
+    out += 1
+    return np.reciprocal(out, out=out)
 
-def sigmoid_derivative(x: np.ndarray) -> np.ndarray:
-    return x * (1 - x)
 
+def sigmoid_derivative(x: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    out = np.subtract(1, x, out=out)
+    out *= x
+    return out
 
-def relu(x: np.ndarray) -> np.ndarray:
-    return np.maximum(0, x)
 
+def relu(x: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    return np.maximum(x, 0, out=out)
 
-def relu_derivative(x: np.ndarray) -> np.ndarray:
-    return np.where(x > 0, 1, 0)
 
+def relu_derivative(x: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    if out is None:
+        out = np.empty_like(x)
+    return np.greater(x, 0, out=out)
 
-def identity(x: np.ndarray) -> np.ndarray:
-    return x.copy(order="C")
 
+def leaky_relu(
+    x: np.ndarray, out: np.ndarray | None = None, alpha: float = 0.01
+) -> np.ndarray:
+    out = _copy_into(x, out)
+    np.multiply(out, alpha, out=out, where=out < 0)
+    return out
 
-def identity_derivative(x: np.ndarray) -> np.ndarray:
-    return np.ones_like(x)
 
+def leaky_relu_derivative(
+    x: np.ndarray, out: np.ndarray | None = None, alpha: float = 0.01
+) -> np.ndarray:
+    out = relu_derivative(x, out)
+    out *= 1 - alpha
+    out += alpha
+    return out
 
-def step(x: np.ndarray) -> np.ndarray:
-    return np.where(x >= 0, 1, 0)
 
+def elu(x: np.ndarray, out: np.ndarray | None = None, alpha: float = 1.0) -> np.ndarray:
+    out = _copy_into(x, out)
+    negative = out < 0
+    np.expm1(out, out=out, where=negative)
+    np.multiply(out, alpha, out=out, where=negative)
+    return out
 
-def step_derivative(x: np.ndarray) -> np.ndarray:
-    return np.zeros_like(x)
 
+def elu_derivative(
+    x: np.ndarray, out: np.ndarray | None = None, alpha: float = 1.0
+) -> np.ndarray:
+    # from the output: 1 for x > 0, otherwise elu(z) + alpha
+    positive = x > 0
+    out = np.add(x, alpha, out=out)
+    np.copyto(out, 1.0, where=positive)
+    return out
 
-def softmax(x: np.ndarray) -> np.ndarray:
-    e_x = np.exp(x - np.max(x))  # Subtract max for numerical stability
-    return e_x / e_x.sum(axis=0)
 
+GELU_C = np.sqrt(2.0 / np.pi)
+GELU_K = 0.044715
 
-def softmax_derivative(softmax_output):
-    """Compute the Jacobian matrix of softmax output for each output in the softmax."""
-    # Reshape the 1-d softmax to 2-d so that np.dot will do the matrix multiplication
-    s = softmax_output.reshape(-1, 1)
-    return np.diagflat(s) - np.dot(s, s.T)
+
+def gelu(x: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    # tanh approximation: 0.5 * x * (1 + tanh(c * (x + k * x^3)))
+    t = np.multiply(x, x)
+    t *= GELU_K
+    t += 1
+    t *= x
+    t *= GELU_C
+    np.tanh(t, out=t)
+    t += 1
+    t *= 0.5
+    return np.multiply(x, t, out=out)
+
+
+def gelu_derivative(x: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    # takes the pre-activation input x (gelu is not invertible)
+    x2 = np.multiply(x, x)
+    u = np.multiply(x2, GELU_K)
+    u += 1
+    u *= x
+    u *= GELU_C
+    np.tanh(u, out=u)  # tanh(c * (x + k * x^3))
+
+    # du/dx = c * (1 + 3 * k * x^2)
+    x2 *= 3 * GELU_K
+    x2 += 1
+    x2 *= GELU_C
+
+    # 0.5 * (1 + t) + 0.5 * x * (1 - t^2) * du/dx
+    out = np.multiply(u, u, out=out)
+    np.subtract(1, out, out=out)
+    out *= x2
+    out *= x
+    u += 1
+    out += u
+    out *= 0.5
+    return out
+
+
+def softplus(x: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    # log(1 + exp(x)) without overflow
+    return np.logaddexp(0, x, out=out)
+
+
+def softplus_derivative(x: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    # from the output: sigmoid(z) = 1 - exp(-softplus(z))
+    out = np.negative(x, out=out)
+    np.expm1(out, out=out)
+    return np.negative(out, out=out)
+
+
+def tanh(x: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    return np.tanh(x, out=out)
+
+
+def tanh_derivative(x: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    out = np.multiply(x, x, out=out)
+    return np.subtract(1, out, out=out)
+
+
+def identity(x: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    return _copy_into(x, out)
+
+
+def identity_derivative(x: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    if out is None:
+        return np.ones_like(x)
+    out.fill(1)
+    return out
+
+
+def step(x: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    if out is None:
+        out = np.empty_like(x)
+    return np.greater_equal(x, 0, out=out)
+
+
+def step_derivative(x: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    if out is None:
+        return np.zeros_like(x)
+    out.fill(0)
+    return out
+
+
+def softmax(x: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    # softmax over the classes (last axis) of each sample
+    out = np.subtract(x, np.max(x, axis=-1, keepdims=True), out=out)  # stability
+    np.exp(out, out=out)
+    out /= out.sum(axis=-1, keepdims=True)
+    return out
+
+
+def softmax_derivative(
+    softmax_output: np.ndarray, out: np.ndarray | None = None
+) -> np.ndarray:
+    """Diagonal of the softmax Jacobian (ds_i / dz_i) for each sample.
+
+    Backpropagation uses `softmax_backward`, which also accounts for the
+    off-diagonal terms without building the Jacobian.
+    """
+    return sigmoid_derivative(softmax_output, out)
+
+
+def softmax_backward(
+    delta: np.ndarray, softmax_output: np.ndarray, out: np.ndarray | None = None
+) -> np.ndarray:
+    """Jacobian-vector product of softmax for a batch: J^T @ delta per sample."""
+    s = softmax_output
+    out = np.multiply(delta, s, out=out)
+    total = out.sum(axis=-1, keepdims=True)
+    np.subtract(delta, total, out=out)
+    out *= s
+    return out
@@ -0,0 +1,183 @@
+from typing import Callable
+
+import numpy as np
+
+from ..data.dataset_loader import Dataset
+from .layers import Module
+from .feedfoward import FeedFowardNeuralNetwork
+from .metrics import ConfusionMatrix
+
+
+class TrainCallback:
+    """Base class for objects notified by the training loops in `train.py`."""
+
+    # False when on_epoch_end only reads the loss, or samples the network at
+    # its own lower rate (telemetry): the compiled loop (`jit.fit_jit`) can
+    # then run several epochs per call and report their losses afterwards
+    needs_epoch_state: bool = True
+
+    def on_train_begin(self, net: FeedFowardNeuralNetwork) -> None:
+        pass
+
+    def on_epoch_end(
+        self, net: FeedFowardNeuralNetwork, epoch: int, train_loss: float
+    ) -> bool:
+        """Called after the parameter update of each epoch.
+
+        Returns True to stop the training.
+        """
+        return False
+
+    def on_train_end(self, net: FeedFowardNeuralNetwork) -> None:
+        pass
+
+
+def train_begin(
+    callbacks: list[TrainCallback] | None, net: FeedFowardNeuralNetwork
+) -> None:
+    for callback in callbacks or ():
+        callback.on_train_begin(net)
+
+
+def epoch_end(
+    callbacks: list[TrainCallback] | None,
+    net: FeedFowardNeuralNetwork,
+    epoch: int,
+    train_loss: float,
+) -> bool:
+    stop = False
+    for callback in callbacks or ():
+        stop = callback.on_epoch_end(net, epoch, train_loss) or stop
+    return stop
+
+
+def train_end(
+    callbacks: list[TrainCallback] | None, net: FeedFowardNeuralNetwork
+) -> None:
+    for callback in callbacks or ():
+        callback.on_train_end(net)
+
+
+class Validation(TrainCallback):
+    """Evaluate a held-out dataset every `every` epochs with early stopping.
+
+    Training stops when the validation loss has not improved by more than
+    `min_delta` for `patience` epochs (0 disables early stopping). With early
+    stopping and `restore_best`, the weights of the best evaluation are
+    restored at the end of the training.
+
+    An optional `confusion` matrix is refreshed on every evaluation, its
+    counts are accumulated batch by batch.
+    """
+
+    def __init__(
+        self,
+        dataset: Dataset,
+        loss_func: Module,
+        *,
+        every: int = 1,
+        patience: int = 0,
+        min_delta: float = 0.0,
+        restore_best: bool = True,
+        batch_size: int = 4096,
+        on_validation: Callable[[list[int], list[float]], None] | None = None,
+        confusion: ConfusionMatrix | None = None,
+    ) -> None:
+        self.dataset = dataset
+        self.loss_func = loss_func
+        self.every: int = max(1, every)
+        self.patience: int = patience
+        self.min_delta: float = min_delta
+        self.restore_best: bool = restore_best
+        self.batch_size: int = batch_size
+        self.on_validation = on_validation
+        self.confusion = confusion
+
+        self.epochs: list[int] = []
+        self.losses: list[float] = []
+        self.best_loss: float = np.inf
+        self.best_epoch: int = -1
+        self.stopped_epoch: int | None = None
+        self._best_params: list[tuple[np.ndarray, np.ndarray]] | None = None
+
+    def evaluate(self, net: FeedFowardNeuralNetwork) -> float:
+        """Validation loss, predicted chunk by chunk.
+
+        Only one chunk of predictions is in memory at a time: the loss is
+        accumulated weighted by the chunk sizes (summed for SSE) and the
+        confusion matrix is updated per chunk.
+        """
+        X = self.dataset.X
+        Y = self.dataset.Y
+        n_samples = len(X)
+
+        if self.confusion is not None:
+            self.confusion.reset()
+        loss = 0.0
+        for start in range(0, n_samples, self.batch_size):
+            stop = start + self.batch_size
+            y_pred = net.predict(X[start:stop], self.batch_size)
+            if self.confusion is not None:
+                self.confusion.update(y_pred, Y[start:stop])
+            chunk_loss = float(self.loss_func(y_pred, Y[start:stop]))
+            if not self.loss_func.sum_reduction:
+                chunk_loss *= len(y_pred) / n_samples
+            loss += chunk_loss
+        return loss
+
+    def on_train_begin(self, net: FeedFowardNeuralNetwork) -> None:
+        self.epochs.clear()
+        self.losses.clear()
+        self.best_loss = np.inf
+        self.best_epoch = -1
+        self.stopped_epoch = None
+        self._best_params = None
+
+    def on_epoch_end(
+        self, net: FeedFowardNeuralNetwork, epoch: int, train_loss: float
+    ) -> bool:
+        if (epoch + 1) % self.every != 0:
+            return False
+
+        loss = self.evaluate(net)
+        self.epochs.append(epoch)
+        self.losses.append(loss)
+
+        if loss < self.best_loss - self.min_delta:
+            self.best_loss = loss
+            self.best_epoch = epoch
+            if self.restore_best and self.patience > 0:
+                self._best_params = [
+                    (layer.weights.copy(), layer.bias.copy()) for layer in net.layers
+                ]
+
+        if self.on_validation is not None:
+            self.on_validation(self.epochs, self.losses)
+
+        if self.patience > 0 and epoch - self.best_epoch >= self.patience:
+            self.stopped_epoch = epoch
+            return True
+        return False
+
+    def on_train_end(self, net: FeedFowardNeuralNetwork) -> None:
+        if self.stopped_epoch is not None:
+            print(
+                f"Early stopping at epoch {self.stopped_epoch}, "
+                f"best epoch {self.best_epoch}"
+            )
+        if self._best_params is not None:
+            for layer, (weights, bias) in zip(net.layers, self._best_params):
+                layer.weights = weights
+                layer.bias = bias
+            if self.confusion is not None:
+                self.evaluate(net)
+        if self.losses:
+            print("Validation Loss: ", self.losses[-1])
+        if self.confusion is not None and self.losses:
+            scores = self.confusion.compute()
+            print(
+                "Validation Accuracy: ",
+                scores["accuracy"],
+                "Macro F1: ",
+                scores["macro_f1_score"],
+            )
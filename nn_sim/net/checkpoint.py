@@ -0,0 +1,175 @@
+import json
+import os
+
+import numpy as np
+
+from .feedfoward import FeedFowardNeuralNetwork
+from .layers import get_activation_function_by_name, get_activation_function_name
+from .optimizers import Optimizer
+from .callbacks import TrainCallback
+
+# Checkpoints are uncompressed .npz files: one array per layer parameter and
+# optimizer state buffer, plus a JSON header (architecture, model_info,
+# train_params, epoch) stored as a uint8 array, so no pickle is involved.
+
+CHECKPOINT_VERSION = 1
+
+
+def _layer_key(idx: int, name: str) -> str:
+    return f"layer_{idx:04d}_{name}"
+
+
+def save_checkpoint(
+    file_path: str,
+    net: FeedFowardNeuralNetwork,
+    *,
+    model_info: dict | None = None,
+    train_params: dict | None = None,
+    optimizer: Optimizer | None = None,
+    epoch: int = 0,
+    train_losses: list[float] | None = None,
+) -> None:
+    arrays: dict[str, np.ndarray] = dict()
+    layers = list()
+    for idx, layer in enumerate(net.layers):
+        arrays[_layer_key(idx, "weights")] = layer.weights
+        arrays[_layer_key(idx, "bias")] = layer.bias
+        layers.append(
+            dict(
+                n_neurons=layer.weights.shape[1],
+                bias_active=layer.bias_active,
+                activation=get_activation_function_name(layer.activation),
+            )
+        )
+
+    header = dict(
+        version=CHECKPOINT_VERSION,
+        n_inputs=net.layers[0].weights.shape[0],
+        layers=layers,
+        model_info=model_info,
+        train_params=train_params,
+        epoch=epoch,
+        optimizer=None,
+    )
+
+    if optimizer is not None:
+        state_dict = optimizer.state_dict()
+        header["optimizer"] = dict(
+            name=state_dict["name"],
+            t=state_dict["t"],
+            hyper_parameters=state_dict["hyper_parameters"],
+        )
+        for idx, layer_state in enumerate(state_dict["state"]):
+            for key, array in layer_state.items():
+                arrays[_layer_key(idx, f"optim_{key}")] = array
+
+    if train_losses is not None:
+        arrays["train_losses"] = np.asarray(train_losses, dtype=np.float64)
+
+    arrays["header"] = np.frombuffer(json.dumps(header).encode("utf8"), np.uint8)
+
+    # write to a temporary file first, an interrupted save keeps the old file
+    tmp_path = file_path + ".tmp"
+    with open(tmp_path, "wb") as fp:
+        np.savez(fp, **arrays)
+    os.replace(tmp_path, file_path)
+
+
+def load_checkpoint(file_path: str) -> dict:
+    """Load a checkpoint saved by `save_checkpoint`.
+
+    Returns a dict with the rebuilt network ("net"), "model_info",
+    "train_params", "epoch", "train_losses" and "optimizer_state" (a
+    state dict for `Optimizer.load_state_dict`, or None).
+    """
+    with np.load(file_path, allow_pickle=False) as data:
+        header = json.loads(data["header"].tobytes().decode("utf8"))
+        assert header["version"] <= CHECKPOINT_VERSION, "Unsupported checkpoint."
+
+        net = FeedFowardNeuralNetwork(
+            header["n_inputs"],
+            [
+                (
+                    layer["n_neurons"],
+                    layer["bias_active"],
+                    get_activation_function_by_name(layer["activation"]),
+                )
+                for layer in header["layers"]
+            ],
+        )
+        for idx, layer in enumerate(net.layers):
+            layer.weights = data[_layer_key(idx, "weights")]
+            layer.bias = data[_layer_key(idx, "bias")]
+
+        optimizer_state = None
+        if header["optimizer"] is not None:
+            state = list()
+            for idx in range(len(net.layers)):
+                prefix = _layer_key(idx, "optim_")
+                state.append(
+                    {
+                        key[len(prefix) :]: data[key]
+                        for key in data.files
+                        if key.startswith(prefix)
+                    }
+                )
+            optimizer_state = dict(header["optimizer"], state=state)
+
+        train_losses = None
+        if "train_losses" in data.files:
+            train_losses = data["train_losses"].tolist()
+
+    return dict(
+        net=net,
+        model_info=header["model_info"],
+        train_params=header["train_params"],
+        epoch=header["epoch"],
+        train_losses=train_losses,
+        optimizer_state=optimizer_state,
+    )
+
+
+class Checkpointer(TrainCallback):
+    """Save a checkpoint every `every` epochs and at the end of the training."""
+
+    def __init__(
+        self,
+        file_path: str,
+        optimizer: Optimizer | None = None,
+        *,
+        every: int = 100,
+        model_info: dict | None = None,
+        train_params: dict | None = None,
+        start_epoch: int = 0,
+        train_losses: list[float] | None = None,
+    ) -> None:
+        self.file_path: str = file_path
+        self.optimizer = optimizer
+        self.every: int = max(1, every)
+        self.model_info = model_info
+        self.train_params = train_params
+        self.epoch: int = start_epoch
+        self.train_losses: list[float] = list(train_losses or [])
+
+    def save(self, net: FeedFowardNeuralNetwork) -> None:
+        save_checkpoint(
+            self.file_path,
+            net,
+            model_info=self.model_info,
+            train_params=self.train_params,
+            optimizer=self.optimizer,
+            epoch=self.epoch,
+            train_losses=self.train_losses,
+        )
+
+    def on_epoch_end(
+        self, net: FeedFowardNeuralNetwork, epoch: int, train_loss: float
+    ) -> bool:
+        self.epoch = epoch + 1  # number of completed epochs
+        self.train_losses.append(float(train_loss))
+        if self.epoch % self.every == 0:
+            self.save(net)
+        return False
+
+    def on_train_end(self, net: FeedFowardNeuralNetwork) -> None:
+        self.save(net)
@@ -23,18 +23,63 @@ class FeedFowardNeuralNetwork(Module):
             n_inputs = n_neurons
 
     def forward(self, x: np.ndarray) -> np.ndarray:
-        for layer in self.layers:
-            x = layer(x)
-        return x
+        # the hidden activations stay in reused buffers, the output is a new
+        # array: a later forward pass never overwrites a returned prediction
+        for layer in self.layers[:-1]:
+            x = layer.forward(x, reuse_output=True)
+        return self.layers[-1].forward(x)
+
+    def predict(self, x: np.ndarray, batch_size: int = 4096) -> np.ndarray:
+        """Inference path that does not touch the layer caches used by backward.
+
+        The samples are processed in chunks of `batch_size` rows to bound the
+        memory used by the intermediate activations.
+        """
+        if len(x) <= batch_size:
+            for layer in self.layers:
+                x = layer.predict(x)
+            return x
+
+        n_outputs = self.layers[-1].weights.shape[1]
+        y = np.empty(
+            (len(x), n_outputs), dtype=np.result_type(x, self.layers[-1].weights)
+        )
+        for start in range(0, len(x), batch_size):
+            a = x[start : start + batch_size]
+            for layer in self.layers:
+                a = layer.predict(a)
+            y[start : start + batch_size] = a
+        return y
 
     def backward(
-        self, y_pred: np.ndarray, y_true: np.ndarray, loss_func: Module
-    ) -> np.ndarray:
+        self,
+        y_pred: np.ndarray,
+        y_true: np.ndarray,
+        loss_func: Module,
+        compute_loss: bool = False,
+    ) -> float | None:
+        """Accumulate the gradients of the loss in the layers.
+
+        The loss value and its derivative are computed in one pass
+        (`Module.loss_and_diff`).
 
-        delta = loss_func.diff(y_pred, y_true)
+        Returns:
+            float | None: the loss value with `compute_loss`, else None.
+        """
+        layers = self.layers
+        fused_activation = getattr(loss_func, "fused_activation", None)
+        if fused_activation is not None and isinstance(
+            layers[-1].activation, fused_activation
+        ):
+            loss, delta = loss_func.fused_loss_and_diff(y_pred, y_true, compute_loss)
+            delta = layers[-1].backward(delta, fused=True)
+            layers = layers[:-1]
+        else:
+            loss, delta = loss_func.loss_and_diff(y_pred, y_true, compute_loss)
 
-        for layer in self.layers[::-1]:
+        for layer in layers[::-1]:
             delta = layer.backward(delta)
+        return loss
 
     def zero_gradients(self):
         for layer in self.layers:
@@ -0,0 +1,299 @@
+import numpy as np
+
+from .layers import (
+    ACTIVATION_FUNCTIONS,
+    Module,
+    Sigmoid,
+    Softmax,
+    Tanh,
+    SSELoss,
+    MSELoss,
+    MAELoss,
+    BinaryCrossEntropyLoss,
+    CategoricalCrossEntropyLoss,
+)
+from .feedfoward import FeedFowardNeuralNetwork
+from .population import Population
+
+# Central-difference check of `FeedFowardNeuralNetwork.backward`. Every
+# parameter is perturbed by +/- epsilon in its own copy of the network; the
+# copies of a batch of parameters are stacked into a `Population`, so one
+# batched forward pass evaluates all of them.
+#
+# `backward` does not return the gradient of the loss value itself: the
+# layers average over the N samples and each loss derivative has its own
+# convention (e.g. the BCE derivative has no 1/N, the MSE derivative has
+# 2/N instead of 2/(N*m)). GRADIENT_SCALES pins these conventions, a kernel
+# rewrite that changes one of them fails the check.
+
+GRADIENT_SCALES = {
+    # backward gradient / gradient of the loss value, for N samples, m outputs
+    SSELoss: lambda n, m: 1 / n,
+    MSELoss: lambda n, m: m / n,
+    MAELoss: lambda n, m: m / n,
+    BinaryCrossEntropyLoss: lambda n, m: m,
+    CategoricalCrossEntropyLoss: lambda n, m: 1.0,
+}
+
+LOSSES = [
+    SSELoss,
+    MSELoss,
+    MAELoss,
+    BinaryCrossEntropyLoss,
+    CategoricalCrossEntropyLoss,
+]
+
+# epsilon of the central differences and relative error tolerance per dtype
+SETTINGS = {
+    np.dtype(np.float64): (1e-6, 1e-6),
+    np.dtype(np.float32): (1e-3, 2e-2),
+}
+
+
+def cast_net(net: FeedFowardNeuralNetwork, dtype: np.dtype) -> None:
+    """Convert the parameters and gradient buffers of the network to dtype."""
+    for layer in net.layers:
+        layer.weights = layer.weights.astype(dtype)
+        layer.bias = layer.bias.astype(dtype)
+        layer.grad_weights = np.zeros_like(layer.weights)
+        layer.grad_bias = np.zeros_like(layer.bias)
+
+
+def analytical_gradients(
+    net: FeedFowardNeuralNetwork, X: np.ndarray, Y: np.ndarray, loss_func: Module
+) -> list[np.ndarray]:
+    """Gradients of `backward`: [weights_0, bias_0, weights_1, ...]."""
+    net.zero_gradients()
+    y_pred = net(X)
+    net.backward(y_pred, Y, loss_func)
+    gradients = list()
+    for layer in net.layers:
+        gradients.append(layer.grad_weights.copy())
+        gradients.append(layer.grad_bias.copy())
+    return gradients
+
+
+def numerical_gradients(
+    net: FeedFowardNeuralNetwork,
+    X: np.ndarray,
+    Y: np.ndarray,
+    loss_func: Module,
+    epsilon: float = 1e-6,
+    batch_size: int = 64,
+) -> list[np.ndarray]:
+    """Central differences of the loss value for every parameter.
+
+    Args:
+        batch_size: parameters perturbed per batched forward pass (the
+            population has 2 * batch_size members).
+
+    Returns:
+        list[np.ndarray]: [weights_0, bias_0, weights_1, ...] like
+        `analytical_gradients`.
+    """
+    population = Population([net])
+    # unperturbed layers broadcast over the members, no copy
+    for stacked, layer in zip(population.layers, net.layers):
+        stacked.weights = layer.weights[None]
+        stacked.bias = layer.bias[None, None]
+
+    gradients = list()
+    for stacked, layer in zip(population.layers, net.layers):
+        for name, expand in (("weights", (None,)), ("bias", (None, None))):
+            param = getattr(layer, name)
+            gradient = np.zeros(param.size)
+            for start in range(0, param.size, batch_size):
+                indexes = np.arange(start, min(param.size, start + batch_size))
+                k = len(indexes)
+
+                perturbed = np.repeat(param[expand], 2 * k, axis=0)
+                flat = perturbed.reshape(2 * k, -1)
+                flat[np.arange(k), indexes] += epsilon
+                flat[np.arange(k, 2 * k), indexes] -= epsilon
+                setattr(stacked, name, perturbed)
+                if name == "bias":
+                    # z += bias is in-place: z needs the members axis too
+                    stacked.weights = np.broadcast_to(
+                        layer.weights, (2 * k,) + layer.weights.shape
+                    )
+
+                y_pred = population.predict(X)
+                losses = np.array([loss_func(y, Y) for y in y_pred], dtype=np.float64)
+                gradient[indexes] = (losses[:k] - losses[k:]) / (2 * epsilon)
+
+            stacked.weights = layer.weights[None]
+            stacked.bias = layer.bias[None, None]
+            gradients.append(gradient.reshape(param.shape))
+    return gradients
+
+
+def relative_error(a: np.ndarray, b: np.ndarray) -> float:
+    """||a - b|| / (||a|| + ||b||), 0 when both are zero."""
+    norm = np.linalg.norm(a) + np.linalg.norm(b)
+    if norm < 1e-12:
+        return 0.0
+    return float(np.linalg.norm(a - b) / norm)
+
+
+def check_gradients(
+    net: FeedFowardNeuralNetwork,
+    X: np.ndarray,
+    Y: np.ndarray,
+    loss_func: Module,
+    epsilon: float | None = None,
+    tolerance: float | None = None,
+) -> dict:
+    """Compare `backward` with the central differences of the loss.
+
+    The biases of layers without bias are skipped (they are not trained).
+    Defaults of epsilon and tolerance depend on the dtype of the weights.
+
+    Returns:
+        dict: "relative_error" (all parameters), "max_abs_error", "passed",
+        "layers", the relative error of each checked parameter array, and
+        "zero_gradients", the arrays whose analytical and numerical
+        gradients are both zero (e.g. before a Step activation): their
+        check passes vacuously.
+    """
+    default_epsilon, default_tolerance = SETTINGS[net.layers[0].weights.dtype]
+    epsilon = default_epsilon if epsilon is None else epsilon
+    tolerance = default_tolerance if tolerance is None else tolerance
+
+    scale = GRADIENT_SCALES[type(loss_func)](len(X), Y.shape[1])
+    analytical = analytical_gradients(net, X, Y, loss_func)
+    numerical = numerical_gradients(net, X, Y, loss_func, epsilon)
+
+    names = list()
+    checked_a = list()
+    checked_n = list()
+    for idx, layer in enumerate(net.layers):
+        for offset, name in enumerate(("weights", "bias")):
+            if name == "bias" and not layer.bias_active:
+                continue
+            names.append(f"{name}_{idx}")
+            checked_a.append(np.ravel(analytical[2 * idx + offset]))
+            checked_n.append(np.ravel(numerical[2 * idx + offset]) * scale)
+
+    a = np.concatenate(checked_a).astype(np.float64)
+    n = np.concatenate(checked_n)
+    error = relative_error(a, n)
+    return dict(
+        relative_error=error,
+        max_abs_error=float(np.max(np.abs(a - n))),
+        passed=error <= tolerance,
+        layers={
+            name: relative_error(a_i, n_i)
+            for name, a_i, n_i in zip(names, checked_a, checked_n)
+        },
+        zero_gradients=[
+            name
+            for name, a_i, n_i in zip(names, checked_a, checked_n)
+            if np.linalg.norm(a_i) + np.linalg.norm(n_i) < 1e-12
+        ],
+    )
+
+
+def output_activation_for(loss_class: type, activation_class: type) -> type:
+    """The activation itself when the loss accepts its outputs, else a default."""
+    if loss_class is BinaryCrossEntropyLoss:
+        return activation_class if activation_class in (Sigmoid, Softmax) else Sigmoid
+    if loss_class is CategoricalCrossEntropyLoss:
+        return activation_class if activation_class in (Sigmoid, Softmax) else Softmax
+    return activation_class
+
+
+def create_problem(
+    activation_name: str,
+    loss_class: type,
+    dtype: np.dtype = np.float64,
+    n_samples: int = 8,
+    n_inputs: int = 3,
+    n_outputs: int = 3,
+    seed: int = 0,
+):
+    """Network with the activation in a hidden layer (and output layer when
+    the loss allows it), plus matching random data.
+
+    Returns:
+        tuple: (net, X, Y, loss_func)
+    """
+    activation_class = ACTIVATION_FUNCTIONS[activation_name]
+    hidden_class = activation_class
+    if getattr(activation_class, "output_only", False):
+        hidden_class = Tanh
+    output_class = output_activation_for(loss_class, activation_class)
+
+    np.random.seed(seed)
+    net = FeedFowardNeuralNetwork(
+        n_inputs,
+        [
+            (5, True, hidden_class()),
+            (4, False, Tanh()),  # layer without bias
+            (n_outputs, True, output_class()),
+        ],
+    )
+    cast_net(net, dtype)
+
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_samples, n_inputs))
+    if loss_class is CategoricalCrossEntropyLoss:
+        Y = np.eye(n_outputs)[rng.integers(0, n_outputs, n_samples)]
+    elif loss_class is BinaryCrossEntropyLoss:
+        Y = rng.integers(0, 2, size=(n_samples, n_outputs)).astype(np.float64)
+    else:
+        Y = rng.normal(size=(n_samples, n_outputs))
+    return net, X.astype(dtype), Y.astype(dtype), loss_class()
+
+
+def run_gradient_checks(
+    dtypes: tuple = (np.float64, np.float32), verbose: bool = True
+) -> list[dict]:
+    """Check every registered activation with every loss, for each dtype.
+
+    The float32 checks also verify that the forward pass keeps float32.
+    """
+    results = list()
+    for dtype in dtypes:
+        for activation_name in ACTIVATION_FUNCTIONS:
+            for loss_class in LOSSES:
+                net, X, Y, loss_func = create_problem(
+                    activation_name, loss_class, dtype
+                )
+                result = check_gradients(net, X, Y, loss_func)
+                result.update(
+                    dtype=np.dtype(dtype).name,
+                    activation=activation_name,
+                    output_activation=type(net.layers[-1].activation).__name__,
+                    loss=loss_class.__name__,
+                )
+                if net(X).dtype != dtype:
+                    result["passed"] = False
+                    result["dtype_error"] = f"forward returns {net(X).dtype}"
+                results.append(result)
+
+                if verbose:
+                    status = "ok" if result["passed"] else "FAIL"
+                    if result["passed"] and result["zero_gradients"]:
+                        status = (
+                            "ok (zero: " + ", ".join(result["zero_gradients"]) + ")"
+                        )
+                    print(
+                        f"{result['dtype']:8s} {activation_name:11s} "
+                        f"-> {result['output_activation']:18s} "
+                        f"{result['loss']:28s} {result['relative_error']:10.2e} "
+                        f"{status} {result.get('dtype_error', '')}"
+                    )
+    return results
+
+
+if __name__ == "__main__":
+    # python -m nn_sim.net.gradient_check
+    import sys
+
+    results = run_gradient_checks()
+    failed = [result for result in results if not result["passed"]]
+    print(f"{len(results) - len(failed)} / {len(results)} gradient checks passed")
+    vacuous = [result for result in results if result["zero_gradients"]]
+    if vacuous:
+        print(f"{len(vacuous)} with zero gradients, vacuous for those arrays")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,576 @@
+import math
+import time
+
+import numpy as np
+from tqdm import tqdm
+
+from ..data.dataset_loader import DatasetNN
+from . import layers as nn
+from .feedfoward import FeedFowardNeuralNetwork
+from .callbacks import TrainCallback, train_begin, epoch_end, train_end
+from .optimizers import Optimizer, SGD, SGDMomentum, Adam
+from .train import fit
+
+# Optional Numba backend for full-batch training of small networks. For the
+# 2-input presets an epoch is a few microseconds of math but tens of
+# microseconds of Python dispatch (modules, layers, loss, optimizer). Here the
+# forward, backward and update of whole epochs run in one compiled call, with
+# plain loops over flat float64 buffers. Without Numba (or for a network,
+# loss or optimizer the kernel does not know) `fit_jit` is `train.fit`.
+
+try:
+    from numba import njit
+
+    JIT_AVAILABLE = True
+except ImportError:
+    JIT_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        # the kernels stay plain Python functions, `fit_jit` does not call them
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+# kernel codes of the supported modules (exact classes, no subclasses)
+_ACTIVATIONS = {
+    nn.IdentityActivation: 0,
+    nn.Sigmoid: 1,
+    nn.ReLU: 2,
+    nn.Tanh: 3,
+    nn.LeakyReLU: 4,
+    nn.ELU: 5,
+    nn.GELU: 6,
+    nn.Softplus: 7,
+    nn.Step: 8,
+    nn.Softmax: 9,
+}
+_SOFTMAX = 9
+_LOSSES = {
+    nn.SSELoss: 0,
+    nn.MSELoss: 1,
+    nn.MAELoss: 2,
+    nn.BinaryCrossEntropyLoss: 3,
+    nn.CategoricalCrossEntropyLoss: 4,
+}
+_CCE = 4
+_OPTIMIZERS = {SGD: 0, SGDMomentum: 1, Adam: 2}
+
+_GELU_C = math.sqrt(2.0 / math.pi)
+_GELU_K = 0.044715
+
+
+def _activation_alpha(activation: nn.Module) -> float:
+    # LeakyReLU and ELU keep alpha in their partial functions
+    keywords = getattr(activation.forward_func, "keywords", None) or {}
+    return float(keywords.get("alpha", 0.0))
+
+
+@njit(cache=True)
+def _activate(code, z, a, alpha):
+    n, m = z.shape
+    if code == _SOFTMAX:
+        for i in range(n):
+            z_max = z[i, 0]
+            for j in range(1, m):
+                z_max = max(z_max, z[i, j])
+            total = 0.0
+            for j in range(m):
+                a[i, j] = math.exp(z[i, j] - z_max)
+                total += a[i, j]
+            for j in range(m):
+                a[i, j] /= total
+        return
+    for i in range(n):
+        for j in range(m):
+            x = z[i, j]
+            if code == 0:
+                y = x
+            elif code == 1:
+                y = 1.0 / (1.0 + math.exp(min(max(-x, -500.0), 500.0)))
+            elif code == 2:
+                y = max(x, 0.0)
+            elif code == 3:
+                y = math.tanh(x)
+            elif code == 4:
+                y = x * alpha if x < 0 else x
+            elif code == 5:
+                y = alpha * math.expm1(x) if x < 0 else x
+            elif code == 6:
+                t = math.tanh(_GELU_C * x * (1.0 + _GELU_K * x * x))
+                y = 0.5 * x * (1.0 + t)
+            elif code == 7:
+                y = max(x, 0.0) + math.log1p(math.exp(-abs(x)))
+            else:
+                y = 1.0 if x >= 0 else 0.0
+            a[i, j] = y
+
+
+@njit(cache=True)
+def _chain(code, delta, z, a, alpha):
+    # delta (in-place) w.r.t. the pre-activation, from the output `a`
+    n, m = delta.shape
+    if code == _SOFTMAX:
+        for i in range(n):
+            total = 0.0
+            for j in range(m):
+                total += delta[i, j] * a[i, j]
+            for j in range(m):
+                delta[i, j] = (delta[i, j] - total) * a[i, j]
+        return
+    for i in range(n):
+        for j in range(m):
+            y = a[i, j]
+            if code == 0:
+                d = 1.0
+            elif code == 1:
+                d = (1.0 - y) * y
+            elif code == 2:
+                d = 1.0 if y > 0 else 0.0
+            elif code == 3:
+                d = 1.0 - y * y
+            elif code == 4:
+                d = 1.0 if y > 0 else alpha
+            elif code == 5:
+                d = 1.0 if y > 0 else y + alpha
+            elif code == 6:
+                x = z[i, j]
+                t = math.tanh(_GELU_C * x * (1.0 + _GELU_K * x * x))
+                du = _GELU_C * (1.0 + 3.0 * _GELU_K * x * x)
+                d = 0.5 * (1.0 + t) + 0.5 * x * (1.0 - t * t) * du
+            elif code == 7:
+                d = -math.expm1(-y)
+            else:
+                d = 0.0
+            delta[i, j] *= d
+
+
+@njit(cache=True)
+def _loss_and_diff(code, fused, y_pred, y_true, delta):
+    # loss value, and its derivative written to delta (see loss_functions.py)
+    n, m = y_pred.shape
+    loss = 0.0
+    for i in range(n):
+        for j in range(m):
+            p = y_pred[i, j]
+            y = y_true[i, j]
+            diff = p - y
+            if code == 0:
+                loss += 0.5 * diff * diff
+                delta[i, j] = diff
+            elif code == 1:
+                loss += diff * diff
+                delta[i, j] = (2.0 / n) * diff
+            elif code == 2:
+                loss += abs(diff)
+                delta[i, j] = (1.0 / n) * (
+                    1.0 if diff > 0 else -1.0 if diff < 0 else 0.0
+                )
+            elif code == 3:
+                p = min(max(p, 1e-15), 1 - 1e-15)
+                loss += y * math.log(p) + (1 - y) * math.log(1 - p)
+                delta[i, j] = -(y / p) + (1 - y) / (1 - p)
+            else:
+                if fused:
+                    delta[i, j] = diff
+                p = min(max(p, 1e-12), 1.0 - 1e-12)
+                loss += y * math.log(p)
+                if not fused:
+                    delta[i, j] = -y / p
+    if code == 0:
+        return loss
+    if code == 1 or code == 2:
+        return loss / (n * m)
+    if code == 3:
+        return -loss / (n * m)
+    return -loss / n
+
+
+@njit(cache=True)
+def _train_epochs(
+    X,
+    Y,
+    params,
+    grads,
+    state1,
+    state2,
+    layout,
+    alphas,
+    z_buffer,
+    a_buffer,
+    delta_buffer,
+    loss_code,
+    optim_code,
+    hyper,
+    learning_rates,
+    t,
+):
+    """Full-batch epochs: one update per epoch with learning_rates[epoch].
+
+    layout holds one row per layer: n_inputs, n_outputs, weights offset,
+    bias offset, activation code, bias active. Returns the epoch losses.
+    """
+    n = X.shape[0]
+    n_layers = layout.shape[0]
+    n_epochs = learning_rates.shape[0]
+    last = n_layers - 1
+    fused = loss_code == _CCE and layout[last, 4] == _SOFTMAX
+    losses = np.empty(n_epochs)
+
+    for epoch in range(n_epochs):
+        grads[:] = 0.0
+
+        # forward, the activations of every layer are kept for backward
+        a_offset = 0
+        for idx in range(n_layers):
+            n_in, n_out = layout[idx, 0], layout[idx, 1]
+            w_off, b_off, code = layout[idx, 2], layout[idx, 3], layout[idx, 4]
+            w = params[w_off : w_off + n_in * n_out].reshape((n_in, n_out))
+            b = params[b_off : b_off + n_out]
+            if idx == 0:
+                x = X
+            else:
+                x = a_buffer[a_offset - n * n_in : a_offset].reshape((n, n_in))
+            z = z_buffer[a_offset : a_offset + n * n_out].reshape((n, n_out))
+            a = a_buffer[a_offset : a_offset + n * n_out].reshape((n, n_out))
+            for i in range(n):
+                for j in range(n_out):
+                    z[i, j] = b[j]
+                for k in range(n_in):
+                    x_ik = x[i, k]
+                    for j in range(n_out):
+                        z[i, j] += x_ik * w[k, j]
+            _activate(code, z, a, alphas[idx])
+            a_offset += n * n_out
+
+        # loss and its derivative w.r.t. the output
+        n_out = layout[last, 1]
+        a_offset -= n * n_out
+        y_pred = a_buffer[a_offset : a_offset + n * n_out].reshape((n, n_out))
+        delta_start = 0
+        delta = delta_buffer[: n * n_out].reshape((n, n_out))
+        losses[epoch] = _loss_and_diff(loss_code, fused, y_pred, Y, delta)
+
+        # backward
+        for idx in range(last, -1, -1):
+            n_in, n_out = layout[idx, 0], layout[idx, 1]
+            w_off, b_off, code = layout[idx, 2], layout[idx, 3], layout[idx, 4]
+            w = params[w_off : w_off + n_in * n_out].reshape((n_in, n_out))
+            z = z_buffer[a_offset : a_offset + n * n_out].reshape((n, n_out))
+            a = a_buffer[a_offset : a_offset + n * n_out].reshape((n, n_out))
+            if not (fused and idx == last):
+                _chain(code, delta, z, a, alphas[idx])
+            if idx == 0:
+                x = X
+            else:
+                x = a_buffer[a_offset - n * n_in : a_offset].reshape((n, n_in))
+
+            grad_w = grads[w_off : w_off + n_in * n_out].reshape((n_in, n_out))
+            for i in range(n):
+                for k in range(n_in):
+                    x_ik = x[i, k] / n
+                    for j in range(n_out):
+                        grad_w[k, j] += x_ik * delta[i, j]
+            if layout[idx, 5]:
+                for i in range(n):
+                    for j in range(n_out):
+                        grads[b_off + j] += delta[i, j] / n
+
+            if idx > 0:
+                # delta of the previous layer, in the other half of the buffer
+                delta_start = delta_buffer.shape[0] // 2 - delta_start
+                delta_out = delta_buffer[delta_start : delta_start + n * n_in].reshape(
+                    (n, n_in)
+                )
+                for i in range(n):
+                    for k in range(n_in):
+                        total = 0.0
+                        for j in range(n_out):
+                            total += delta[i, j] * w[k, j]
+                        delta_out[i, k] = total
+                delta = delta_out
+                a_offset -= n * n_in
+
+        # parameters update
+        learning_rate = learning_rates[epoch]
+        t += 1
+        if optim_code == 0:
+            for p in range(params.shape[0]):
+                params[p] -= learning_rate * grads[p]
+        elif optim_code == 1:
+            momentum = hyper[0]
+            for p in range(params.shape[0]):
+                state1[p] = momentum * state1[p] + learning_rate * grads[p]
+                params[p] -= state1[p]
+        else:
+            beta1, beta2, epsilon = hyper[0], hyper[1], hyper[2]
+            m_scale = 1 / (1 - beta1**t)
+            v_scale = 1 / (1 - beta2**t)
+            for p in range(params.shape[0]):
+                g = grads[p]
+                state1[p] = beta1 * state1[p] + (1 - beta1) * g
+                state2[p] = beta2 * state2[p] + (1 - beta2) * (g * g)
+                v_hat = math.sqrt(state2[p] * v_scale) + epsilon
+                params[p] -= (learning_rate * m_scale) * state1[p] / v_hat
+
+    return losses
+
+
+def _flatten(arrays: list[np.ndarray]) -> tuple[np.ndarray, list[np.ndarray]]:
+    # one float64 buffer holding all the arrays, and views of it in their shapes
+    flat = np.concatenate([np.ravel(array) for array in arrays]).astype(np.float64)
+    views = list()
+    offset = 0
+    for array in arrays:
+        views.append(flat[offset : offset + array.size].reshape(array.shape))
+        offset += array.size
+    return flat, views
+
+
+class JitTrainer:
+    """Compiled full-batch training of one network.
+
+    The parameters, gradients and optimizer state of the network are moved
+    into flat buffers, and the layers and the optimizer keep views of them:
+    the network, `Optimizer.state_dict` and the callbacks see every update
+    without any copy.
+    """
+
+    def __init__(
+        self,
+        net: FeedFowardNeuralNetwork,
+        loss_func: nn.Module,
+        optimizer: Optimizer,
+    ) -> None:
+        self.net = net
+        self.optimizer = optimizer
+        self.loss_code: int = _LOSSES[type(loss_func)]
+        self.optim_code: int = _OPTIMIZERS[type(optimizer)]
+        self.hyper = np.array(
+            [
+                getattr(optimizer, "momentum", getattr(optimizer, "beta1", 0.0)),
+                getattr(optimizer, "beta2", 0.0),
+                getattr(optimizer, "epsilon", 0.0),
+            ]
+        )
+
+        params = [
+            param for layer in net.layers for param in (layer.weights, layer.bias)
+        ]
+        self.params, views = _flatten(params)
+        self.grads, grad_views = _flatten(params)
+        for idx, layer in enumerate(net.layers):
+            layer.weights, layer.bias = views[2 * idx], views[2 * idx + 1]
+            layer.grad_weights = grad_views[2 * idx]
+            layer.grad_bias = grad_views[2 * idx + 1]
+
+        # first and second state arrays (velocity, or Adam moments) per parameter
+        self.states = [np.zeros(0), np.zeros(0)]
+        for idx, name in enumerate(optimizer.state_names):
+            keys = [
+                (layer_state, f"{name}_{suffix}")
+                for layer_state in optimizer.state
+                for suffix in ("weights", "bias")
+            ]
+            self.states[idx], views = _flatten([state[key] for state, key in keys])
+            for (state, key), view in zip(keys, views):
+                state[key] = view
+
+        layout = list()
+        offset = 0
+        for layer in net.layers:
+            n_inputs, n_outputs = layer.weights.shape
+            layout.append(
+                (
+                    n_inputs,
+                    n_outputs,
+                    offset,
+                    offset + n_inputs * n_outputs,
+                    _ACTIVATIONS[type(layer.activation)],
+                    int(layer.bias_active),
+                )
+            )
+            offset += (n_inputs + 1) * n_outputs
+        self.layout = np.array(layout, dtype=np.int64)
+        self.alphas = np.array(
+            [_activation_alpha(layer.activation) for layer in net.layers]
+        )
+        self._buffers: dict[int, tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+
+    @staticmethod
+    def supports(
+        net: FeedFowardNeuralNetwork, loss_func: nn.Module, optimizer: Optimizer
+    ) -> bool:
+        return (
+            JIT_AVAILABLE
+            and type(net) is FeedFowardNeuralNetwork
+            and type(loss_func) in _LOSSES
+            and type(optimizer) in _OPTIMIZERS
+            and all(type(layer.activation) in _ACTIVATIONS for layer in net.layers)
+        )
+
+    def _get_buffers(self, n: int):
+        buffers = self._buffers.get(n)
+        if buffers is None:
+            n_activations = n * int(self.layout[:, 1].sum())
+            max_width = int(self.layout[:, :2].max())
+            buffers = (
+                np.empty(n_activations),
+                np.empty(n_activations),
+                np.empty(2 * n * max_width),
+            )
+            self._buffers[n] = buffers
+        return buffers
+
+    def run(self, X: np.ndarray, Y: np.ndarray, n_epochs: int) -> np.ndarray:
+        """Train for `n_epochs` full-batch epochs, returns their losses."""
+        optimizer = self.optimizer
+        if optimizer.scheduler is not None:
+            learning_rates = np.array(
+                [optimizer.scheduler(optimizer.t + step) for step in range(n_epochs)]
+            )
+        else:
+            learning_rates = np.full(n_epochs, optimizer.learning_rate)
+
+        losses = _train_epochs(
+            X,
+            Y,
+            self.params,
+            self.grads,
+            self.states[0],
+            self.states[1],
+            self.layout,
+            self.alphas,
+            *self._get_buffers(len(X)),
+            self.loss_code,
+            self.optim_code,
+            self.hyper,
+            learning_rates,
+            optimizer.t,
+        )
+        optimizer.t += n_epochs
+        optimizer.learning_rate = float(learning_rates[-1])
+        return losses
+
+
+def fit_jit(
+    net: FeedFowardNeuralNetwork,
+    dataset: DatasetNN,
+    loss_func: nn.Module,
+    optimizer: Optimizer,
+    epochs: int,
+    batch_size: int | None = None,
+    callbacks: list[TrainCallback] | None = None,
+    start_epoch: int = 0,
+    accumulate_steps: int = 1,
+    chunk_epochs: int = 1000,
+    loss_every: int = 1,
+    chunk_seconds: float = 1 / 30,
+) -> list[float]:
+    """`train.fit` with the compiled kernel when it applies.
+
+    Full-batch training of a supported network runs up to `chunk_epochs`
+    epochs per kernel call. With callbacks that only read the losses
+    (`TrainCallback.needs_epoch_state` False, e.g. the telemetry and the run
+    recorder) a call lasts about `chunk_seconds` and the callbacks get the
+    losses of its epochs afterwards, with the network of the last one. Other
+    callbacks (validation, checkpoints) run after every epoch. Mini batches,
+    unsupported modules or a missing Numba use `train.fit`. The kernel
+    computes the loss of every epoch (`loss_every` only applies to
+    `train.fit`).
+    """
+    if batch_size is not None or not JitTrainer.supports(net, loss_func, optimizer):
+        return fit(
+            net,
+            dataset,
+            loss_func,
+            optimizer,
+            epochs,
+            batch_size,
+            callbacks,
+            start_epoch,
+            accumulate_steps,
+            loss_every=loss_every,
+        )
+
+    trainer = JitTrainer(net, loss_func, optimizer)
+    X = np.ascontiguousarray(dataset.X, dtype=np.float64)
+    Y = np.ascontiguousarray(dataset.Y, dtype=np.float64)
+    if any(callback.needs_epoch_state for callback in callbacks or ()):
+        chunk_epochs = 1
+    # with callbacks the chunks grow from one epoch to about chunk_seconds,
+    # so the displays and the stop requests stay responsive
+    n_epochs = 1 if callbacks else chunk_epochs
+
+    train_losses = list()
+    train_begin(callbacks, net)
+    with tqdm(total=max(0, epochs - start_epoch)) as progress:
+        epoch = start_epoch
+        stop = False
+        while epoch < epochs and not stop:
+            n_epochs = max(1, min(n_epochs, chunk_epochs, epochs - epoch))
+            start_time = time.perf_counter()
+            losses = trainer.run(X, Y, n_epochs).tolist()
+            elapsed = time.perf_counter() - start_time
+            train_losses.extend(losses)
+            if callbacks:
+                for idx, loss in enumerate(losses):
+                    if epoch_end(callbacks, net, epoch + idx, loss):
+                        stop = True
+                        break
+                if elapsed < chunk_seconds / 2:
+                    n_epochs = min(2 * n_epochs, chunk_epochs)
+                elif elapsed > 2 * chunk_seconds:
+                    n_epochs //= 2
+            epoch += len(losses)
+            progress.update(len(losses))
+
+    train_end(callbacks, net)
+    if train_losses:
+        print("Train Loss: ", train_losses[-1])
+    return train_losses
+
+
+if __name__ == "__main__":
+    # NumPy vs compiled training loop on a 2-input preset:
+    # python -m nn_sim.net.jit [dataset] [epochs] [hidden_neurons]
+    import sys
+    import time
+
+    file_path = sys.argv[1] if len(sys.argv) > 1 else "./datasets/xor.nnset"
+    epochs = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+    n_hidden = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+
+    if not JIT_AVAILABLE:
+        print("Numba is not installed, fit_jit falls back to the NumPy loop.")
+
+    dataset = DatasetNN(file_path)
+    n_inputs = dataset.X.shape[1]
+    n_outputs = dataset.Y.shape[1]
+
+    def create_net() -> FeedFowardNeuralNetwork:
+        np.random.seed(0)
+        return FeedFowardNeuralNetwork(
+            n_inputs,
+            [(n_hidden, True, nn.Sigmoid()), (n_outputs, True, nn.Sigmoid())],
+        )
+
+    # compile (or load the cached kernel) outside of the timings
+    net = create_net()
+    start_time = time.perf_counter()
+    fit_jit(net, dataset, nn.SSELoss(), SGD(net, 0.5), 1)
+    print(f"compile: {time.perf_counter() - start_time:.3f} s")
+
+    results = dict()
+    for name, fit_func in [("numpy", fit), ("jit", fit_jit)]:
+        net = create_net()
+        start_time = time.perf_counter()
+        losses = fit_func(net, dataset, nn.SSELoss(), SGD(net, 0.5), epochs)
+        results[name] = (time.perf_counter() - start_time, losses[-1])
+
+    for name, (elapsed, loss) in results.items():
+        speed_up = results["numpy"][0] / elapsed
+        print(
+            f"{name:6s} {elapsed:8.3f} s {1e6 * elapsed / epochs:8.2f} us/epoch "
+            f"x{speed_up:6.1f} | final loss {loss:.6f}"
+        )
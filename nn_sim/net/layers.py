@@ -1,3 +1,6 @@
+from functools import partial
+from typing import Callable
+
 import numpy as np
 
 from . import activation_functions
@@ -9,6 +12,17 @@ from . import loss_functions
 
 class Module:
 
+    # the derivative is computed from the pre-activation input, not the output
+    diff_uses_input: bool = False
+    # activation only valid for the output layer
+    output_only: bool = False
+    # loss summed over the samples instead of averaged
+    sum_reduction: bool = False
+    # loss derivative divided by the number of samples
+    diff_mean_reduction: bool = False
+    # loss value and derivative in one pass: (y_pred, y_true, compute_loss)
+    loss_and_diff_func: Callable | None = None
+
     def __init__(self, forward_func, diff_func) -> None:
         self.forward_func = forward_func
         self.diff_func = diff_func
@@ -22,6 +36,42 @@ class Module:
     def diff(self, *args) -> np.ndarray:
         return self.diff_func(*args)
 
+    def loss_and_diff(
+        self, y_pred: np.ndarray, y_true: np.ndarray, compute_loss: bool = True
+    ) -> tuple[float | None, np.ndarray]:
+        """Loss value (None without compute_loss) and derivative of a loss.
+
+        The losses with a `loss_and_diff_func` share their temporaries
+        between the value and the derivative.
+        """
+        if self.loss_and_diff_func is not None:
+            return self.loss_and_diff_func(y_pred, y_true, compute_loss)
+        loss = self(y_pred, y_true) if compute_loss else None
+        return loss, self.diff(y_pred, y_true)
+
+    def fused_loss_and_diff(
+        self, y_pred: np.ndarray, y_true: np.ndarray, compute_loss: bool = True
+    ) -> tuple[float | None, np.ndarray]:
+        """`loss_and_diff` with the derivative of `fused_diff`."""
+        loss = self(y_pred, y_true) if compute_loss else None
+        return loss, self.fused_diff(y_pred, y_true)
+
+    def gradient_scale(self, n_samples: int, n_outputs: int) -> float:
+        """Gradient accumulated by `backward` / gradient of the loss value.
+
+        The layers average over the samples and every loss derivative has
+        its own convention, pinned by gradient_check.GRADIENT_SCALES.
+        """
+        return 1.0
+
+    def chain(
+        self, delta: np.ndarray, output: np.ndarray, out: np.ndarray | None = None
+    ) -> np.ndarray:
+        # backpropagate delta through an element-wise function given its output
+        out = self.diff(output, out)
+        out *= delta
+        return out
+
 
 # Activation Functions
 
@@ -52,6 +102,53 @@ class IdentityActivation(Module):
         )
 
 
+class Tanh(Module):
+
+    def __init__(self) -> None:
+        super().__init__(
+            activation_functions.tanh,
+            activation_functions.tanh_derivative,
+        )
+
+
+class LeakyReLU(Module):
+
+    def __init__(self, alpha: float = 0.01) -> None:
+        super().__init__(
+            partial(activation_functions.leaky_relu, alpha=alpha),
+            partial(activation_functions.leaky_relu_derivative, alpha=alpha),
+        )
+
+
+class ELU(Module):
+
+    def __init__(self, alpha: float = 1.0) -> None:
+        super().__init__(
+            partial(activation_functions.elu, alpha=alpha),
+            partial(activation_functions.elu_derivative, alpha=alpha),
+        )
+
+
+class GELU(Module):
+
+    diff_uses_input = True
+
+    def __init__(self) -> None:
+        super().__init__(
+            activation_functions.gelu,
+            activation_functions.gelu_derivative,
+        )
+
+
+class Softplus(Module):
+
+    def __init__(self) -> None:
+        super().__init__(
+            activation_functions.softplus,
+            activation_functions.softplus_derivative,
+        )
+
+
 class Step(Module):
 
     def __init__(self) -> None:
@@ -63,41 +160,108 @@ class Step(Module):
 
 class Softmax(Module):
 
+    output_only = True
+
     def __init__(self) -> None:
         super().__init__(
             activation_functions.softmax,
             activation_functions.softmax_derivative,
         )
 
+    def chain(
+        self, delta: np.ndarray, output: np.ndarray, out: np.ndarray | None = None
+    ) -> np.ndarray:
+        return activation_functions.softmax_backward(delta, output, out)
+
+
+# Activation Registry
+
+ACTIVATION_FUNCTIONS: dict[str, Callable[[], Module]] = {
+    "Identity": IdentityActivation,
+    "ReLU": ReLU,
+    "Leaky ReLU": LeakyReLU,
+    "ELU": ELU,
+    "GELU": GELU,
+    "Sigmoid": Sigmoid,
+    "Tanh": Tanh,
+    "Softplus": Softplus,
+    "Step": Step,
+    "Softmax": Softmax,
+}
+
+
+def register_activation_function(name: str, factory: Callable[[], Module]) -> None:
+    ACTIVATION_FUNCTIONS[name] = factory
+
+
+def get_activation_function_by_name(name: str) -> Module:
+    if name not in ACTIVATION_FUNCTIONS:
+        raise AttributeError(f"{name} is not a valid activation function.")
+    return ACTIVATION_FUNCTIONS[name]()
+
+
+def get_activation_function_name(activation: Module) -> str:
+    for name, factory in ACTIVATION_FUNCTIONS.items():
+        if type(activation) is factory:
+            return name
+    raise AttributeError(f"{activation} is not a registered activation function.")
+
+
+def get_activation_function_names(output_layer: bool = False) -> list[str]:
+    """Names of the registered activations, in registration order."""
+    return [
+        name
+        for name, factory in ACTIVATION_FUNCTIONS.items()
+        if output_layer or not getattr(factory, "output_only", False)
+    ]
+
 
 # Loss Function
 
 
 class SSELoss(Module):
 
+    sum_reduction = True
+
     def __init__(self) -> None:
         super().__init__(
             loss_functions.sum_of_squared_errors,
             loss_functions.sum_of_squared_errors_derivative,
         )
+        self.loss_and_diff_func = loss_functions.sum_of_squared_errors_and_derivative
+
+    def gradient_scale(self, n_samples: int, n_outputs: int) -> float:
+        return 1 / n_samples
 
 
 class MSELoss(Module):
 
+    diff_mean_reduction = True
+
     def __init__(self) -> None:
         super().__init__(
             loss_functions.mean_squared_error,
             loss_functions.mean_squared_error_derivative,
         )
+        self.loss_and_diff_func = loss_functions.mean_squared_error_and_derivative
+
+    def gradient_scale(self, n_samples: int, n_outputs: int) -> float:
+        return n_outputs / n_samples
 
 
 class MAELoss(Module):
 
+    diff_mean_reduction = True
+
     def __init__(self) -> None:
         super().__init__(
             loss_functions.mean_absolute_error,
             loss_functions.mean_absolute_error_derivative,
         )
+        self.loss_and_diff_func = loss_functions.mean_absolute_error_and_derivative
+
+    def gradient_scale(self, n_samples: int, n_outputs: int) -> float:
+        return n_outputs / n_samples
 
 
 class BinaryCrossEntropyLoss(Module):
@@ -107,15 +271,95 @@ class BinaryCrossEntropyLoss(Module):
             loss_functions.binary_cross_entropy_loss,
             loss_functions.binary_cross_entropy_loss_derivative,
         )
+        self.loss_and_diff_func = (
+            loss_functions.binary_cross_entropy_loss_and_derivative
+        )
+
+    def gradient_scale(self, n_samples: int, n_outputs: int) -> float:
+        return n_outputs
 
 
 class CategoricalCrossEntropyLoss(Module):
 
+    # with a softmax output layer the gradient w.r.t. the logits is computed
+    # directly (fused_diff), skipping the softmax backward step
+    fused_activation = Softmax
+
     def __init__(self) -> None:
         super().__init__(
             loss_functions.categorical_cross_entropy,
             loss_functions.categorical_cross_entropy_derivative,
         )
+        self.loss_and_diff_func = (
+            loss_functions.categorical_cross_entropy_and_derivative
+        )
+
+    def fused_diff(self, y_pred: np.ndarray, y_true: np.ndarray) -> np.ndarray:
+        return loss_functions.softmax_cross_entropy_derivative(y_pred, y_true)
+
+    def fused_loss_and_diff(
+        self, y_pred: np.ndarray, y_true: np.ndarray, compute_loss: bool = True
+    ) -> tuple[float | None, np.ndarray]:
+        return loss_functions.softmax_cross_entropy_and_derivative(
+            y_pred, y_true, compute_loss
+        )
+
+
+class PartialBatchLoss(Module):
+    """Loss of a part of a batch, scaled to its share of the whole batch.
+
+    The layers average the gradients over the samples they see, so the
+    gradients of the parts (accumulated batches, data-parallel shards) add
+    up to the gradient of one batch with all their samples.
+    """
+
+    def __init__(self, loss_func: Module) -> None:
+        self.loss_func = loss_func
+        self.fused_activation = getattr(loss_func, "fused_activation", None)
+        self.grad_scale: float = 1.0
+
+    def set_part(self, n_part: int, n_total: int) -> None:
+        self.grad_scale = n_part / n_total
+        if self.loss_func.diff_mean_reduction:
+            self.grad_scale *= n_part / n_total
+
+    def loss_share(self, n_part: int, n_total: int) -> float:
+        # scale of the loss value of the part in the loss of the whole batch
+        if self.loss_func.sum_reduction:
+            return 1.0
+        return n_part / n_total
+
+    def forward(self, y_pred: np.ndarray, y_true: np.ndarray) -> float:
+        return self.loss_func(y_pred, y_true)
+
+    def diff(self, y_pred: np.ndarray, y_true: np.ndarray) -> np.ndarray:
+        delta = self.loss_func.diff(y_pred, y_true)
+        if self.grad_scale != 1.0:
+            delta = delta * self.grad_scale
+        return delta
+
+    def fused_diff(self, y_pred: np.ndarray, y_true: np.ndarray) -> np.ndarray:
+        delta = self.loss_func.fused_diff(y_pred, y_true)
+        if self.grad_scale != 1.0:
+            delta = delta * self.grad_scale
+        return delta
+
+    def loss_and_diff(
+        self, y_pred: np.ndarray, y_true: np.ndarray, compute_loss: bool = True
+    ) -> tuple[float | None, np.ndarray]:
+        # the loss value is not scaled, see `loss_share`
+        loss, delta = self.loss_func.loss_and_diff(y_pred, y_true, compute_loss)
+        if self.grad_scale != 1.0:
+            delta *= self.grad_scale  # the derivatives are new arrays
+        return loss, delta
+
+    def fused_loss_and_diff(
+        self, y_pred: np.ndarray, y_true: np.ndarray, compute_loss: bool = True
+    ) -> tuple[float | None, np.ndarray]:
+        loss, delta = self.loss_func.fused_loss_and_diff(y_pred, y_true, compute_loss)
+        if self.grad_scale != 1.0:
+            delta *= self.grad_scale
+        return loss, delta
 
 
 # Linear Layer
@@ -143,23 +387,63 @@ class HiddenLayer(Module):
         self.grad_weights = np.zeros_like(self.weights)
         self.grad_bias = np.zeros_like(self.bias)
 
-    def forward(self, x: np.ndarray) -> np.ndarray:
-        self.A_IN = x.copy()  # store inputs for computing gradients
-
-        x = self.activation(x @ self.weights + self.bias)
-
-        self.A_OUT = x.copy()  # store outputs for computing delta
-        return x
-
-    def backward(self, delta_in: np.ndarray) -> np.ndarray:
+        # per batch size buffers reused by forward/backward: (Z, A_OUT, delta)
+        self._buffers: dict[tuple, tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+
+    def _get_buffers(self, n: int, dtype: np.dtype):
+        key = (n, dtype)
+        buffers = self._buffers.get(key)
+        if buffers is None:
+            shape = (n, self.weights.shape[1])
+            buffers = (
+                np.empty(shape, dtype=dtype),
+                np.empty(shape, dtype=dtype),
+                np.empty(shape, dtype=dtype),
+            )
+            self._buffers[key] = buffers
+        return buffers
+
+    def forward(self, x: np.ndarray, reuse_output: bool = False) -> np.ndarray:
+        """Activations of the layer, the inputs are kept for `backward`.
+
+        With `reuse_output` the activations are written into a buffer that
+        the next call with the same batch size overwrites: only for outputs
+        that stay inside the network (hidden layers). Otherwise they are a
+        new array owned by the caller.
+        """
+        # store inputs for computing gradients (inputs are never written in-place)
+        self.A_IN = x
+
+        z, a, _ = self._get_buffers(len(x), np.result_type(x, self.weights))
+        np.matmul(x, self.weights, out=z)
+        z += self.bias
+        self.Z = z
+
+        self.A_OUT = self.activation(z, a if reuse_output else None)
+        return self.A_OUT
+
+    def predict(self, x: np.ndarray) -> np.ndarray:
+        # inference only: nothing is stored for backward
+        z = x @ self.weights
+        z += self.bias
+        return self.activation(z, z)
+
+    def backward(self, delta_in: np.ndarray, fused: bool = False) -> np.ndarray:
         # compute delta for the layer
-        delta = delta_in * self.activation.diff(self.A_OUT)
+        if fused:
+            # delta_in is already w.r.t. the pre-activation (fused loss)
+            delta = delta_in
+        else:
+            out = self.Z if self.activation.diff_uses_input else self.A_OUT
+            _, _, buffer = self._get_buffers(len(delta_in), out.dtype)
+            delta = self.activation.chain(delta_in, out, buffer)
 
         n = len(self.A_IN)
 
         # compute gradients
         self.grad_weights += self.A_IN.T @ delta / n
-        self.grad_bias += np.sum(delta, axis=0) / n
+        if self.bias_active:
+            self.grad_bias += np.sum(delta, axis=0) / n
 
         # compute delta for next layers
         delta_out = delta @ self.weights.T
@@ -168,5 +452,5 @@ class HiddenLayer(Module):
     def zero_gradients(self) -> None:
         self.X = None
         self.A = None
-        self.grad_weights = np.zeros_like(self.weights)
-        self.bias = np.zeros_like(self.bias)
+        self.grad_weights.fill(0)
+        self.grad_bias.fill(0)
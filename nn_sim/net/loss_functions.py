@@ -86,7 +86,7 @@ def categorical_cross_entropy(
     # Calculate the cross-entropy
     cross_entropy = -np.sum(y_true * np.log(y_pred))
     # Normalize the loss to the number of samples
-    loss = np.mean(cross_entropy)
+    loss = cross_entropy / len(y_pred)
     return loss
 
 
@@ -100,3 +100,106 @@ def categorical_cross_entropy_derivative(
     # Compute the gradient
     gradients = -y_true / y_pred
     return gradients
+
+
+def softmax_cross_entropy_derivative(
+    y_pred: np.ndarray,
+    y_true: np.ndarray,
+) -> np.ndarray:
+    # gradient of the cross-entropy w.r.t. the logits of a softmax output
+    # layer: the softmax Jacobian and the 1 / y_pred term cancel out
+    return y_pred - y_true
+
+
+# fused loss and derivative: one residual (or clipped prediction) shared by
+# the value and the gradient, the gradient is computed in place in it.
+# With compute_loss=False the scalar loss is skipped and None is returned.
+
+
+def sum_of_squared_errors_and_derivative(
+    y_pred: np.ndarray,
+    y_true: np.ndarray,
+    compute_loss: bool = True,
+) -> tuple[float | None, np.ndarray]:
+    residual = y_pred - y_true
+    loss = None
+    if compute_loss:
+        flat = residual.ravel()
+        loss = 0.5 * np.dot(flat, flat)
+    return loss, residual
+
+
+def mean_squared_error_and_derivative(
+    y_pred: np.ndarray,
+    y_true: np.ndarray,
+    compute_loss: bool = True,
+) -> tuple[float | None, np.ndarray]:
+    residual = y_pred - y_true
+    loss = None
+    if compute_loss:
+        flat = residual.ravel()
+        loss = np.dot(flat, flat) / flat.size
+    residual *= 2 / len(y_pred)
+    return loss, residual
+
+
+def mean_absolute_error_and_derivative(
+    y_pred: np.ndarray,
+    y_true: np.ndarray,
+    compute_loss: bool = True,
+) -> tuple[float | None, np.ndarray]:
+    residual = y_pred - y_true
+    loss = None
+    if compute_loss:
+        loss = np.mean(np.abs(residual))
+    np.sign(residual, out=residual)
+    residual *= 1 / len(y_pred)
+    return loss, residual
+
+
+def binary_cross_entropy_loss_and_derivative(
+    y_pred: np.ndarray,
+    y_true: np.ndarray,
+    compute_loss: bool = True,
+) -> tuple[float | None, np.ndarray]:
+    epsilon = 1e-15
+    p = np.clip(y_pred, epsilon, 1 - epsilon)
+    q = 1.0 - p
+    loss = None
+    if compute_loss:
+        loss = -(np.vdot(y_true, np.log(p)) + np.vdot(1.0 - y_true, np.log(q))) / p.size
+    # -(y / p) + (1 - y) / (1 - p) == (p - y) / (p * (1 - p))
+    gradient = p - y_true
+    q *= p
+    gradient /= q
+    return loss, gradient
+
+
+def categorical_cross_entropy_and_derivative(
+    y_pred: np.ndarray,
+    y_true: np.ndarray,
+    compute_loss: bool = True,
+) -> tuple[float | None, np.ndarray]:
+    epsilon = 1e-12
+    p = np.clip(y_pred, epsilon, 1.0 - epsilon)
+    loss = None
+    if compute_loss:
+        loss = -np.vdot(y_true, np.log(p)) / len(p)
+    np.divide(y_true, p, out=p)
+    np.negative(p, out=p)
+    return loss, p
+
+
+def softmax_cross_entropy_and_derivative(
+    y_pred: np.ndarray,
+    y_true: np.ndarray,
+    compute_loss: bool = True,
+) -> tuple[float | None, np.ndarray]:
+    # loss of the softmax output, gradient w.r.t. the logits
+    loss = None
+    if compute_loss:
+        epsilon = 1e-12
+        log_p = np.clip(y_pred, epsilon, 1.0 - epsilon)
+        np.log(log_p, out=log_p)
+        loss = -np.vdot(y_true, log_p) / len(y_pred)
+    return loss, y_pred - y_true
@@ -1,74 +1,169 @@
 import numpy as np
 
 
-def compute_classification_metrics(y_pred, y_true):
+def to_class_labels(y: np.ndarray, threshold: float = 0.5) -> np.ndarray:
     """
-    Computes accuracy, precision, recall, and F1-score.
+    Convert network outputs or targets to integer class labels.
 
     Args:
-    y_true (np.array): Array of true binary labels (0 or 1).
-    y_pred (np.array): Array of predicted binary labels (0 or 1).
+    y (np.array): Integer labels (N,), binary scores (N,) or (N, 1), or
+        k-hot encoding / class scores (N, C).
+    threshold (float): Threshold applied to binary scores.
 
     Returns:
-    dict: Dictionary containing accuracy, recall, precision, and F1-score.
+    np.array: Array of shape (N,) with class indices.
+    """
+    y = np.asarray(y)
+    if y.ndim == 2 and y.shape[1] > 1:
+        return np.argmax(y, axis=1)
+    y = y.reshape(-1)
+    if np.issubdtype(y.dtype, np.integer):
+        return y
+    return (y > threshold).astype(np.int64)
+
+
+def confusion_matrix(y_pred, y_true, threshold=0.5, num_classes=None):
+    """
+    Create a multi-class confusion matrix in a single np.bincount pass.
+
+    Parameters:
+    - y_pred (numpy.ndarray): Predicted labels, scores or k-hot encoding.
+    - y_true (numpy.ndarray): True labels, scores or k-hot encoding.
+    - threshold (float): Threshold for binary (single output) scores.
+    - num_classes (int): Number of classes, inferred from the inputs if None.
+
+    Returns:
+    - numpy.ndarray: A confusion matrix where the element at (i, j) is the number of samples
+                      that are labeled as class i by the true labels and as class j by the predictions.
+
+    Raises:
+    - ValueError: Different numbers of samples, or labels outside [0, num_classes).
     """
+    if len(y_true) != len(y_pred):
+        raise ValueError("y_true and y_pred must have the same number of samples.")
+
+    true_labels = to_class_labels(y_true, threshold)
+    pred_labels = to_class_labels(y_pred, threshold)
+
+    if num_classes is None:
+        if np.ndim(y_true) == 2 and np.shape(y_true)[1] > 1:
+            num_classes = np.shape(y_true)[1]
+        elif len(true_labels) == 0:
+            num_classes = 2
+        else:
+            num_classes = max(2, true_labels.max() + 1, pred_labels.max() + 1)
+
+    for name, labels in (("y_true", true_labels), ("y_pred", pred_labels)):
+        if len(labels) and (labels.min() < 0 or labels.max() >= num_classes):
+            raise ValueError(
+                f"{name} has class labels outside [0, {num_classes}): "
+                f"{labels.min()} to {labels.max()}."
+            )
 
-    # Convert predictions to 0 or 1
-    y_pred = np.round(y_pred).astype(int)
-    y_true = np.round(y_true).astype(int)
+    counts = np.bincount(
+        true_labels * num_classes + pred_labels, minlength=num_classes * num_classes
+    )
+    return counts.reshape(num_classes, num_classes)
 
-    # True positives, false positives, true negatives, false negatives
-    TP = np.sum((y_pred == 1) & (y_true == 1))
-    FP = np.sum((y_pred == 1) & (y_true == 0))
-    TN = np.sum((y_pred == 0) & (y_true == 0))
-    FN = np.sum((y_pred == 0) & (y_true == 1))
 
-    # Accuracy
-    accuracy = (TP + TN) / (TP + FP + TN + FN) if (TP + FP + TN + FN) != 0 else 0
+def _safe_divide(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    out = np.zeros(np.shape(a), dtype=np.float64)
+    np.divide(a, b, out=out, where=b != 0)
+    return out
 
-    # Precision
-    precision = TP / (TP + FP) if (TP + FP) != 0 else 0
 
-    # Recall
-    recall = TP / (TP + FN) if (TP + FN) != 0 else 0
+def metrics_from_confusion_matrix(matrix: np.ndarray) -> dict:
+    """
+    Computes accuracy and per-class, macro and micro precision, recall and
+    F1-score from a confusion matrix (rows: true class, columns: predicted).
 
-    # F1-Score
-    f1_score = (
-        2 * (precision * recall) / (precision + recall)
-        if (precision + recall) != 0
-        else 0
+    Returns:
+    dict: Per-class arrays under "precision", "recall", "f1_score" and
+        "support", and scalars for the "macro_*" and "micro_*" averages.
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    tp = np.diag(matrix)
+    predicted = matrix.sum(axis=0)
+    support = matrix.sum(axis=1)
+    total = matrix.sum()
+
+    precision = _safe_divide(tp, predicted)
+    recall = _safe_divide(tp, support)
+    f1_score = _safe_divide(2 * precision * recall, precision + recall)
+
+    micro_precision = float(_safe_divide(tp.sum(), predicted.sum()))
+    micro_recall = float(_safe_divide(tp.sum(), support.sum()))
+    micro_f1 = float(
+        _safe_divide(2 * micro_precision * micro_recall, micro_precision + micro_recall)
     )
 
     return {
-        "accuracy": accuracy,
+        "accuracy": float(_safe_divide(tp.sum(), total)),
         "precision": precision,
         "recall": recall,
         "f1_score": f1_score,
+        "support": support.astype(np.int64),
+        "macro_precision": float(precision.mean()),
+        "macro_recall": float(recall.mean()),
+        "macro_f1_score": float(f1_score.mean()),
+        "micro_precision": micro_precision,
+        "micro_recall": micro_recall,
+        "micro_f1_score": micro_f1,
     }
 
 
-def confusion_matrix(y_pred, y_true, threshold=0.5):
+class ConfusionMatrix:
+    """Confusion matrix accumulated over mini-batches.
+
+    Only the (C, C) counts are kept, so metrics for large datasets can be
+    computed without storing all the predictions.
     """
-    Create a confusion matrix for multi-label data in k-hot encoding format.
 
-    Parameters:
-    - y_true (numpy.ndarray): True labels in k-hot encoding.
-    - y_pred (numpy.ndarray): Predicted labels in k-hot encoding.
+    def __init__(self, num_classes: int, threshold: float = 0.5) -> None:
+        self.num_classes: int = num_classes
+        self.threshold: float = threshold
+        self.matrix = np.zeros((num_classes, num_classes), dtype=np.int64)
 
-    Returns:
-    - numpy.ndarray: A confusion matrix where the element at (i, j) is the number of samples
-                      that are labeled as class i by the true labels and as class j by the predictions.
+    def reset(self) -> None:
+        self.matrix.fill(0)
+
+    def update(self, y_pred: np.ndarray, y_true: np.ndarray) -> None:
+        self.matrix += confusion_matrix(
+            y_pred, y_true, self.threshold, self.num_classes
+        )
+
+    def compute(self) -> dict:
+        return metrics_from_confusion_matrix(self.matrix)
+
+
+def compute_classification_metrics(y_pred, y_true):
     """
-    if y_true.shape != y_pred.shape:
-        raise ValueError("Shape of y_true and y_pred must be the same.")
+    Computes accuracy, precision, recall, and F1-score.
 
-    num_classes = y_true.shape[1]
-    confusion_matrix = np.zeros((num_classes, num_classes), dtype=int)
+    For binary labels the scores of the positive class are returned, for
+    multi-class labels (k-hot encoding) the macro averages.
 
-    for i in range(num_classes):
-        for j in range(num_classes):
-            confusion_matrix[i, j] = np.sum(
-                (y_true[:, i] > threshold) & (y_pred[:, j] > threshold)
-            )
+    Args:
+    y_true (np.array): Array of true labels (binary or k-hot encoding).
+    y_pred (np.array): Array of predicted labels (binary or k-hot encoding).
 
-    return confusion_matrix
+    Returns:
+    dict: Dictionary containing accuracy, recall, precision, and F1-score.
+    """
+    matrix = confusion_matrix(y_pred, y_true)
+    scores = metrics_from_confusion_matrix(matrix)
+
+    if len(matrix) == 2:
+        return {
+            "accuracy": scores["accuracy"],
+            "precision": float(scores["precision"][1]),
+            "recall": float(scores["recall"][1]),
+            "f1_score": float(scores["f1_score"][1]),
+        }
+
+    return {
+        "accuracy": scores["accuracy"],
+        "precision": scores["macro_precision"],
+        "recall": scores["macro_recall"],
+        "f1_score": scores["macro_f1_score"],
+    }
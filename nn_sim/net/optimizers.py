@@ -0,0 +1,478 @@
+from typing import Callable
+
+import numpy as np
+
+from .feedfoward import FeedFowardNeuralNetwork
+
+
+class Optimizer:
+    """Base class for the parameter update rules used by the training loops.
+
+    The optimizer state (velocities, moments) is preallocated per layer and
+    updated in-place, so `state_dict`/`load_state_dict` can checkpoint and
+    resume a training run. The updates write their temporaries into a
+    preallocated work array per parameter ("_work_weights", "_work_bias"),
+    which is not part of the checkpointed state.
+    """
+
+    # names of the per-layer state arrays, each shaped like weights and bias
+    state_names: tuple[str, ...] = ()
+    # evaluates the full-batch loss at trial parameters, `fit` sets `closure`
+    needs_closure: bool = False
+
+    def __init__(self, net: FeedFowardNeuralNetwork, learning_rate: float) -> None:
+        self.net = net
+        self.learning_rate: float = learning_rate
+        self.t: int = 0  # number of steps taken
+        # optional LRScheduler (schedulers.py), sets the learning rate per step
+        self.scheduler = None
+        self.state: list[dict[str, np.ndarray]] = []
+        for layer in net.layers:
+            layer_state = dict()
+            for name in self.state_names:
+                layer_state[f"{name}_weights"] = np.zeros_like(layer.weights)
+                layer_state[f"{name}_bias"] = np.zeros_like(layer.bias)
+            layer_state["_work_weights"] = np.empty_like(layer.weights)
+            layer_state["_work_bias"] = np.empty_like(layer.bias)
+            self.state.append(layer_state)
+
+    def step(self) -> None:
+        if self.scheduler is not None:
+            self.learning_rate = self.scheduler(self.t)
+        self.t += 1
+        for layer, state in zip(self.net.layers, self.state):
+            self.update(layer.weights, layer.grad_weights, state, "weights")
+            self.update(layer.bias, layer.grad_bias, state, "bias")
+
+    def update(
+        self,
+        param: np.ndarray,
+        grad: np.ndarray,
+        state: dict[str, np.ndarray],
+        suffix: str,
+    ) -> None:
+        raise NotImplementedError
+
+    def hyper_parameters(self) -> dict[str, float]:
+        return {"learning_rate": self.learning_rate}
+
+    def state_dict(self) -> dict:
+        return {
+            "name": self.__class__.__name__,
+            "t": self.t,
+            "hyper_parameters": self.hyper_parameters(),
+            "state": [
+                {
+                    key: array
+                    for key, array in layer_state.items()
+                    if not key.startswith("_")
+                }
+                for layer_state in self.state
+            ],
+        }
+
+    def load_state_dict(self, state_dict: dict) -> None:
+        assert (
+            state_dict["name"] == self.__class__.__name__
+        ), f"Optimizer state saved for {state_dict['name']}."
+        assert len(state_dict["state"]) == len(self.state), "Invalid number of layers."
+        self.t = int(state_dict["t"])
+        for layer_state, saved in zip(self.state, state_dict["state"]):
+            for key, array in layer_state.items():
+                if not key.startswith("_"):
+                    array[...] = saved[key]
+
+
+class SGD(Optimizer):
+
+    def update(self, param, grad, state, suffix) -> None:
+        work = state[f"_work_{suffix}"]
+        np.multiply(grad, self.learning_rate, out=work)
+        param -= work
+
+
+class SGDMomentum(Optimizer):
+
+    state_names = ("velocity",)
+
+    def __init__(
+        self,
+        net: FeedFowardNeuralNetwork,
+        learning_rate: float,
+        momentum: float = 0.9,
+    ) -> None:
+        super().__init__(net, learning_rate)
+        self.momentum: float = momentum
+
+    def update(self, param, grad, state, suffix) -> None:
+        # v = momentum * v + lr * grad
+        velocity = state[f"velocity_{suffix}"]
+        work = state[f"_work_{suffix}"]
+        velocity *= self.momentum
+        np.multiply(grad, self.learning_rate, out=work)
+        velocity += work
+        param -= velocity
+
+    def hyper_parameters(self) -> dict[str, float]:
+        return {"learning_rate": self.learning_rate, "momentum": self.momentum}
+
+
+class Nesterov(SGDMomentum):
+    """SGD with Nesterov momentum, the velocity form of SGDMomentum.
+
+    The gradient of the look-ahead point is approximated by stepping with
+    the updated velocity plus the current gradient:
+    param -= momentum * v + lr * grad.
+    """
+
+    def update(self, param, grad, state, suffix) -> None:
+        velocity = state[f"velocity_{suffix}"]
+        work = state[f"_work_{suffix}"]
+        velocity *= self.momentum
+        np.multiply(grad, self.learning_rate, out=work)
+        velocity += work
+        param -= work
+        np.multiply(velocity, self.momentum, out=work)
+        param -= work
+
+
+class Adam(Optimizer):
+
+    state_names = ("m", "v")
+
+    def __init__(
+        self,
+        net: FeedFowardNeuralNetwork,
+        learning_rate: float,
+        beta1: float = 0.9,
+        beta2: float = 0.999,
+        epsilon: float = 1e-7,
+    ) -> None:
+        super().__init__(net, learning_rate)
+        self.beta1: float = beta1
+        self.beta2: float = beta2
+        self.epsilon: float = epsilon
+
+    def update(self, param, grad, state, suffix) -> None:
+        m = state[f"m_{suffix}"]
+        v = state[f"v_{suffix}"]
+        work = state[f"_work_{suffix}"]
+
+        # Update first moment estimate
+        m *= self.beta1
+        np.multiply(grad, 1 - self.beta1, out=work)
+        m += work
+
+        # Update second moment estimate
+        v *= self.beta2
+        np.multiply(grad, grad, out=work)
+        work *= 1 - self.beta2
+        v += work
+
+        # Bias-corrected moments folded into the step size
+        m_scale = 1 / (1 - self.beta1**self.t)
+        v_hat = np.divide(v, 1 - self.beta2**self.t, out=work)
+        np.sqrt(v_hat, out=v_hat)
+        v_hat += self.epsilon
+
+        # Update parameters
+        step = np.divide(m, v_hat, out=work)
+        step *= self.learning_rate * m_scale
+        param -= step
+
+    def hyper_parameters(self) -> dict[str, float]:
+        return {
+            "learning_rate": self.learning_rate,
+            "beta1": self.beta1,
+            "beta2": self.beta2,
+            "epsilon": self.epsilon,
+        }
+
+
+class AdamW(Adam):
+    """Adam with decoupled weight decay (Loshchilov & Hutter).
+
+    The weights shrink by learning_rate * weight_decay before the Adam
+    step, instead of adding the decay to the gradient where the second
+    moment would rescale it. The biases are not decayed.
+    """
+
+    def __init__(
+        self,
+        net: FeedFowardNeuralNetwork,
+        learning_rate: float,
+        beta1: float = 0.9,
+        beta2: float = 0.999,
+        epsilon: float = 1e-7,
+        weight_decay: float = 0.01,
+    ) -> None:
+        super().__init__(net, learning_rate, beta1, beta2, epsilon)
+        self.weight_decay: float = weight_decay
+
+    def update(self, param, grad, state, suffix) -> None:
+        if suffix == "weights" and self.weight_decay != 0.0:
+            param *= 1 - self.learning_rate * self.weight_decay
+        super().update(param, grad, state, suffix)
+
+    def hyper_parameters(self) -> dict[str, float]:
+        return dict(super().hyper_parameters(), weight_decay=self.weight_decay)
+
+
+class RMSprop(Optimizer):
+
+    state_names = ("square_avg",)
+
+    def __init__(
+        self,
+        net: FeedFowardNeuralNetwork,
+        learning_rate: float,
+        rho: float = 0.9,
+        epsilon: float = 1e-7,
+    ) -> None:
+        super().__init__(net, learning_rate)
+        self.rho: float = rho
+        self.epsilon: float = epsilon
+
+    def update(self, param, grad, state, suffix) -> None:
+        # s = rho * s + (1 - rho) * grad^2, param -= lr * grad / (sqrt(s) + eps)
+        square_avg = state[f"square_avg_{suffix}"]
+        work = state[f"_work_{suffix}"]
+        square_avg *= self.rho
+        np.multiply(grad, grad, out=work)
+        work *= 1 - self.rho
+        square_avg += work
+
+        np.sqrt(square_avg, out=work)
+        work += self.epsilon
+        np.divide(grad, work, out=work)
+        work *= self.learning_rate
+        param -= work
+
+    def hyper_parameters(self) -> dict[str, float]:
+        return {
+            "learning_rate": self.learning_rate,
+            "rho": self.rho,
+            "epsilon": self.epsilon,
+        }
+
+
+class Adagrad(Optimizer):
+
+    state_names = ("sum_squares",)
+
+    def __init__(
+        self,
+        net: FeedFowardNeuralNetwork,
+        learning_rate: float,
+        epsilon: float = 1e-7,
+    ) -> None:
+        super().__init__(net, learning_rate)
+        self.epsilon: float = epsilon
+
+    def update(self, param, grad, state, suffix) -> None:
+        # s += grad^2, param -= lr * grad / (sqrt(s) + eps)
+        sum_squares = state[f"sum_squares_{suffix}"]
+        work = state[f"_work_{suffix}"]
+        np.multiply(grad, grad, out=work)
+        sum_squares += work
+
+        np.sqrt(sum_squares, out=work)
+        work += self.epsilon
+        np.divide(grad, work, out=work)
+        work *= self.learning_rate
+        param -= work
+
+    def hyper_parameters(self) -> dict[str, float]:
+        return {"learning_rate": self.learning_rate, "epsilon": self.epsilon}
+
+
+class LBFGS(Optimizer):
+    """Limited-memory BFGS for full-batch training of small networks.
+
+    The direction comes from the two-loop recursion over the last
+    `history_size` (step, gradient change) pairs, kept in preallocated
+    (history_size, n_params) arrays. With a `closure` (the full-batch loss at
+    the current parameters, forward pass only) the step length starts at the
+    learning rate and is halved until the loss decreases enough (Armijo);
+    without one, e.g. on mini batches, the step is learning_rate times the
+    direction. The curvature pairs are not checkpointed: a resumed run
+    rebuilds them from its first step.
+    """
+
+    needs_closure = True
+
+    def __init__(
+        self,
+        net: FeedFowardNeuralNetwork,
+        learning_rate: float = 1.0,
+        history_size: int = 10,
+        max_line_search: int = 20,
+    ) -> None:
+        super().__init__(net, learning_rate)
+        self.history_size: int = max(1, history_size)
+        self.max_line_search: int = max_line_search
+        self.closure: Callable[[], float] | None = None
+
+        self.slices: list[tuple[int, int]] = list()
+        n_params = 0
+        for layer in net.layers:
+            for param in (layer.weights, layer.bias):
+                self.slices.append((n_params, n_params + param.size))
+                n_params += param.size
+        self._params = np.empty(n_params)
+        self._grad = np.empty(n_params)
+        self._prev_grad = np.empty(n_params)
+        self._step = np.empty(n_params)  # last step taken, next s
+        self._direction = np.empty(n_params)
+        self._work = np.empty(n_params)
+        self._s = np.empty((self.history_size, n_params))
+        self._y = np.empty((self.history_size, n_params))
+        self._rho = np.empty(self.history_size)
+        self._alpha = np.empty(self.history_size)
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the curvature pairs, the next step is a gradient step."""
+        self.n_pairs: int = 0
+        self._head: int = 0  # slot of the next pair
+        self._has_step: bool = False
+
+    def _gather(self, flat: np.ndarray, grads: bool) -> None:
+        names = ("grad_weights", "grad_bias") if grads else ("weights", "bias")
+        arrays = [getattr(layer, name) for layer in self.net.layers for name in names]
+        for (start, stop), array in zip(self.slices, arrays):
+            flat[start:stop].reshape(array.shape)[...] = array
+
+    def _set_params(self, step_length: float) -> None:
+        # params = saved params + step_length * direction
+        arrays = [
+            getattr(layer, name)
+            for layer in self.net.layers
+            for name in ("weights", "bias")
+        ]
+        np.multiply(self._direction, step_length, out=self._step)
+        for (start, stop), array in zip(self.slices, arrays):
+            np.add(
+                self._params[start:stop].reshape(array.shape),
+                self._step[start:stop].reshape(array.shape),
+                out=array,
+            )
+
+    def _add_pair(self) -> None:
+        # s = last step, y = change of the gradient, skipped without curvature
+        y = np.subtract(self._grad, self._prev_grad, out=self._work)
+        ys = float(y @ self._step)
+        if ys <= 1e-10:
+            return
+        self._s[self._head] = self._step
+        self._y[self._head] = y
+        self._rho[self._head] = 1.0 / ys
+        self._head = (self._head + 1) % self.history_size
+        self.n_pairs = min(self.n_pairs + 1, self.history_size)
+
+    def _compute_direction(self) -> float:
+        """Two-loop recursion, direction = -H grad.
+
+        Returns:
+            float: directional derivative grad . direction.
+        """
+        q = self._direction
+        q[...] = self._grad
+        work = self._work
+        order = [(self._head - 1 - k) % self.history_size for k in range(self.n_pairs)]
+        for idx in order:  # newest to oldest
+            self._alpha[idx] = self._rho[idx] * float(self._s[idx] @ q)
+            q -= np.multiply(self._y[idx], self._alpha[idx], out=work)
+
+        if self.n_pairs:
+            newest = order[0]
+            y = self._y[newest]
+            q *= 1.0 / (self._rho[newest] * float(y @ y))
+        else:
+            # first step: gradient direction of length at most 1
+            q *= min(1.0, 1.0 / max(float(np.abs(self._grad).sum()), 1e-12))
+
+        for idx in order[::-1]:  # oldest to newest
+            beta = self._rho[idx] * float(self._y[idx] @ q)
+            q += np.multiply(self._s[idx], self._alpha[idx] - beta, out=work)
+
+        np.negative(q, out=q)
+        return float(self._grad @ q)
+
+    def step(self) -> None:
+        if self.scheduler is not None:
+            self.learning_rate = self.scheduler(self.t)
+        self.t += 1
+
+        self._gather(self._grad, True)
+        if self._has_step:
+            self._add_pair()
+        self._prev_grad[...] = self._grad
+        self._gather(self._params, False)
+
+        slope = self._compute_direction()
+        if not slope < 0.0:  # not a descent direction (or NaN): start over
+            self.reset()
+            slope = self._compute_direction()
+            if not slope < 0.0:  # zero gradient
+                return
+
+        step_length = self.learning_rate
+        if self.closure is not None:
+            loss = self.closure()
+            for _ in range(self.max_line_search):
+                self._set_params(step_length)
+                if self.closure() <= loss + 1e-4 * step_length * slope:
+                    break
+                step_length *= 0.5
+            else:
+                # no decrease along the direction: keep the parameters
+                self._set_params(0.0)
+                self.reset()
+                return
+        else:
+            self._set_params(step_length)
+        self._has_step = True
+
+    def hyper_parameters(self) -> dict[str, float]:
+        return {
+            "learning_rate": self.learning_rate,
+            "history_size": self.history_size,
+        }
+
+
+def create_optimizer(
+    net: FeedFowardNeuralNetwork, train_params: dict[str, str | int | float]
+) -> Optimizer:
+    optim = train_params["optim"]
+    learning_rate = train_params["learning_rate"]
+    if optim == "SGD":
+        return SGD(net, learning_rate)
+    if optim == "SGD with Momentum":
+        return SGDMomentum(net, learning_rate, train_params["momentum"])
+    if optim == "SGD with Nesterov Momentum":
+        return Nesterov(net, learning_rate, train_params["momentum"])
+    if optim == "RMSprop":
+        return RMSprop(net, learning_rate, train_params["rho"], train_params["epsilon"])
+    if optim == "Adagrad":
+        return Adagrad(net, learning_rate, train_params["epsilon"])
+    if optim == "ADAM":
+        return Adam(
+            net,
+            learning_rate,
+            train_params["beta1"],
+            train_params["beta2"],
+            train_params["epsilon"],
+        )
+    if optim == "AdamW":
+        return AdamW(
+            net,
+            learning_rate,
+            train_params["beta1"],
+            train_params["beta2"],
+            train_params["epsilon"],
+            train_params["weight_decay"],
+        )
+    if optim == "L-BFGS":
+        return LBFGS(net, learning_rate, train_params["history_size"])
+    raise AttributeError(f"{optim} is not a valid optimizer.")
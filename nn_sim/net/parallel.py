@@ -0,0 +1,538 @@
+import multiprocessing as mp
+import time
+from multiprocessing import shared_memory
+from threading import BrokenBarrierError
+
+import numpy as np
+from tqdm import tqdm
+
+from ..data.dataset_loader import DataLoader, Dataset
+from .layers import Module, PartialBatchLoss
+from .feedfoward import FeedFowardNeuralNetwork
+from .callbacks import TrainCallback, train_begin, epoch_end, train_end
+from .optimizers import Optimizer, SGD
+
+# Data-parallel training: every process holds a replica of the network and
+# its optimizer, computes the gradients of its shard of each batch of a step
+# and writes them into its row of a shared (n_workers, n_params + 1) buffer.
+# After a barrier every replica sums the rows in the same order, so all of
+# them apply a bitwise identical update. The main process is rank 0, shuffles
+# the samples and runs the callbacks.
+
+_RUN = 0
+_STOP = 1
+
+# The GUI trains from a thread of a multithreaded process (Qt, telemetry
+# locks, SQLite): forking it is unsafe, the workers start a new interpreter.
+# The scripts starting a training need a `__main__` guard (run.py has one).
+MP_START_METHOD = "spawn"
+
+
+class _Replica:
+
+    def __init__(
+        self,
+        rank: int,
+        n_workers: int,
+        net: FeedFowardNeuralNetwork,
+        X: np.ndarray,
+        Y: np.ndarray,
+        loss_func: Module,
+        optimizer: Optimizer,
+        batch_size: int,
+        step_size: int,
+        shuffle: bool,
+        buffer_name: str,
+        order_name: str,
+    ) -> None:
+        self.rank: int = rank
+        self.n_workers: int = n_workers
+        self.net = net
+        self.X = X
+        self.Y = Y
+        self.loss_func = PartialBatchLoss(loss_func)
+        self.optimizer = optimizer
+        self.batch_size: int = batch_size
+        self.shuffle: bool = shuffle
+        if rank > 0:
+            # the learning rate of every step is broadcast by rank 0
+            optimizer.scheduler = None
+
+        n_samples = len(X)
+        self.steps: list[tuple[int, int]] = [
+            (start, min(n_samples, start + step_size))
+            for start in range(0, n_samples, step_size)
+        ]
+
+        self.n_params: int = sum(
+            layer.weights.size + layer.bias.size for layer in net.layers
+        )
+        self.shm = shared_memory.SharedMemory(name=buffer_name)
+        # rows: gradients of each rank followed by its loss, last row: control
+        self.buffer = np.ndarray(
+            (n_workers + 1, self.n_params + 1), dtype=np.float64, buffer=self.shm.buf
+        )
+        self.reduced = np.empty(self.n_params + 1, dtype=np.float64)
+        # order of the samples in the current epoch
+        self.order_shm = shared_memory.SharedMemory(name=order_name)
+        self.order = np.ndarray((n_samples,), dtype=np.int64, buffer=self.order_shm.buf)
+
+    def close(self) -> None:
+        del self.buffer, self.order
+        self.shm.close()
+        self.order_shm.close()
+
+    def should_stop(self) -> bool:
+        return self.buffer[-1, 0] == _STOP
+
+    def compute_gradients(self, step_start: int, step_stop: int) -> None:
+        net = self.net
+        loss_func = self.loss_func
+        n_samples = len(self.X)
+
+        net.zero_gradients()
+        train_loss = 0.0
+        for start in range(step_start, step_stop, self.batch_size):
+            n_batch = min(self.batch_size, n_samples - start)
+            lo = start + (n_batch * self.rank) // self.n_workers
+            hi = start + (n_batch * (self.rank + 1)) // self.n_workers
+            if hi == lo:
+                continue
+
+            if self.shuffle:
+                indexes = self.order[lo:hi]
+                X = self.X[indexes]
+                Y = self.Y[indexes]
+            else:
+                X = self.X[lo:hi]
+                Y = self.Y[lo:hi]
+
+            y_pred = net(X)
+            loss_share = loss_func.loss_share(hi - lo, n_batch)
+            loss_share *= loss_func.loss_share(n_batch, n_samples)
+
+            loss_func.set_part(hi - lo, step_stop - step_start)
+            train_loss += net.backward(y_pred, Y, loss_func, True) * loss_share
+
+        row = self.buffer[self.rank]
+        offset = 0
+        for layer in net.layers:
+            for grad in (layer.grad_weights, layer.grad_bias):
+                row[offset : offset + grad.size] = grad.ravel()
+                offset += grad.size
+        row[-1] = train_loss
+
+    def next_learning_rate(self) -> float:
+        # rank 0: learning rate of the next step, read by the other replicas
+        if self.optimizer.scheduler is not None:
+            return self.optimizer.scheduler(self.optimizer.t)
+        return self.optimizer.learning_rate
+
+    def apply_update(self, learning_rate: float) -> float:
+        # same summation order on every replica: identical updates
+        reduced = self.reduced
+        np.sum(self.buffer[: self.n_workers], axis=0, out=reduced)
+
+        offset = 0
+        for layer in self.net.layers:
+            for grad in (layer.grad_weights, layer.grad_bias):
+                np.copyto(
+                    grad, reduced[offset : offset + grad.size].reshape(grad.shape)
+                )
+                offset += grad.size
+
+        if self.rank > 0:
+            self.optimizer.learning_rate = learning_rate
+        self.optimizer.step()
+        return float(reduced[-1])
+
+    def run_step(self, barrier, step_start: int, step_stop: int) -> float:
+        learning_rate = float(self.buffer[-1, 1])
+        self.compute_gradients(step_start, step_stop)
+        barrier.wait()  # all gradients written
+        return self.apply_update(learning_rate)
+
+
+def _worker(rank: int, n_workers: int, *args, barrier) -> None:
+    replica = _Replica(rank, n_workers, *args)
+    try:
+        while True:
+            for step_start, step_stop in replica.steps:
+                barrier.wait()  # control flag, order and learning rate written by rank 0
+                if replica.should_stop():
+                    return
+                replica.run_step(barrier, step_start, step_stop)
+    except BrokenBarrierError:
+        pass
+    except BaseException:
+        barrier.abort()
+        raise
+    finally:
+        replica.close()
+
+
+def fit_data_parallel(
+    net: FeedFowardNeuralNetwork,
+    dataset: Dataset,
+    loss_func: Module,
+    optimizer: Optimizer,
+    epochs: int,
+    batch_size: int | None = None,
+    callbacks: list[TrainCallback] | None = None,
+    start_epoch: int = 0,
+    n_workers: int | None = None,
+    accumulate_steps: int = 1,
+) -> list[float]:
+    """Data-parallel version of `train.fit` using `n_workers` processes.
+
+    Each batch is split across the processes and the gradients are summed
+    with a shared memory all-reduce, so the result matches `train.fit` up
+    to the floating point summation order.
+
+    Args:
+        n_workers: number of processes including the caller, defaults to
+            the number of CPUs.
+
+    Raises:
+        ValueError: the optimizer needs a loss closure (L-BFGS), its line
+            search is only run by `train.fit`.
+    """
+    if optimizer.needs_closure:
+        raise ValueError(
+            f"{type(optimizer).__name__} cannot train with worker processes: "
+            "its line search evaluates the full-batch loss in one process."
+        )
+    if n_workers is None:
+        n_workers = mp.cpu_count()
+    n_workers = max(1, n_workers)
+
+    n_samples = len(dataset)
+    shuffle = batch_size is not None
+    if batch_size is None:
+        batch_size = n_samples
+    batch_size = DataLoader(dataset, batch_size, shuffle).batch_size
+    step_size = batch_size * max(1, accumulate_steps)
+
+    n_params = sum(layer.weights.size + layer.bias.size for layer in net.layers)
+    shm = shared_memory.SharedMemory(
+        create=True, size=(n_workers + 1) * (n_params + 1) * 8
+    )
+    order_shm = shared_memory.SharedMemory(create=True, size=n_samples * 8)
+
+    ctx = mp.get_context(MP_START_METHOD)
+    barrier = ctx.Barrier(n_workers)
+    args = (
+        net,
+        dataset.X,
+        dataset.Y,
+        loss_func,
+        optimizer,
+        batch_size,
+        step_size,
+        shuffle,
+        shm.name,
+        order_shm.name,
+    )
+    workers = [
+        ctx.Process(
+            target=_worker,
+            args=(rank, n_workers) + args,
+            kwargs=dict(barrier=barrier),
+            daemon=True,
+        )
+        for rank in range(1, n_workers)
+    ]
+    replica = _Replica(0, n_workers, *args)
+    control = replica.buffer[-1]
+    control[0] = _RUN
+
+    train_losses = list()
+    try:
+        for worker in workers:
+            worker.start()
+
+        train_begin(callbacks, net)
+        for epoch in tqdm(range(start_epoch, epochs)):
+            if shuffle:
+                # same samples order as the DataLoader of train.fit
+                replica.order[:] = np.random.permutation(n_samples)
+
+            train_loss = 0.0
+            for step_start, step_stop in replica.steps:
+                control[1] = replica.next_learning_rate()
+                barrier.wait()
+                train_loss += replica.run_step(barrier, step_start, step_stop)
+            train_losses.append(train_loss)
+
+            if epoch_end(callbacks, net, epoch, train_losses[-1]):
+                break
+
+        control[0] = _STOP
+        barrier.wait()
+    except BrokenBarrierError:
+        raise RuntimeError("A data-parallel training worker failed.") from None
+    finally:
+        barrier.abort()
+        for worker in workers:
+            worker.join()
+        del control
+        replica.close()
+        shm.unlink()
+        order_shm.unlink()
+
+    train_end(callbacks, net)
+    if train_losses:
+        print("Train Loss: ", train_losses[-1])
+    return train_losses
+
+
+# Hogwild: the parameters of every process are views of one shared buffer and
+# each worker applies its SGD steps to it without any locking. The main
+# process only monitors the workers and runs the callbacks.
+
+
+def _bind_parameters(net: FeedFowardNeuralNetwork, flat: np.ndarray) -> None:
+    offset = 0
+    for layer in net.layers:
+        for name in ("weights", "bias"):
+            param = getattr(layer, name)
+            view = flat[offset : offset + param.size].reshape(param.shape)
+            setattr(layer, name, view)
+            offset += param.size
+
+
+def _hogwild_steps(
+    rank: int,
+    n_workers: int,
+    net: FeedFowardNeuralNetwork,
+    X: np.ndarray,
+    Y: np.ndarray,
+    loss_func: Module,
+    learning_rate: float,
+    epochs: int,
+    start_epoch: int,
+    batch_size: int,
+    params_shm: shared_memory.SharedMemory,
+    stats_shm: shared_memory.SharedMemory,
+    seed: np.random.SeedSequence,
+) -> None:
+    params = np.ndarray(
+        (params_shm.size // 8,), dtype=np.float64, buffer=params_shm.buf
+    )
+    # control flag, completed epochs, samples, loss sums and batches per epoch
+    stats = np.ndarray((5, n_workers, epochs), dtype=np.float64, buffer=stats_shm.buf)
+    control, completed, samples, loss_sums, batches = stats
+    _bind_parameters(net, params)
+    optimizer = SGD(net, learning_rate)
+
+    rng = np.random.default_rng(seed)
+    n_samples = len(X)
+    n_batches = -(-n_samples // batch_size)
+    for epoch in range(start_epoch, epochs):
+        order = rng.permutation(n_samples)
+        for batch_idx in range(rank, n_batches, n_workers):
+            if control[0, 0] == _STOP:
+                return
+            indexes = order[batch_idx * batch_size : (batch_idx + 1) * batch_size]
+            X_batch = X[indexes]
+            Y_batch = Y[indexes]
+
+            net.zero_gradients()
+            y_pred = net(X_batch)
+            loss_sums[rank, epoch] += net.backward(y_pred, Y_batch, loss_func, True)
+            batches[rank, epoch] += 1
+            optimizer.step()  # lock-free update of the shared parameters
+            samples[rank, 0] += len(indexes)
+        completed[rank, 0] = epoch + 1
+
+
+def _hogwild_worker(
+    rank: int,
+    n_workers: int,
+    net: FeedFowardNeuralNetwork,
+    *args,
+    params_name: str,
+    stats_name: str,
+    seed: np.random.SeedSequence,
+) -> None:
+    params_shm = shared_memory.SharedMemory(name=params_name)
+    stats_shm = shared_memory.SharedMemory(name=stats_name)
+    _hogwild_steps(rank, n_workers, net, *args, params_shm, stats_shm, seed)
+
+    # the shared memory can be closed once no array points to it
+    for layer in net.layers:
+        layer.weights = None
+        layer.bias = None
+    params_shm.close()
+    stats_shm.close()
+
+
+def fit_hogwild(
+    net: FeedFowardNeuralNetwork,
+    dataset: Dataset,
+    loss_func: Module,
+    learning_rate: float,
+    epochs: int,
+    batch_size: int | None = None,
+    callbacks: list[TrainCallback] | None = None,
+    start_epoch: int = 0,
+    n_workers: int | None = None,
+    seed: int | None = None,
+) -> list[float]:
+    """Asynchronous (Hogwild) SGD with `n_workers` processes.
+
+    Every worker shuffles the dataset on its own each epoch, takes every
+    n-th mini-batch and updates the shared parameters after each batch,
+    without locks. The loss of an epoch is the mean mini-batch loss of
+    all workers; throughput is reported in samples per second.
+
+    Args:
+        n_workers: number of worker processes, defaults to the number of CPUs.
+        seed: seed of the shuffling of the workers.
+    """
+    if n_workers is None:
+        n_workers = mp.cpu_count()
+    n_workers = max(1, n_workers)
+    if epochs <= start_epoch:
+        return list()
+    if batch_size is None:
+        # full batch: a slice of the dataset for each worker
+        batch_size = -(-len(dataset) // n_workers)
+    batch_size = max(1, min(batch_size, len(dataset)))
+
+    n_params = sum(layer.weights.size + layer.bias.size for layer in net.layers)
+    params_shm = shared_memory.SharedMemory(create=True, size=n_params * 8)
+    stats_shm = shared_memory.SharedMemory(create=True, size=5 * n_workers * epochs * 8)
+    params = np.ndarray((n_params,), dtype=np.float64, buffer=params_shm.buf)
+    stats = np.ndarray((5, n_workers, epochs), dtype=np.float64, buffer=stats_shm.buf)
+    stats.fill(0)
+    control, completed, samples, loss_sums, batches = stats
+    control[0, 0] = _RUN
+
+    # the network of the main process reads the live shared parameters
+    offset = 0
+    for layer in net.layers:
+        for param in (layer.weights, layer.bias):
+            params[offset : offset + param.size] = param.ravel()
+            offset += param.size
+    _bind_parameters(net, params)
+
+    ctx = mp.get_context(MP_START_METHOD)
+    seeds = np.random.SeedSequence(seed).spawn(n_workers)
+    workers = [
+        ctx.Process(
+            target=_hogwild_worker,
+            args=(
+                rank,
+                n_workers,
+                net,
+                dataset.X,
+                dataset.Y,
+                loss_func,
+                learning_rate,
+                epochs,
+                start_epoch,
+                batch_size,
+            ),
+            kwargs=dict(
+                params_name=params_shm.name,
+                stats_name=stats_shm.name,
+                seed=seeds[rank],
+            ),
+            daemon=True,
+        )
+        for rank in range(n_workers)
+    ]
+
+    train_losses = list()
+    start_time = time.perf_counter()
+    try:
+        train_begin(callbacks, net)
+        for worker in workers:
+            worker.start()
+
+        epoch = start_epoch
+        progress = tqdm(total=epochs - start_epoch)
+        while epoch < epochs:
+            if any(worker.exitcode not in (None, 0) for worker in workers):
+                raise RuntimeError("A Hogwild training worker failed.")
+
+            # an epoch is reported once every worker has finished it
+            done = int(completed[:, 0].min())
+            if done <= epoch:
+                time.sleep(0.001)
+                continue
+
+            stop = False
+            while epoch < done and not stop:
+                n = batches[:, epoch].sum()
+                train_losses.append(float(loss_sums[:, epoch].sum() / max(n, 1)))
+                stop = epoch_end(callbacks, net, epoch, train_losses[-1])
+                epoch += 1
+                progress.update(1)
+            if stop:
+                break
+        progress.close()
+    finally:
+        control[0, 0] = _STOP
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start_time
+        n_seen = samples[:, 0].sum()
+
+        # detach the network from the shared memory before releasing it
+        for layer in net.layers:
+            layer.weights = layer.weights.copy()
+            layer.bias = layer.bias.copy()
+        del params, stats, control, completed, samples, loss_sums, batches
+        params_shm.close()
+        params_shm.unlink()
+        stats_shm.close()
+        stats_shm.unlink()
+
+    train_end(callbacks, net)
+    if train_losses:
+        print("Train Loss: ", train_losses[-1])
+    print(f"Hogwild: {n_seen / max(elapsed, 1e-9):.0f} samples/s")
+    return train_losses
+
+
+if __name__ == "__main__":
+    # Hogwild vs the synchronous mini-batch SGD baseline:
+    # python -m nn_sim.net.parallel [dataset] [epochs] [batch_size] [n_workers]
+    import sys
+
+    from ..data.dataset_loader import DatasetNN
+    from .layers import Sigmoid, SSELoss
+    from .train import train_net_sgd_mini_batch
+
+    file_path = sys.argv[1] if len(sys.argv) > 1 else "./datasets/iris.nnset"
+    epochs = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    batch_size = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+    n_workers = int(sys.argv[4]) if len(sys.argv) > 4 else mp.cpu_count()
+
+    dataset = DatasetNN(file_path)
+    n_inputs = dataset.X.shape[1]
+    n_outputs = dataset.Y.shape[1]
+
+    results = dict()
+    for mode in ["sync", "hogwild"]:
+        np.random.seed(0)
+        net = FeedFowardNeuralNetwork(
+            n_inputs, [(8, True, Sigmoid()), (n_outputs, True, Sigmoid())]
+        )
+        start_time = time.perf_counter()
+        if mode == "sync":
+            losses = train_net_sgd_mini_batch(
+                net, dataset, 0.1, epochs, SSELoss(), batch_size
+            )
+        else:
+            losses = fit_hogwild(
+                net, dataset, SSELoss(), 0.1, epochs, batch_size, n_workers=n_workers
+            )
+        elapsed = time.perf_counter() - start_time
+        results[mode] = (losses, len(dataset) * len(losses) / elapsed)
+
+    for mode, (losses, throughput) in results.items():
+        curve = ", ".join(f"{losses[i]:.4f}" for i in range(0, len(losses), 20))
+        print(f"{mode:8s} {throughput:10.0f} samples/s | loss every 20 epochs: {curve}")
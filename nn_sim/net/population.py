@@ -0,0 +1,209 @@
+import numpy as np
+
+from ..data.dataset_loader import Dataset
+from .layers import Module, HiddenLayer
+from .feedfoward import FeedFowardNeuralNetwork
+from .callbacks import TrainCallback
+from .optimizers import Optimizer
+from .train import fit
+
+
+class PopulationLayer(Module):
+    """The same layer of K networks stacked along a leading axis.
+
+    Weights are (K, n_inputs, n_outputs) and biases (K, 1, n_outputs), so
+    one batched matmul runs the layer of every network.
+    """
+
+    def __init__(self, layers: list[HiddenLayer]) -> None:
+        self.weights: np.ndarray = np.stack([layer.weights for layer in layers])
+        self.bias: np.ndarray = np.stack([layer.bias for layer in layers])[:, None, :]
+        self.bias_active: bool = layers[0].bias_active
+        self.activation: Module = layers[0].activation
+        self.grad_weights = np.zeros_like(self.weights)
+        self.grad_bias = np.zeros_like(self.bias)
+
+        # per input shape buffers reused by forward/backward: (Z, A_OUT, delta)
+        self._buffers: dict[tuple, tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+
+    def _get_buffers(self, shape: tuple, dtype: np.dtype):
+        key = (shape, dtype)
+        buffers = self._buffers.get(key)
+        if buffers is None:
+            buffers = (
+                np.empty(shape, dtype=dtype),
+                np.empty(shape, dtype=dtype),
+                np.empty(shape, dtype=dtype),
+            )
+            self._buffers[key] = buffers
+        return buffers
+
+    def forward(self, x: np.ndarray, reuse_output: bool = False) -> np.ndarray:
+        # x is (N, n_inputs) for the first layer and (K, N, n_inputs) after it
+        # reuse_output: see HiddenLayer.forward
+        self.A_IN = x
+
+        shape = (len(self.weights), x.shape[-2], self.weights.shape[-1])
+        z, a, _ = self._get_buffers(shape, np.result_type(x, self.weights))
+        np.matmul(x, self.weights, out=z)
+        z += self.bias
+        self.Z = z
+
+        self.A_OUT = self.activation(z, a if reuse_output else None)
+        return self.A_OUT
+
+    def predict(self, x: np.ndarray) -> np.ndarray:
+        z = np.matmul(x, self.weights)
+        z += self.bias
+        return self.activation(z, z)
+
+    def backward(self, delta_in: np.ndarray, fused: bool = False) -> np.ndarray:
+        if fused:
+            delta = delta_in
+        else:
+            out = self.Z if self.activation.diff_uses_input else self.A_OUT
+            _, _, buffer = self._get_buffers(delta_in.shape, out.dtype)
+            delta = self.activation.chain(delta_in, out, buffer)
+
+        n = delta.shape[-2]
+
+        # (n_inputs, N) @ (K, N, n_outputs) broadcasts over the networks
+        self.grad_weights += np.matmul(np.swapaxes(self.A_IN, -1, -2), delta) / n
+        if self.bias_active:
+            self.grad_bias += np.sum(delta, axis=-2, keepdims=True) / n
+
+        return np.matmul(delta, np.swapaxes(self.weights, -1, -2))
+
+    def zero_gradients(self) -> None:
+        self.grad_weights.fill(0)
+        self.grad_bias.fill(0)
+
+
+class Population(FeedFowardNeuralNetwork):
+    """K networks with the same architecture trained as one batched model.
+
+    The outputs are (K, N, n_outputs). The optimizers in `optimizers.py`
+    work unchanged; a learning rate array of shape (K, 1, 1) trains every
+    network with its own learning rate.
+    """
+
+    def __init__(self, nets: list[FeedFowardNeuralNetwork]) -> None:
+        assert len(nets) > 0, "The population needs at least one network."
+        self.layers: list[PopulationLayer] = [
+            PopulationLayer([net.layers[idx] for net in nets])
+            for idx in range(len(nets[0].layers))
+        ]
+
+    def __len__(self) -> int:
+        return len(self.layers[0].weights)
+
+    def predict(self, x: np.ndarray, batch_size: int = 4096) -> np.ndarray:
+        outputs = list()
+        for start in range(0, len(x), batch_size):
+            a = x[start : start + batch_size]
+            for layer in self.layers:
+                a = layer.predict(a)
+            outputs.append(a)
+        return np.concatenate(outputs, axis=1)
+
+    def to_networks(self) -> list[FeedFowardNeuralNetwork]:
+        """Copy the parameters of every member into its own network."""
+        nets = list()
+        for k in range(len(self)):
+            n_inputs = self.layers[0].weights.shape[1]
+            net = FeedFowardNeuralNetwork(
+                n_inputs,
+                [
+                    (layer.weights.shape[2], layer.bias_active, layer.activation)
+                    for layer in self.layers
+                ],
+            )
+            for layer, stacked in zip(net.layers, self.layers):
+                layer.weights = stacked.weights[k].copy()
+                layer.bias = stacked.bias[k, 0].copy()
+            nets.append(net)
+        return nets
+
+    def __str__(self) -> str:
+        txt = f"Population(size={len(self)},\n"
+        for idx, layer in enumerate(self.layers):
+            txt += f"\tLayer [{idx}] Inputs: {layer.weights.shape[1]}, Outputs: {layer.weights.shape[2]}, Activation: {layer.activation.__class__.__name__}\n"
+        txt += ")"
+        return txt
+
+
+class PopulationLoss(Module):
+    """Loss of every network of a population, shape (K,)."""
+
+    def __init__(self, loss_func: Module) -> None:
+        self.loss_func = loss_func
+        self.fused_activation = getattr(loss_func, "fused_activation", None)
+        self.sum_reduction = loss_func.sum_reduction
+        self.diff_mean_reduction = loss_func.diff_mean_reduction
+
+    def forward(self, y_pred: np.ndarray, y_true: np.ndarray) -> np.ndarray:
+        return np.array([self.loss_func(y, y_true) for y in y_pred])
+
+    def diff(self, y_pred: np.ndarray, y_true: np.ndarray) -> np.ndarray:
+        delta = self.loss_func.diff(y_pred, y_true)
+        if self.loss_func.diff_mean_reduction:
+            # the derivative was divided by K instead of the number of samples
+            delta *= len(y_pred) / y_pred.shape[-2]
+        return delta
+
+    def fused_diff(self, y_pred: np.ndarray, y_true: np.ndarray) -> np.ndarray:
+        return self.loss_func.fused_diff(y_pred, y_true)
+
+
+def create_population(
+    n_inputs: int,
+    layers: list[tuple[int, bool, Module]],
+    size: int,
+    seeds: list[int] | None = None,
+) -> Population:
+    """Create `size` networks, each initialized with np.random.seed(seeds[k])."""
+    nets = list()
+    for k in range(size):
+        if seeds is not None:
+            np.random.seed(seeds[k])
+        nets.append(FeedFowardNeuralNetwork(n_inputs, layers))
+    return Population(nets)
+
+
+def fit_population(
+    population: Population,
+    dataset: Dataset,
+    loss_func: Module,
+    optimizer: Optimizer,
+    epochs: int,
+    batch_size: int | None = None,
+    callbacks: list[TrainCallback] | None = None,
+    accumulate_steps: int = 1,
+) -> np.ndarray:
+    """Train all networks of the population with `train.fit`.
+
+    The callbacks receive the (K,) losses of the epoch as `train_loss`.
+
+    Returns:
+        np.ndarray: loss curves of shape (epochs, K).
+
+    Raises:
+        ValueError: the optimizer needs a loss closure (L-BFGS), its line
+            search would couple the K independent networks.
+    """
+    if optimizer.needs_closure:
+        raise ValueError(
+            f"{type(optimizer).__name__} cannot train a population: its line "
+            "search would take one step length for all the networks."
+        )
+    train_losses = fit(
+        population,
+        dataset,
+        PopulationLoss(loss_func),
+        optimizer,
+        epochs,
+        batch_size,
+        callbacks,
+        accumulate_steps=accumulate_steps,
+    )
+    return np.array(train_losses).reshape(-1, len(population))
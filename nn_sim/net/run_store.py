@@ -0,0 +1,349 @@
+import datetime
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+import numpy as np
+
+from ..data.dataset_loader import Dataset, DatasetNN
+from .feedfoward import FeedFowardNeuralNetwork
+from .callbacks import TrainCallback
+from .train import train_net
+from .utils import create_net, get_loss_function_by_name
+
+# Local store of the training runs: one SQLite database with a row per run
+# (model_info, train_params, dataset hash, timings) and the per-epoch losses
+# appended in batches, plus one .npy file per finished run with its loss
+# curve, so curves are loaded without a query per epoch.
+
+RUNS_DIR = "runs"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created TEXT NOT NULL,
+    status TEXT NOT NULL,
+    dataset_name TEXT,
+    dataset_hash TEXT,
+    n_samples INTEGER,
+    model_info TEXT,
+    train_params TEXT,
+    start_epoch INTEGER DEFAULT 0,
+    epochs INTEGER DEFAULT 0,
+    final_loss REAL,
+    wall_time REAL,
+    samples_per_second REAL
+);
+CREATE INDEX IF NOT EXISTS runs_dataset_hash ON runs (dataset_hash, id);
+CREATE TABLE IF NOT EXISTS losses (
+    run_id INTEGER NOT NULL,
+    epoch INTEGER NOT NULL,
+    train_loss REAL,
+    PRIMARY KEY (run_id, epoch)
+) WITHOUT ROWID;
+"""
+
+_RUN_COLUMNS = [
+    "id",
+    "created",
+    "status",
+    "dataset_name",
+    "dataset_hash",
+    "n_samples",
+    "model_info",
+    "train_params",
+    "start_epoch",
+    "epochs",
+    "final_loss",
+    "wall_time",
+    "samples_per_second",
+]
+
+
+def dataset_hash(dataset: Dataset) -> str:
+    """Content hash of the samples (inputs, outputs and their shapes)."""
+    digest = hashlib.sha1()
+    for array in (dataset.X, dataset.Y):
+        array = np.ascontiguousarray(array, dtype=np.float64)
+        digest.update(str(array.shape).encode("utf8"))
+        digest.update(array.data)
+    return digest.hexdigest()
+
+
+class RunStore:
+    """SQLite database and loss curves of the training runs in `directory`."""
+
+    def __init__(self, directory: str = RUNS_DIR) -> None:
+        os.makedirs(directory, exist_ok=True)
+        self.directory: str = directory
+        # the GUI trains in a worker thread, never both threads at once
+        self.connection = sqlite3.connect(
+            os.path.join(directory, "runs.sqlite"), check_same_thread=False
+        )
+        # append-only writes: WAL avoids rewriting the database on each commit
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def _losses_path(self, run_id: int) -> str:
+        return os.path.join(self.directory, f"run_{run_id:06d}_losses.npy")
+
+    def create_run(
+        self,
+        *,
+        model_info: dict | None,
+        train_params: dict | None,
+        dataset_name: str = "",
+        dataset_hash: str = "",
+        n_samples: int = 0,
+        start_epoch: int = 0,
+    ) -> int:
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO runs (created, status, dataset_name, dataset_hash, "
+                "n_samples, model_info, train_params, start_epoch) "
+                "VALUES (?, 'running', ?, ?, ?, ?, ?, ?)",
+                (
+                    datetime.datetime.now().isoformat(timespec="seconds"),
+                    dataset_name,
+                    dataset_hash,
+                    n_samples,
+                    json.dumps(model_info),
+                    json.dumps(train_params),
+                    start_epoch,
+                ),
+            )
+        return cursor.lastrowid
+
+    def append_losses(self, run_id: int, first_epoch: int, losses: list[float]):
+        """Append the losses of consecutive epochs in one transaction."""
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO losses (run_id, epoch, train_loss) "
+                "VALUES (?, ?, ?)",
+                [
+                    (run_id, first_epoch + idx, float(loss))
+                    for idx, loss in enumerate(losses)
+                ],
+            )
+
+    def finish_run(
+        self,
+        run_id: int,
+        losses: list[float],
+        wall_time: float,
+        samples_per_second: float,
+        status: str = "finished",
+    ) -> None:
+        losses = np.asarray(losses, dtype=np.float64)
+        np.save(self._losses_path(run_id), losses)
+        with self.connection:
+            self.connection.execute(
+                "UPDATE runs SET status = ?, epochs = ?, final_loss = ?, "
+                "wall_time = ?, samples_per_second = ? WHERE id = ?",
+                (
+                    status,
+                    len(losses),
+                    float(losses[-1]) if len(losses) else None,
+                    wall_time,
+                    samples_per_second,
+                    run_id,
+                ),
+            )
+
+    def _to_dict(self, row: tuple) -> dict:
+        run = dict(zip(_RUN_COLUMNS, row))
+        run["model_info"] = json.loads(run["model_info"])
+        run["train_params"] = json.loads(run["train_params"])
+        return run
+
+    def get_run(self, run_id: int) -> dict | None:
+        row = self.connection.execute(
+            f"SELECT {', '.join(_RUN_COLUMNS)} FROM runs WHERE id = ?", (run_id,)
+        ).fetchone()
+        return None if row is None else self._to_dict(row)
+
+    def list_runs(
+        self,
+        dataset_hash: str | None = None,
+        status: str | None = None,
+        limit: int = 50,
+    ) -> list[dict]:
+        """Most recent runs first, optionally of one dataset and/or status."""
+        query = f"SELECT {', '.join(_RUN_COLUMNS)} FROM runs"
+        conditions = list()
+        args = list()
+        if dataset_hash is not None:
+            conditions.append("dataset_hash = ?")
+            args.append(dataset_hash)
+        if status is not None:
+            conditions.append("status = ?")
+            args.append(status)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY id DESC LIMIT ?"
+        args.append(limit)
+        return [self._to_dict(row) for row in self.connection.execute(query, args)]
+
+    def load_losses(self, run_id: int) -> np.ndarray:
+        """Loss curve of a run, from its .npy file or the appended epochs."""
+        path = self._losses_path(run_id)
+        if os.path.exists(path):
+            return np.load(path)
+        rows = self.connection.execute(
+            "SELECT train_loss FROM losses WHERE run_id = ? ORDER BY epoch", (run_id,)
+        ).fetchall()
+        return np.array([row[0] for row in rows], dtype=np.float64)
+
+
+class RunRecorder(TrainCallback):
+    """Record a training run in a `RunStore`.
+
+    The epoch losses are kept in memory and appended to the database every
+    `flush_every` epochs (in one transaction), so an epoch only costs a list
+    append. The timings are measured from `on_train_begin`.
+    """
+
+    needs_epoch_state = False
+
+    def __init__(
+        self,
+        store: RunStore,
+        dataset: Dataset,
+        model_info: dict | None = None,
+        train_params: dict | None = None,
+        *,
+        start_epoch: int = 0,
+        flush_every: int = 1000,
+    ) -> None:
+        self.store = store
+        self.dataset = dataset
+        self.model_info = model_info
+        self.train_params = train_params
+        self.start_epoch: int = start_epoch
+        self.flush_every: int = max(1, flush_every)
+        self.run_id: int | None = None
+        self.losses: list[float] = []
+        self._n_flushed: int = 0
+        self._start_time: float = 0.0
+
+    def flush(self) -> None:
+        pending = self.losses[self._n_flushed :]
+        if pending:
+            first_epoch = self.start_epoch + self._n_flushed
+            self.store.append_losses(self.run_id, first_epoch, pending)
+            self._n_flushed = len(self.losses)
+
+    def on_train_begin(self, net: FeedFowardNeuralNetwork) -> None:
+        self.losses = list()
+        self._n_flushed = 0
+        self.run_id = self.store.create_run(
+            model_info=self.model_info,
+            train_params=self.train_params,
+            dataset_name=getattr(self.dataset, "dataset_name", ""),
+            dataset_hash=dataset_hash(self.dataset),
+            n_samples=len(self.dataset),
+            start_epoch=self.start_epoch,
+        )
+        self._start_time = time.perf_counter()
+
+    def on_epoch_end(
+        self, net: FeedFowardNeuralNetwork, epoch: int, train_loss: float
+    ) -> bool:
+        self.losses.append(float(train_loss))
+        if len(self.losses) - self._n_flushed >= self.flush_every:
+            self.flush()
+        return False
+
+    def on_train_end(self, net: FeedFowardNeuralNetwork) -> None:
+        wall_time = time.perf_counter() - self._start_time
+        self.flush()
+        samples_per_second = 0.0
+        if wall_time > 0:
+            samples_per_second = len(self.dataset) * len(self.losses) / wall_time
+        self.store.finish_run(self.run_id, self.losses, wall_time, samples_per_second)
+
+
+def train_headless(
+    dataset_path: str,
+    model_info: dict,
+    train_params: dict,
+    store: RunStore,
+) -> int:
+    """Train a network described like the GUI does and record the run.
+
+    The whole dataset is used for training (no validation split).
+
+    Returns:
+        int: id of the recorded run.
+    """
+    dataset = DatasetNN(dataset_path)
+    net = create_net(model_info)
+    loss_func = get_loss_function_by_name(model_info["arch_loss_function"])
+    recorder = RunRecorder(store, dataset, model_info, train_params)
+    train_net(net, dataset, train_params, loss_func, [recorder])
+    return recorder.run_id
+
+
+if __name__ == "__main__":
+    # python -m nn_sim.net.run_store list [--dataset FILE]
+    # python -m nn_sim.net.run_store show RUN_ID
+    # python -m nn_sim.net.run_store train DATASET (--from-run ID |
+    #     --model-info JSON_FILE --train-params JSON_FILE) [--epochs N]
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Recorded training runs.")
+    parser.add_argument("--runs-dir", default=RUNS_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+    list_parser = commands.add_parser("list", help="list the most recent runs")
+    list_parser.add_argument("--dataset", help="only runs of this dataset file")
+    list_parser.add_argument("--limit", type=int, default=20)
+    show_parser = commands.add_parser("show", help="configuration of a run")
+    show_parser.add_argument("run_id", type=int)
+    train_parser = commands.add_parser("train", help="train without the GUI")
+    train_parser.add_argument("dataset")
+    train_parser.add_argument("--from-run", type=int, help="reuse a run config")
+    train_parser.add_argument("--model-info", help="model_info JSON file")
+    train_parser.add_argument("--train-params", help="train_params JSON file")
+    train_parser.add_argument("--epochs", type=int, help="override the epochs")
+    args = parser.parse_args()
+
+    store = RunStore(args.runs_dir)
+    if args.command == "list":
+        digest = None
+        if args.dataset:
+            digest = dataset_hash(DatasetNN(args.dataset))
+        print(
+            f"{'id':>5s} {'created':19s} {'status':8s} {'dataset':24s} "
+            f"{'epochs':>7s} {'final loss':>12s} {'time (s)':>9s} {'samples/s':>11s}"
+        )
+        for run in store.list_runs(digest, limit=args.limit):
+            final_loss = run["final_loss"]
+            print(
+                f"{run['id']:5d} {run['created']:19s} {run['status']:8s} "
+                f"{(run['dataset_name'] or '')[:24]:24s} {run['epochs']:7d} "
+                f"{final_loss if final_loss is not None else float('nan'):12.6f} "
+                f"{run['wall_time'] or 0.0:9.2f} {run['samples_per_second'] or 0.0:11.0f}"
+            )
+    elif args.command == "show":
+        run = store.get_run(args.run_id)
+        print(json.dumps(run, indent=2) if run else f"Run {args.run_id} not found.")
+    else:
+        if args.from_run is not None:
+            run = store.get_run(args.from_run)
+            model_info, train_params = run["model_info"], run["train_params"]
+        else:
+            with open(args.model_info) as fp:
+                model_info = json.load(fp)
+            with open(args.train_params) as fp:
+                train_params = json.load(fp)
+        if args.epochs is not None:
+            train_params["epochs"] = args.epochs
+        run_id = train_headless(args.dataset, model_info, train_params, store)
+        print(f"Run {run_id} recorded in {args.runs_dir}")
+    store.close()
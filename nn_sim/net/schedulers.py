@@ -0,0 +1,227 @@
+import math
+
+from .feedfoward import FeedFowardNeuralNetwork
+from .callbacks import TrainCallback
+from .optimizers import Optimizer
+
+
+class LRScheduler(TrainCallback):
+    """Base class of the learning rate schedules.
+
+    The optimizer asks the scheduler for the learning rate of every step
+    (`Optimizer.step`), so the schedule follows `optimizer.t` and continues
+    when a training is resumed. The rate is computed from a few floats, no
+    array is allocated per step. As a callback, the scheduler logs the
+    learning rate of every epoch in `learning_rates`.
+
+    Args:
+        optimizer: optimizer whose learning rate is scheduled, its current
+            learning rate is the base (maximum) learning rate.
+        warmup_steps: linear warmup from 0 to the base learning rate.
+    """
+
+    def __init__(self, optimizer: Optimizer, warmup_steps: int = 0) -> None:
+        self.optimizer = optimizer
+        self.base_lr: float = optimizer.learning_rate
+        self.warmup_steps: int = warmup_steps
+        self.learning_rates: list[float] = []
+        optimizer.scheduler = self
+
+    def get_lr(self, step: int) -> float:
+        """Learning rate of the (0-based) step after the warmup."""
+        return self.base_lr
+
+    def __call__(self, step: int) -> float:
+        if step < self.warmup_steps:
+            return self.base_lr * (step + 1) / self.warmup_steps
+        return self.get_lr(step - self.warmup_steps)
+
+    def on_train_begin(self, net: FeedFowardNeuralNetwork) -> None:
+        self.learning_rates.clear()
+
+    def on_epoch_end(
+        self, net: FeedFowardNeuralNetwork, epoch: int, train_loss: float
+    ) -> bool:
+        self.learning_rates.append(self.optimizer.learning_rate)
+        return False
+
+
+class StepLR(LRScheduler):
+    """Multiply the learning rate by `gamma` every `step_size` steps."""
+
+    def __init__(
+        self,
+        optimizer: Optimizer,
+        step_size: int,
+        gamma: float = 0.1,
+        warmup_steps: int = 0,
+    ) -> None:
+        super().__init__(optimizer, warmup_steps)
+        self.step_size: int = max(1, step_size)
+        self.gamma: float = gamma
+
+    def get_lr(self, step: int) -> float:
+        return self.base_lr * self.gamma ** (step // self.step_size)
+
+
+class ExponentialLR(LRScheduler):
+    """Multiply the learning rate by `gamma` every `period` steps (smoothly)."""
+
+    def __init__(
+        self,
+        optimizer: Optimizer,
+        gamma: float = 0.99,
+        period: int = 1,
+        warmup_steps: int = 0,
+    ) -> None:
+        super().__init__(optimizer, warmup_steps)
+        self.gamma: float = gamma
+        self.period: int = max(1, period)
+
+    def get_lr(self, step: int) -> float:
+        return self.base_lr * self.gamma ** (step / self.period)
+
+
+class CosineAnnealingLR(LRScheduler):
+    """Cosine decay from the base learning rate to `min_lr` in `total_steps`."""
+
+    def __init__(
+        self,
+        optimizer: Optimizer,
+        total_steps: int,
+        min_lr: float = 0.0,
+        warmup_steps: int = 0,
+    ) -> None:
+        super().__init__(optimizer, warmup_steps)
+        self.total_steps: int = max(1, total_steps - warmup_steps)
+        self.min_lr: float = min_lr
+
+    def get_lr(self, step: int) -> float:
+        progress = min(step / self.total_steps, 1.0)
+        cosine = 0.5 * (1 + math.cos(math.pi * progress))
+        return self.min_lr + (self.base_lr - self.min_lr) * cosine
+
+
+class OneCycleLR(LRScheduler):
+    """One-cycle policy: rise to the base learning rate, then anneal.
+
+    The rate starts at base_lr / div_factor, reaches base_lr after
+    `pct_start` of the steps and ends at base_lr / (div_factor *
+    final_div_factor), both phases following a cosine.
+    """
+
+    def __init__(
+        self,
+        optimizer: Optimizer,
+        total_steps: int,
+        pct_start: float = 0.3,
+        div_factor: float = 25.0,
+        final_div_factor: float = 1e4,
+    ) -> None:
+        super().__init__(optimizer)
+        self.total_steps: int = max(2, total_steps)
+        self.up_steps: int = max(1, int(self.total_steps * pct_start))
+        self.initial_lr: float = self.base_lr / div_factor
+        self.final_lr: float = self.initial_lr / final_div_factor
+
+    @staticmethod
+    def _anneal(start: float, end: float, progress: float) -> float:
+        return end + (start - end) * 0.5 * (1 + math.cos(math.pi * progress))
+
+    def get_lr(self, step: int) -> float:
+        if step < self.up_steps:
+            return self._anneal(self.initial_lr, self.base_lr, step / self.up_steps)
+        down_steps = max(1, self.total_steps - self.up_steps)
+        progress = min((step - self.up_steps) / down_steps, 1.0)
+        return self._anneal(self.base_lr, self.final_lr, progress)
+
+
+class ReduceLROnPlateau(LRScheduler):
+    """Multiply the learning rate by `factor` when the epoch loss stalls.
+
+    The loss must improve by more than `threshold` (relative) within
+    `patience` epochs, otherwise the rate is reduced, down to `min_lr`.
+    """
+
+    def __init__(
+        self,
+        optimizer: Optimizer,
+        factor: float = 0.5,
+        patience: int = 10,
+        threshold: float = 1e-4,
+        min_lr: float = 0.0,
+        warmup_steps: int = 0,
+    ) -> None:
+        super().__init__(optimizer, warmup_steps)
+        self.factor: float = factor
+        self.patience: int = patience
+        self.threshold: float = threshold
+        self.min_lr: float = min_lr
+        self.lr: float = self.base_lr
+        self.best_loss: float = math.inf
+        self.bad_epochs: int = 0
+
+    def get_lr(self, step: int) -> float:
+        return self.lr
+
+    def on_epoch_end(
+        self, net: FeedFowardNeuralNetwork, epoch: int, train_loss: float
+    ) -> bool:
+        super().on_epoch_end(net, epoch, train_loss)
+        if math.isnan(train_loss):
+            return False  # epoch without loss value (`fit` loss_every)
+        if train_loss < self.best_loss * (1 - self.threshold):
+            self.best_loss = float(train_loss)
+            self.bad_epochs = 0
+        else:
+            self.bad_epochs += 1
+            if self.bad_epochs > self.patience:
+                self.lr = max(self.lr * self.factor, self.min_lr)
+                self.bad_epochs = 0
+        return False
+
+
+SCHEDULERS = [
+    "Constant",
+    "Step",
+    "Exponential",
+    "Cosine",
+    "One Cycle",
+    "Reduce on Plateau",
+]
+
+
+def create_scheduler(
+    optimizer: Optimizer,
+    train_params: dict[str, str | int | float],
+    steps_per_epoch: int = 1,
+) -> LRScheduler | None:
+    """Scheduler selected in the TrainWidget, its periods are given in epochs."""
+    name = train_params.get("lr_scheduler", "Constant")
+    epochs = train_params["epochs"]
+    warmup_steps = train_params.get("lr_warmup_epochs", 0) * steps_per_epoch
+    gamma = train_params.get("lr_gamma", 0.1)
+
+    if name == "Constant":
+        if warmup_steps > 0:
+            return LRScheduler(optimizer, warmup_steps)
+        return None
+    if name == "Step":
+        step_size = train_params.get("lr_step_epochs", 100) * steps_per_epoch
+        return StepLR(optimizer, step_size, gamma, warmup_steps)
+    if name == "Exponential":
+        return ExponentialLR(optimizer, gamma, steps_per_epoch, warmup_steps)
+    if name == "Cosine":
+        return CosineAnnealingLR(
+            optimizer, epochs * steps_per_epoch, warmup_steps=warmup_steps
+        )
+    if name == "One Cycle":
+        return OneCycleLR(optimizer, epochs * steps_per_epoch)
+    if name == "Reduce on Plateau":
+        return ReduceLROnPlateau(
+            optimizer,
+            gamma,
+            train_params.get("lr_patience", 10),
+            warmup_steps=warmup_steps,
+        )
+    raise AttributeError(f"{name} is not a valid learning rate scheduler.")
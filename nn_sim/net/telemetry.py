@@ -0,0 +1,250 @@
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from .feedfoward import FeedFowardNeuralNetwork
+from .callbacks import TrainCallback
+
+# Channel between a training loop and its displays. The trainer publishes
+# after every epoch and never waits for a consumer: scalar topics are kept in
+# a bounded history (the oldest values are dropped when a consumer falls
+# behind), array topics only keep their latest snapshot (latest value wins).
+# Consumers subscribe to the topics they display and poll at their own rate,
+# a topic without subscribers is never copied.
+
+STREAM_TOPICS = ("loss", "validation", "learning_rate")
+SNAPSHOT_TOPICS = ("weights", "gradients")
+TOPICS = STREAM_TOPICS + SNAPSHOT_TOPICS
+
+
+class Subscription:
+    """Topics polled by one consumer, with its position in every topic."""
+
+    def __init__(self, channel: "TelemetryChannel", topics: tuple[str, ...]) -> None:
+        self.channel = channel
+        self.topics: frozenset[str] = frozenset(topics)
+        self.last_sequence: dict[str, int] = {topic: 0 for topic in self.topics}
+        self.dropped: int = 0  # stream values overwritten before a poll
+
+    def poll(self) -> dict:
+        """New data since the previous poll.
+
+        Returns:
+            dict: per topic with new data, a list of (epoch, value) for the
+            stream topics, the latest (epoch, value) for the snapshot topics.
+        """
+        return self.channel.poll(self)
+
+    def close(self) -> None:
+        self.channel.unsubscribe(self)
+
+
+class TelemetryChannel:
+    """Thread-safe, bounded channel of training snapshots.
+
+    Args:
+        history: values kept per stream topic for the slowest consumer.
+    """
+
+    def __init__(self, history: int = 4096) -> None:
+        self._lock = threading.Lock()
+        self._subscriptions: list[Subscription] = []
+        self._wanted: frozenset[str] = frozenset()
+        self._sequence: dict[str, int] = {topic: 0 for topic in TOPICS}
+        self._streams: dict[str, deque] = {
+            topic: deque(maxlen=max(1, history)) for topic in STREAM_TOPICS
+        }
+        self._snapshots: dict[str, tuple[int, object]] = dict()
+
+    def subscribe(self, *topics: str) -> Subscription:
+        for topic in topics:
+            if topic not in TOPICS:
+                raise ValueError(f"Unknown telemetry topic: {topic}")
+        subscription = Subscription(self, topics)
+        with self._lock:
+            for topic in subscription.topics:
+                subscription.last_sequence[topic] = self._sequence[topic]
+            self._subscriptions.append(subscription)
+            self._update_wanted()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+            self._update_wanted()
+
+    def _update_wanted(self) -> None:
+        wanted = set()
+        for subscription in self._subscriptions:
+            wanted |= subscription.topics
+        self._wanted = frozenset(wanted)
+        for topic in SNAPSHOT_TOPICS:
+            if topic not in wanted:
+                self._snapshots.pop(topic, None)
+
+    def wants(self, topic: str) -> bool:
+        """True when a consumer is subscribed, check it before copying data."""
+        return topic in self._wanted
+
+    def clear(self) -> None:
+        """Forget the published data, e.g. before a new training run."""
+        with self._lock:
+            for stream in self._streams.values():
+                stream.clear()
+            self._snapshots.clear()
+            for subscription in self._subscriptions:
+                for topic in subscription.topics:
+                    subscription.last_sequence[topic] = self._sequence[topic]
+
+    def publish(self, topic: str, epoch: int, value) -> None:
+        """Publish a value, owned by the channel from now on.
+
+        Snapshot values must not be modified after publishing: they are
+        shared by all the consumers.
+        """
+        if topic not in self._wanted:
+            return
+        with self._lock:
+            self._sequence[topic] += 1
+            sequence = self._sequence[topic]
+            if topic in self._streams:
+                self._streams[topic].append((sequence, epoch, value))
+            else:
+                self._snapshots[topic] = (sequence, (epoch, value))
+
+    def poll(self, subscription: Subscription) -> dict:
+        data = dict()
+        with self._lock:
+            for topic in subscription.topics:
+                sequence = self._sequence[topic]
+                n_new = sequence - subscription.last_sequence[topic]
+                if n_new <= 0:
+                    continue
+                subscription.last_sequence[topic] = sequence
+                if topic in self._streams:
+                    stream = self._streams[topic]
+                    n_kept = min(n_new, len(stream))
+                    subscription.dropped += n_new - n_kept
+                    data[topic] = [
+                        (epoch, value)
+                        for _, epoch, value in list(stream)[len(stream) - n_kept :]
+                    ]
+                elif topic in self._snapshots:
+                    data[topic] = self._snapshots[topic][1]
+        return data
+
+
+def weights_snapshot(net: FeedFowardNeuralNetwork) -> list[np.ndarray]:
+    """Copy of the weights of every layer, bias as last row."""
+    layers_data = list()
+    for layer in net.layers:
+        w = layer.weights
+        if layer.bias_active:
+            w = np.vstack((w, layer.bias))
+        else:
+            w = w.copy()
+        layers_data.append(w)
+    return layers_data
+
+
+def gradients_snapshot(net: FeedFowardNeuralNetwork) -> list[np.ndarray]:
+    """Absolute gradients of every layer, bias as last row (GradientRecorder)."""
+    layers_data = list()
+    for layer in net.layers:
+        grads = layer.grad_weights
+        if layer.bias_active:
+            grads = np.vstack((grads, layer.grad_bias))
+        layers_data.append(np.abs(grads))
+    return layers_data
+
+
+class TelemetryPublisher(TrainCallback):
+    """Publish the training progress of every epoch in a `TelemetryChannel`.
+
+    The weights and gradients are only copied when subscribed, and at most
+    once per `snapshot_interval` seconds (a display refresh). The gradients
+    are the ones of the last parameter update of the epoch (full batch: the
+    gradients of the epoch step). Setting `stop_requested` stops at the next epoch.
+    """
+
+    needs_epoch_state = False
+
+    def __init__(
+        self,
+        channel: TelemetryChannel,
+        optimizer=None,
+        *,
+        snapshot_interval: float = 1 / 30,
+    ) -> None:
+        self.channel = channel
+        self.optimizer = optimizer
+        self.snapshot_interval: float = snapshot_interval
+        self.stop_requested: bool = False
+        self._last_snapshot: float = 0.0
+
+    def on_train_begin(self, net: FeedFowardNeuralNetwork) -> None:
+        self.stop_requested = False
+        self._last_snapshot = 0.0
+
+    def on_epoch_end(
+        self, net: FeedFowardNeuralNetwork, epoch: int, train_loss: float
+    ) -> bool:
+        channel = self.channel
+        channel.publish("loss", epoch, float(train_loss))
+        if self.optimizer is not None and channel.wants("learning_rate"):
+            channel.publish("learning_rate", epoch, self.optimizer.learning_rate)
+        now = time.perf_counter()
+        if now - self._last_snapshot >= self.snapshot_interval:
+            self._last_snapshot = now
+            if channel.wants("weights"):
+                channel.publish("weights", epoch, weights_snapshot(net))
+            if channel.wants("gradients"):
+                channel.publish("gradients", epoch, gradients_snapshot(net))
+        return self.stop_requested
+
+    def on_train_end(self, net: FeedFowardNeuralNetwork) -> None:
+        # the final weights, e.g. the best ones restored by the validation
+        if self.channel.wants("weights"):
+            self.channel.publish("weights", -1, weights_snapshot(net))
+
+
+if __name__ == "__main__":
+    # python -m nn_sim.net.telemetry
+    from .layers import Tanh, Sigmoid, MSELoss
+    from .optimizers import Adam
+    from .train import fit
+
+    class XOR:
+        X = np.array([[0, 0], [0, 1], [1, 0], [1, 1]], dtype=np.float64)
+        Y = np.array([[0], [1], [1], [0]], dtype=np.float64)
+
+        def __len__(self) -> int:
+            return len(self.X)
+
+    channel = TelemetryChannel(history=256)
+    loss_view = channel.subscribe("loss")
+    weights_view = channel.subscribe("loss", "weights")
+
+    np.random.seed(0)
+    net = FeedFowardNeuralNetwork(2, [(8, True, Tanh()), (1, True, Sigmoid())])
+    optimizer = Adam(net, 0.01)
+    trainer = threading.Thread(
+        target=fit,
+        args=(net, XOR(), MSELoss(), optimizer, 5000),
+        kwargs=dict(callbacks=[TelemetryPublisher(channel, optimizer)]),
+    )
+    trainer.start()
+    while trainer.is_alive():
+        time.sleep(1 / 30)
+        losses = loss_view.poll().get("loss", [])
+        data = weights_view.poll()
+        if losses:
+            print(
+                f"epoch {losses[-1][0]:5d} loss {losses[-1][1]:.6f} "
+                f"values {len(losses):4d} dropped {loss_view.dropped:5d} "
+                f"weights {'epoch ' + str(data['weights'][0]) if 'weights' in data else '-'}"
+            )
+    trainer.join()
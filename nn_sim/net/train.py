@@ -1,8 +1,14 @@
+from functools import partial
+
 import numpy as np
 from tqdm import tqdm
 from ..data.dataset_loader import DataLoader, DatasetNN
-from .layers import Module
+from .layers import Module, PartialBatchLoss
 from .feedfoward import FeedFowardNeuralNetwork
+from .callbacks import TrainCallback, train_begin, epoch_end, train_end
+from .optimizers import Optimizer, SGD, SGDMomentum, Adam, create_optimizer
+from .parallel import fit_data_parallel, fit_hogwild
+from .schedulers import create_scheduler
 
 
 def train_net(
@@ -10,140 +16,236 @@ def train_net(
     dataset: DatasetNN,
     train_params: dict[str, str | int | float],
     loss_func: Module,
+    callbacks: list[TrainCallback] | None = None,
+    optimizer: Optimizer | None = None,
+    start_epoch: int = 0,
 ):
-    optim = train_params["optim"]
+    """Train the network with the parameters selected in the TrainWidget.
+
+    An existing `optimizer` (e.g. restored from a checkpoint) together with
+    `start_epoch` resumes a previous training run. With more than one
+    "n_workers" the batches are split across processes (data parallel), or
+    with "hogwild" the workers run lock-free asynchronous SGD at the constant
+    "learning_rate" (no optimizer, scheduler, accumulation or JIT). With "jit"
+    full-batch epochs run in a Numba kernel when available (`jit.fit_jit`).
+    "loss_every" > 1 skips the loss value of the other epochs (`fit`).
+    """
     epochs = train_params["epochs"]
-    mini_batch = train_params["batch_mode"] == "Mini Batch"
-    if mini_batch:
+    batch_size = None
+    if train_params["batch_mode"] == "Mini Batch":
         batch_size = train_params["batch_size"]
-    learning_rate = train_params["learning_rate"]
-    if optim == "SGD":
-
-        if mini_batch:
-            return train_net_sgd_mini_batch(
-                net,
-                dataset,
-                learning_rate,
-                epochs,
-                loss_func,
-                batch_size,
-            )
-        else:
-            return train_net_sgd(
-                net,
-                dataset,
-                learning_rate,
-                epochs,
-                loss_func,
-            )
-    elif optim == "SGD with Momentum":
-        momentum = train_params["momentum"]
-        if mini_batch:
-            return train_net_sgd_momentum_mini_batch(
-                net,
-                dataset,
-                learning_rate,
-                epochs,
-                loss_func,
-                momentum,
-                batch_size,
-            )
-        else:
-            return train_net_sgd_momentum(
-                net,
-                dataset,
-                learning_rate,
-                epochs,
-                loss_func,
-                momentum,
-            )
-    elif optim == "ADAM":
-        beta1 = train_params["beta1"]
-        beta2 = train_params["beta2"]
-        epsilon = train_params["epsilon"]
-        if mini_batch:
-            return train_net_adam_mini_batch(
-                net,
-                dataset,
-                learning_rate,
-                epochs,
-                loss_func,
-                beta1,
-                beta2,
-                epsilon,
-                batch_size,
-            )
-        else:
-            return train_net_adam(
-                net, dataset, learning_rate, epochs, loss_func, beta1, beta2, epsilon
-            )
-    return None
-
-
-def train_net_sgd(
+    accumulate_steps = train_params.get("accumulate_steps", 1)
+
+    n_workers = train_params.get("n_workers", 1)
+    if train_params.get("hogwild", False):
+        return fit_hogwild(
+            net,
+            dataset,
+            loss_func,
+            train_params["learning_rate"],
+            epochs,
+            batch_size,
+            callbacks,
+            start_epoch,
+            n_workers,
+        )
+
+    if optimizer is None:
+        optimizer = create_optimizer(net, train_params)
+    callbacks = attach_scheduler(
+        optimizer,
+        train_params,
+        steps_per_epoch(len(dataset), train_params),
+        callbacks,
+    )
+    if n_workers > 1:
+        return fit_data_parallel(
+            net,
+            dataset,
+            loss_func,
+            optimizer,
+            epochs,
+            batch_size,
+            callbacks,
+            start_epoch,
+            n_workers,
+            accumulate_steps,
+        )
+
+    fit_func = fit
+    if train_params.get("jit", False):
+        from .jit import fit_jit  # jit.py falls back to `fit`
+
+        fit_func = fit_jit
+    return fit_func(
+        net,
+        dataset,
+        loss_func,
+        optimizer,
+        epochs,
+        batch_size,
+        callbacks,
+        start_epoch,
+        accumulate_steps,
+        loss_every=train_params.get("loss_every", 1),
+    )
+
+
+def steps_per_epoch(n_samples: int, train_params: dict[str, str | int | float]) -> int:
+    if train_params["batch_mode"] != "Mini Batch":
+        return 1
+    batch_size = max(1, min(train_params["batch_size"], n_samples))
+    step_size = batch_size * train_params.get("accumulate_steps", 1)
+    return -(-n_samples // step_size)
+
+
+def attach_scheduler(
+    optimizer: Optimizer,
+    train_params: dict[str, str | int | float],
+    n_steps_per_epoch: int,
+    callbacks: list[TrainCallback] | None = None,
+) -> list[TrainCallback] | None:
+    """Add the learning rate scheduler selected in `train_params`.
+
+    The scheduler is also a callback (it logs the learning rate of every
+    epoch), the returned list includes it.
+    """
+    if optimizer.scheduler is not None:
+        return callbacks
+    scheduler = create_scheduler(optimizer, train_params, n_steps_per_epoch)
+    if scheduler is None:
+        return callbacks
+    return list(callbacks or []) + [scheduler]
+
+
+def fit(
     net: FeedFowardNeuralNetwork,
     dataset: DatasetNN,
-    learning_rate: float,
-    epochs: int,
     loss_func: Module,
-):
-    X = dataset.X
-    Y = dataset.Y
+    optimizer: Optimizer,
+    epochs: int,
+    batch_size: int | None = None,
+    callbacks: list[TrainCallback] | None = None,
+    start_epoch: int = 0,
+    accumulate_steps: int = 1,
+    loss_every: int = 1,
+) -> list[float]:
+    """Training loop shared by all optimizers.
+
+    Without `batch_size` every epoch is one full-batch step. With mini
+    batches the samples are shuffled every epoch and the parameters are
+    updated after every `accumulate_steps` batches. The accumulated
+    gradients are weighted by the batch sizes, so a step equals one batch
+    with all their samples. The epoch loss is the loss of the whole
+    dataset: batch losses weighted by their sizes (summed for SSE). With
+    `loss_every` > 1 the loss is only computed every `loss_every` epochs and
+    at the last one, the other epochs report NaN. The callbacks see the
+    gradients of the last parameter update of the epoch. Full-batch optimizers
+    with a line search (`Optimizer.needs_closure`, L-BFGS) get the loss of
+    the dataset at trial parameters through `optimizer.closure`.
+    """
+    loss_every = max(1, loss_every)
+    if batch_size is not None:
+        data_loader = DataLoader(dataset, batch_size, True)
+        batch_size = data_loader.batch_size
+        step_size = batch_size * max(1, accumulate_steps)
+        partial_loss = PartialBatchLoss(loss_func)
+    elif optimizer.needs_closure:
+        optimizer.closure = partial(full_batch_loss, net, dataset, loss_func)
+    n_samples = len(dataset)
+
     train_losses = list()
-    for epoch in tqdm(range(epochs)):
+    train_begin(callbacks, net)
+    for epoch in tqdm(range(start_epoch, epochs)):
 
         net.zero_gradients()
-        y_pred = net(X)
-        train_loss = loss_func(y_pred, Y)
-        train_losses.append(train_loss)
+        compute_loss = (epoch + 1) % loss_every == 0 or epoch == epochs - 1
+        if batch_size is None:
+            y_pred = net(dataset.X)
+
+            # compute gradients (and the loss from the same residual)
+            train_loss = net.backward(y_pred, dataset.Y, loss_func, compute_loss)
 
-        # compute gradients
-        net.backward(y_pred, Y, loss_func)
+            # parameters update
+            optimizer.step()
+        else:
+            train_loss = 0 if compute_loss else None
+            for batch_idx, (X, Y) in enumerate(data_loader):
+                n_batch = len(X)
+                start = batch_idx * batch_size
+                step_start = start - start % step_size
+                step_stop = min(n_samples, step_start + step_size)
+
+                # the gradients of the previous step stay readable until here
+                if start == step_start and batch_idx > 0:
+                    net.zero_gradients()
+
+                y_pred = net(X)
+
+                # compute gradients, weighted by the share of the batch in the step
+                partial_loss.set_part(n_batch, step_stop - step_start)
+                batch_loss = net.backward(y_pred, Y, partial_loss, compute_loss)
+                if compute_loss:
+                    train_loss += batch_loss * partial_loss.loss_share(
+                        n_batch, n_samples
+                    )
+
+                # parameters update after the last batch of the step
+                if start + n_batch == step_stop:
+                    optimizer.step()
+
+        if train_loss is None:
+            train_loss = np.nan
+        train_losses.append(train_loss)
 
-        # gradient descent update
-        for layer in net.layers:
-            layer.weights = layer.weights - learning_rate * layer.grad_weights
-            layer.bias = layer.bias - learning_rate * layer.grad_bias
+        if epoch_end(callbacks, net, epoch, train_losses[-1]):
+            break
 
-    print("Train Loss: ", train_loss)
+    if optimizer.needs_closure:
+        optimizer.closure = None
+    train_end(callbacks, net)
+    if train_losses:
+        print("Train Loss: ", train_losses[-1])
     return train_losses
 
 
-def train_net_sgd_mini_batch(
+def full_batch_loss(
+    net: FeedFowardNeuralNetwork, dataset: DatasetNN, loss_func: Module
+) -> float:
+    """Loss of the whole dataset, without touching the backward caches.
+
+    The loss is scaled like the gradients accumulated by `backward`
+    (`Module.gradient_scale`), so a line search compares the loss decrease
+    with the slope of the same function.
+    """
+    y_pred = net.predict(dataset.X)
+    scale = loss_func.gradient_scale(len(dataset), dataset.Y.shape[1])
+    return float(loss_func(y_pred, dataset.Y)) * scale
+
+
+def train_net_sgd(
     net: FeedFowardNeuralNetwork,
     dataset: DatasetNN,
     learning_rate: float,
     epochs: int,
     loss_func: Module,
-    batch_size: int,
+    callbacks: list[TrainCallback] | None = None,
 ):
+    optimizer = SGD(net, learning_rate)
+    return fit(net, dataset, loss_func, optimizer, epochs, None, callbacks)
 
-    data_loader = DataLoader(dataset, batch_size, True)
-    n = len(data_loader)
-    train_losses = list()
-    for epoch in tqdm(range(epochs)):
 
-        train_loss = 0
-        net.zero_gradients()
-        for X, Y in data_loader:
-            y_pred = net(X)
-            train_loss += loss_func(y_pred, Y)
-
-            # compute gradients
-            net.backward(y_pred, Y, loss_func)
-
-        train_losses.append(train_loss / n)  # average loss
-
-        # gradient descent update
-        for layer in net.layers:
-            layer.grad_weights = layer.grad_weights / n
-            layer.grad_bias = layer.grad_bias / n
-
-            layer.weights = layer.weights - learning_rate * layer.grad_weights
-            layer.bias = layer.bias - learning_rate * layer.grad_bias
-
-    print("Train Loss: ", train_loss)
-    return train_losses
+def train_net_sgd_mini_batch(
+    net: FeedFowardNeuralNetwork,
+    dataset: DatasetNN,
+    learning_rate: float,
+    epochs: int,
+    loss_func: Module,
+    batch_size: int,
+    callbacks: list[TrainCallback] | None = None,
+):
+    optimizer = SGD(net, learning_rate)
+    return fit(net, dataset, loss_func, optimizer, epochs, batch_size, callbacks)
 
 
 def train_net_sgd_momentum(
@@ -153,42 +255,10 @@ def train_net_sgd_momentum(
     epochs: int,
     loss_func: Module,
     momentum: float,
+    callbacks: list[TrainCallback] | None = None,
 ):
-
-    X = dataset.X
-    Y = dataset.Y
-
-    # initialize velocity (zeros) for weights and biases for all layers
-    for layer in net.layers:
-        layer.velocity_weights = np.zeros_like(layer.weights)
-        layer.velocity_bias = np.zeros_like(layer.bias)
-
-    train_losses = list()
-    for epoch in tqdm(range(epochs)):
-
-        net.zero_gradients()
-        y_pred = net(X)
-        train_loss = loss_func(y_pred, Y)
-        train_losses.append(train_loss)
-
-        # comoput gradients
-        net.backward(y_pred, Y, loss_func)
-
-        for layer in net.layers:
-            # update velocities
-            layer.velocity_weights = (
-                momentum * layer.velocity_weights + learning_rate * layer.grad_weights
-            )
-            layer.velocity_bias = (
-                momentum * layer.velocity_bias + learning_rate * layer.grad_bias
-            )
-
-            # update parameters
-            layer.weights = layer.weights - layer.velocity_weights
-            layer.bias = layer.bias - layer.velocity_bias
-
-    print("Train Loss: ", train_loss)
-    return train_losses
+    optimizer = SGDMomentum(net, learning_rate, momentum)
+    return fit(net, dataset, loss_func, optimizer, epochs, None, callbacks)
 
 
 def train_net_sgd_momentum_mini_batch(
@@ -199,48 +269,10 @@ def train_net_sgd_momentum_mini_batch(
     loss_func: Module,
     momentum: float,
     batch_size: int,
+    callbacks: list[TrainCallback] | None = None,
 ):
-
-    data_loader = DataLoader(dataset, batch_size, True)
-    n = len(data_loader)
-
-    # initialize velocity (zeros) for weights and biases for all layers
-    for layer in net.layers:
-        layer.velocity_weights = np.zeros_like(layer.weights)
-        layer.velocity_bias = np.zeros_like(layer.bias)
-
-    train_losses = list()
-    for epoch in tqdm(range(epochs)):
-
-        train_loss = 0
-        net.zero_gradients()
-        for X, Y in data_loader:
-            y_pred = net(X)
-            train_loss += loss_func(y_pred, Y)
-
-            # compute gradients ()
-            net.backward(y_pred, Y, loss_func)
-
-        train_losses.append(train_loss / n)  # average loss
-
-        for layer in net.layers:
-            layer.grad_weights = layer.grad_weights / n
-            layer.grad_bias = layer.grad_bias / n
-
-            # update velocities
-            layer.velocity_weights = (
-                momentum * layer.velocity_weights + learning_rate * layer.grad_weights
-            )
-            layer.velocity_bias = (
-                momentum * layer.velocity_bias + learning_rate * layer.grad_bias
-            )
-
-            # update parameters
-            layer.weights = layer.weights - layer.velocity_weights
-            layer.bias = layer.bias - layer.velocity_bias
-
-    print("Train Loss: ", train_loss)
-    return train_losses
+    optimizer = SGDMomentum(net, learning_rate, momentum)
+    return fit(net, dataset, loss_func, optimizer, epochs, batch_size, callbacks)
 
 
 def train_net_adam(
@@ -252,55 +284,10 @@ def train_net_adam(
     beta1: float,
     beta2: float,
     epsilon: float,
+    callbacks: list[TrainCallback] | None = None,
 ):
-    X = dataset.X
-    Y = dataset.Y
-
-    # init momentum and velocites
-    for layer in net.layers:
-        layer.m_weights = np.zeros_like(layer.weights)
-        layer.v_weights = np.zeros_like(layer.weights)
-        layer.m_bias = np.zeros_like(layer.bias)
-        layer.v_bias = np.zeros_like(layer.bias)
-
-    train_losses = list()
-    for epoch in tqdm(range(epochs)):
-
-        net.zero_gradients()
-        y_pred = net(X)
-        train_loss = loss_func(y_pred, Y)
-        train_losses.append(train_loss)
-
-        # compute gradients
-        net.backward(y_pred, Y, loss_func)
-
-        t = epoch + 1  # timestep used for bias correction
-
-        for layer in net.layers:
-            # Update first moment estimate
-            layer.m_weights = beta1 * layer.m_weights + (1 - beta1) * layer.grad_weights
-            layer.m_bias = beta1 * layer.m_bias + (1 - beta1) * layer.grad_bias
-
-            # Update second moment estimate
-            layer.v_weights = beta2 * layer.v_weights + (1 - beta2) * (
-                layer.grad_weights**2
-            )
-            layer.v_bias = beta2 * layer.v_bias + (1 - beta2) * (layer.grad_bias**2)
-
-            # Compute bias-corrected first and second moment estimates
-            m_hat_weights = layer.m_weights / (1 - beta1**t)
-            m_hat_bias = layer.m_bias / (1 - beta1**t)
-            v_hat_weights = layer.v_weights / (1 - beta2**t)
-            v_hat_bias = layer.v_bias / (1 - beta2**t)
-
-            # Update parameters
-            layer.weights -= (
-                learning_rate * m_hat_weights / (np.sqrt(v_hat_weights) + epsilon)
-            )
-            layer.bias -= learning_rate * m_hat_bias / (np.sqrt(v_hat_bias) + epsilon)
-
-    print("Train Loss: ", train_loss)
-    return train_losses
+    optimizer = Adam(net, learning_rate, beta1, beta2, epsilon)
+    return fit(net, dataset, loss_func, optimizer, epochs, None, callbacks)
 
 
 def train_net_adam_mini_batch(
@@ -313,59 +300,7 @@ def train_net_adam_mini_batch(
     beta2: float,
     epsilon: float,
     batch_size: int,
+    callbacks: list[TrainCallback] | None = None,
 ):
-    data_loader = DataLoader(dataset, batch_size, True)
-    n = len(data_loader)
-
-    # init momentum and velocites
-    for layer in net.layers:
-        layer.m_weights = np.zeros_like(layer.weights)
-        layer.v_weights = np.zeros_like(layer.weights)
-        layer.m_bias = np.zeros_like(layer.bias)
-        layer.v_bias = np.zeros_like(layer.bias)
-
-    train_losses = list()
-    for epoch in tqdm(range(epochs)):
-
-        train_loss = 0
-        net.zero_gradients()
-        for X, Y in data_loader:
-            y_pred = net(X)
-            train_loss += loss_func(y_pred, Y)
-
-            # compute gradients ()
-            net.backward(y_pred, Y, loss_func)
-
-        train_losses.append(train_loss / n)  # average loss
-
-        t = epoch + 1  # timestep used for bias correction
-
-        for layer in net.layers:
-            # gradient averaging
-            layer.grad_weights = layer.grad_weights / n
-            layer.grad_bias = layer.grad_bias / n
-
-            # Update first moment estimate
-            layer.m_weights = beta1 * layer.m_weights + (1 - beta1) * layer.grad_weights
-            layer.m_bias = beta1 * layer.m_bias + (1 - beta1) * layer.grad_bias
-
-            # Update second moment estimate
-            layer.v_weights = beta2 * layer.v_weights + (1 - beta2) * (
-                layer.grad_weights**2
-            )
-            layer.v_bias = beta2 * layer.v_bias + (1 - beta2) * (layer.grad_bias**2)
-
-            # Compute bias-corrected first and second moment estimates
-            m_hat_weights = layer.m_weights / (1 - beta1**t)
-            m_hat_bias = layer.m_bias / (1 - beta1**t)
-            v_hat_weights = layer.v_weights / (1 - beta2**t)
-            v_hat_bias = layer.v_bias / (1 - beta2**t)
-
-            # Update parameters
-            layer.weights -= (
-                learning_rate * m_hat_weights / (np.sqrt(v_hat_weights) + epsilon)
-            )
-            layer.bias -= learning_rate * m_hat_bias / (np.sqrt(v_hat_bias) + epsilon)
-
-    print("Train Loss: ", train_loss)
-    return train_losses
+    optimizer = Adam(net, learning_rate, beta1, beta2, epsilon)
+    return fit(net, dataset, loss_func, optimizer, epochs, batch_size, callbacks)
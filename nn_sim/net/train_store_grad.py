@@ -1,8 +1,10 @@
 import numpy as np
-from tqdm import tqdm
-from ..data.dataset_loader import DataLoader, DatasetNN
+from ..data.dataset_loader import DatasetNN
 from .layers import Module
 from .feedfoward import FeedFowardNeuralNetwork
+from .callbacks import TrainCallback
+from .optimizers import Adam
+from .train import fit, attach_scheduler
 
 
 def train_net_adam(
@@ -10,6 +12,9 @@ def train_net_adam(
     dataset: DatasetNN,
     train_params: dict[str, str | int | float],
     loss_func: Module,
+    callbacks: list[TrainCallback] | None = None,
+    optimizer: Adam | None = None,
+    start_epoch: int = 0,
 ):
     optim = train_params["optim"]
     epochs = train_params["epochs"]
@@ -22,6 +27,11 @@ def train_net_adam(
     beta2 = train_params["beta2"]
     epsilon = train_params["epsilon"]
 
+    if optimizer is None:
+        optimizer = Adam(net, learning_rate, beta1, beta2, epsilon)
+    # full batch: one step per epoch
+    callbacks = attach_scheduler(optimizer, train_params, 1, callbacks)
+
     train_loss, gradients = train_net_adam_grads(
         net,
         dataset,
@@ -31,76 +41,55 @@ def train_net_adam(
         beta1,
         beta2,
         epsilon,
+        callbacks,
+        optimizer,
+        start_epoch,
     )
 
     return train_loss, gradients
 
 
-def train_net_adam_grads(
-    net: FeedFowardNeuralNetwork,
-    dataset: DatasetNN,
-    learning_rate: float,
-    epochs: int,
-    loss_func: Module,
-    beta1: float,
-    beta2: float,
-    epsilon: float,
-):
-    X = dataset.X
-    Y = dataset.Y
-
-    # init momentum and velocites
-    for layer in net.layers:
-        layer.m_weights = np.zeros_like(layer.weights)
-        layer.v_weights = np.zeros_like(layer.weights)
-        layer.m_bias = np.zeros_like(layer.bias)
-        layer.v_bias = np.zeros_like(layer.bias)
-
-    gradients = list()
-    train_losses = list()
-    for epoch in tqdm(range(epochs)):
-
-        net.zero_gradients()
-        y_pred = net(X)
-        train_loss = loss_func(y_pred, Y)
-        train_losses.append(train_loss)
+class GradientRecorder(TrainCallback):
+    """Store the absolute gradients (bias as last row) of every epoch."""
 
-        # compute gradients
-        net.backward(y_pred, Y, loss_func)
-
-        t = epoch + 1  # timestep used for bias correction
+    def __init__(self) -> None:
+        self.gradients: list[list[np.ndarray]] = list()
 
+    def on_epoch_end(
+        self, net: FeedFowardNeuralNetwork, epoch: int, train_loss: float
+    ) -> bool:
         epoch_grads = list()
-        gradients.append(epoch_grads)
         for layer in net.layers:
-
             grads = layer.grad_weights
             if layer.bias_active:
                 BIAS_SCALER = 1.0
-                grads = np.row_stack((grads, layer.grad_bias * BIAS_SCALER))
+                grads = np.vstack((grads, layer.grad_bias * BIAS_SCALER))
             epoch_grads.append(np.abs(grads))
+        self.gradients.append(epoch_grads)
+        return False
 
-            # Update first moment estimate
-            layer.m_weights = beta1 * layer.m_weights + (1 - beta1) * layer.grad_weights
-            layer.m_bias = beta1 * layer.m_bias + (1 - beta1) * layer.grad_bias
 
-            # Update second moment estimate
-            layer.v_weights = beta2 * layer.v_weights + (1 - beta2) * (
-                layer.grad_weights**2
-            )
-            layer.v_bias = beta2 * layer.v_bias + (1 - beta2) * (layer.grad_bias**2)
-
-            # Compute bias-corrected first and second moment estimates
-            m_hat_weights = layer.m_weights / (1 - beta1**t)
-            m_hat_bias = layer.m_bias / (1 - beta1**t)
-            v_hat_weights = layer.v_weights / (1 - beta2**t)
-            v_hat_bias = layer.v_bias / (1 - beta2**t)
+def train_net_adam_grads(
+    net: FeedFowardNeuralNetwork,
+    dataset: DatasetNN,
+    learning_rate: float,
+    epochs: int,
+    loss_func: Module,
+    beta1: float,
+    beta2: float,
+    epsilon: float,
+    callbacks: list[TrainCallback] | None = None,
+    optimizer: Adam | None = None,
+    start_epoch: int = 0,
+):
+    if optimizer is None:
+        optimizer = Adam(net, learning_rate, beta1, beta2, epsilon)
 
-            # Update parameters
-            layer.weights -= (
-                learning_rate * m_hat_weights / (np.sqrt(v_hat_weights) + epsilon)
-            )
-            layer.bias -= learning_rate * m_hat_bias / (np.sqrt(v_hat_bias) + epsilon)
+    # the recorder runs first, the gradients are still those of the last step
+    recorder = GradientRecorder()
+    callbacks = [recorder] + list(callbacks or [])
 
-    print("Train Loss: ", train_loss)
-    return train_losses, gradients
+    train_losses = fit(
+        net, dataset, loss_func, optimizer, epochs, None, callbacks, start_epoch
+    )
+    return train_losses, recorder.gradients
@@ -1,5 +1,16 @@
 import numpy as np
 
+from .feedfoward import FeedFowardNeuralNetwork
+from .layers import (
+    Module,
+    BinaryCrossEntropyLoss,
+    CategoricalCrossEntropyLoss,
+    SSELoss,
+    MSELoss,
+    MAELoss,
+    get_activation_function_by_name,
+)
+
 
 def convert_class_to_1_hot_encoding(labels, n_classes):
     """
@@ -19,3 +30,39 @@ def convert_class_to_1_hot_encoding(labels, n_classes):
     k_hot_encoded = np.eye(n_classes)[labels]
 
     return k_hot_encoded
+
+
+def get_loss_function_by_name(name: str) -> Module:
+    if name == "Sum of Squared Errors":
+        return SSELoss()
+    if name == "Binary Cross Entropy Loss (log-loss)":
+        return BinaryCrossEntropyLoss()
+    if name == "Mean Squared Error (MSE)":
+        return MSELoss()
+    if name == "Mean Absolute Error (MAE)":
+        return MAELoss()
+    if name == "Categorical Cross Entropy":
+        return CategoricalCrossEntropyLoss()
+    raise AttributeError(f"{name} is not a valid loss function.")
+
+
+def create_net(model_info: dict):
+    n_outputs = model_info["arch_n_outputs"]
+    n_inputs = model_info["arch_n_inputs"]
+    n_hidden = model_info["arch_n_hidden"]
+    hidden_layers = model_info["hidden_layers"]
+
+    layers = []
+    for idx in range(n_hidden):
+        n_neurons = hidden_layers[f"layer_n_neurons_{idx:04d}"]
+        has_bias = hidden_layers[f"layer_bias_{idx:04d}"]
+        name_act = hidden_layers[f"layer_activation_function_{idx:04d}"]
+        activation_function = get_activation_function_by_name(name_act)
+        layers.append((n_neurons, has_bias, activation_function))
+
+    has_bias = model_info["arch_output_bias"]
+    name_act = model_info["arch_output_activation_function"]
+    activation_function = get_activation_function_by_name(name_act)
+    layers.append((n_outputs, has_bias, activation_function))
+    net = FeedFowardNeuralNetwork(n_inputs, layers)
+    return net
@@ -6,6 +6,7 @@
 
 
 from typing import Any, Optional, Tuple, List, Union, Callable, Final, Dict
+from contextlib import contextmanager
 import copy
 
 # basic functions
@@ -513,6 +514,10 @@ class PropertyModel:
         self._listener: PropertyModelListener = listener
         self._items: List[PropertyGroupModel] = list()
         self._property_items: List[PropertyItemModel] = list()  # faster iteration
+        # id -> group or property item, the first one of duplicated ids
+        self._index: Dict[str, Union[PropertyGroupModel, PropertyItemModel]] = dict()
+        self._batch_depth: int = 0
+        self._batch_changed: bool = False
 
         for params in params["property_model"]:
             item = PropertyGroupModel(listener, params)
@@ -526,44 +531,91 @@ class PropertyModel:
     def get_property_items(self, update=True) -> List[PropertyItemModel]:
         if update:
             self._property_items = list()
+            self._index = dict()
             for item in self._items:
                 self._property_items += item.get_property_items()
+                self._index_item(item)
         return self._property_items
 
+    def _index_item(self, item: Union[PropertyGroupModel, PropertyItemModel]) -> None:
+        self._index.setdefault(item.get_id(), item)
+        if isinstance(item, PropertyGroupModel):
+            for sub_item in item.get_items():
+                self._index_item(sub_item)
+
+    @staticmethod
+    def _subtree(
+        item: Union[PropertyGroupModel, PropertyItemModel]
+    ) -> List[Union[PropertyGroupModel, PropertyItemModel]]:
+        out: list = [item]
+        if isinstance(item, PropertyGroupModel):
+            for sub_item in item.get_items():
+                out += PropertyModel._subtree(sub_item)
+        return out
+
+    # batched updates
+
+    @contextmanager
+    def batch_update(self):
+        """
+        Coalesce the listener events of the changes made in the block:
+        instead of an on_property_item_changed per value set, the listener
+        gets a single on_property_model_changed at the end (if anything
+        changed). The specific listeners (tree items) are still notified.
+
+        with property_model.batch_update():
+            property_model.set_value_by_property_id("a", 1)
+            property_model.set_value_by_property_id("b", 2)
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._batch_changed:
+                self._batch_changed = False
+                self._listener.on_property_model_changed(self)
+
+    def _notify_model_changed(self) -> None:
+        if self._batch_depth > 0:
+            self._batch_changed = True
+        else:
+            self._listener.on_property_model_changed(self)
+
+    def _set_item_value(self, item: PropertyItemModel, value: Any, kargs) -> bool:
+        if self._batch_depth == 0:
+            return item.set_value(value, **kargs)
+
+        trigger_event = kargs.get("trigger_event", True)
+        kargs = dict(kargs)
+        kargs["trigger_event"] = False
+        changed = item.set_value(value, **kargs)
+        if changed and trigger_event:
+            self._batch_changed = True
+        return changed
+
     def set_value_by_property_id(self, property_id: str, value: Any, **kargs) -> bool:
         assert isinstance(property_id, str) and len(property_id) > 0
-        item: Optional[PropertyItemModel] = None
-        for item_prop in self._property_items:
-            if item_prop.get_id() == property_id:
-                item = item_prop
+        item = self._index.get(property_id, None)
 
-        if item is None:
+        if not isinstance(item, PropertyItemModel):
             self._listener.on_message("ERROR", "Item %s not found." % property_id)
             return False
 
-        return item.set_value(value, **kargs)
+        return self._set_item_value(item, value, kargs)
 
     def get_item_by_id(
         self, item_id: str
     ) -> Optional[Union[PropertyItemModel, PropertyGroupModel]]:
         assert isinstance(item_id, str) and len(item_id) > 0
-
-        for item_group in self._items:
-            if item_group.get_id() == item_id:
-                return item_group
-
-        for item_prop in self._property_items:
-            if item_prop.get_id() == item_id:
-                return item_prop
-
-        return None
+        return self._index.get(item_id, None)
 
     def get_value_by_property_id(self, property_id: str) -> Any:
         assert isinstance(property_id, str) and len(property_id) > 0
 
-        for item_prop in self._property_items:
-            if item_prop.get_id() == property_id:
-                return item_prop.get_value()
+        item = self._index.get(property_id, None)
+        if isinstance(item, PropertyItemModel):
+            return item.get_value()
 
         return None
 
@@ -574,10 +626,65 @@ class PropertyModel:
         return out
 
     def update_values(self, values: dict, **kargs) -> None:
-        for key in values:
-            for item_prop in self._property_items:
-                if item_prop.get_id() == key:
-                    item_prop.set_value(values[key], **kargs)
+        """
+        Set the values of the known property ids (others are ignored) in a
+        batch: a single on_property_model_changed event, none when
+        trigger_event=False.
+        """
+        with self.batch_update():
+            for key in values:
+                item = self._index.get(key, None)
+                if isinstance(item, PropertyItemModel):
+                    self._set_item_value(item, values[key], kargs)
+
+    # groups
+
+    def add_group(self, params: dict) -> Optional[PropertyGroupModel]:
+        """
+        Append a top level group, with its items, from a params dict like the
+        ones of "property_model".
+        """
+        group_model = PropertyGroupModel(self._listener, params)
+        for item in self._subtree(group_model):
+            if item.get_id() in self._index:
+                self._listener.on_message(
+                    "ERROR", "ID '%s' already exists." % item.get_id()
+                )
+                return None
+
+        self._items.append(group_model)
+        self._property_items += group_model.get_property_items()
+        self._index_item(group_model)
+        self._notify_model_changed()
+        return group_model
+
+    def remove_group(self, group_id: str) -> bool:
+        """
+        Remove a group (top level or sub group) with its items.
+        """
+        group_model = self._index.get(group_id, None)
+        if not isinstance(group_model, PropertyGroupModel):
+            self._listener.on_message("ERROR", "Group %s not found." % group_id)
+            return False
+
+        if group_model in self._items:
+            self._items.remove(group_model)
+        else:
+            for group in self.get_groups():
+                if group_model in group.get_items():
+                    group.get_items().remove(group_model)
+                    break
+
+        removed = self._subtree(group_model)
+        removed_ids = set(id(item) for item in removed)
+        for item in removed:
+            if self._index.get(item.get_id(), None) is item:
+                del self._index[item.get_id()]
+        self._property_items = [
+            item for item in self._property_items if id(item) not in removed_ids
+        ]
+        self._notify_model_changed()
+        return True
 
     def get_model_dict(self) -> dict:
         out: dict = dict()
@@ -642,30 +749,30 @@ class PropertyModel:
         assert isinstance(group_id, str) and len(group_id) > 0
         assert isinstance(group_name, str) and len(group_name) > 0
 
-        groups = self.get_groups()
-        for group in groups:
-            if group.get_id() == group_id:
-                self._listener.on_message(
-                    "ERROR", "Group ID '%s' already exists." % group_id
-                )
-                return None
+        if group_id in self._index:
+            self._listener.on_message(
+                "ERROR", "Group ID '%s' already exists." % group_id
+            )
+            return None
 
         params = {"id": group_id, "name": group_name, "options": {"group": True}}
 
         if isinstance(parent_group, str):
             assert len(parent_group) > 0
-            for group in groups:
-                if group.get_id() == parent_group:
-                    group._add_item_by_params_dict(params)
+            parent_group = self._index.get(parent_group, None)
+            if not isinstance(parent_group, PropertyGroupModel):
+                return None
 
-        elif isinstance(parent_group, PropertyGroupModel):
+        if isinstance(parent_group, PropertyGroupModel):
             group_model = parent_group._add_item_by_params_dict(params)
             if isinstance(group_model, PropertyGroupModel):
+                self._index_item(group_model)
                 return group_model
             return None
 
         group_model = PropertyGroupModel(self._listener, params)
         self._items.append(group_model)
+        self._index_item(group_model)
 
         return group_model
 
@@ -707,11 +814,7 @@ class PropertyModel:
         return params
 
     def check_property_id_exists(self, prop_id: str) -> bool:
-        prop_items = self.get_property_items(False)
-        for prop_item in prop_items:
-            if prop_item.get_id() == prop_id:
-                return True
-        return False
+        return isinstance(self._index.get(prop_id, None), PropertyItemModel)
 
     def create_text_property(
         self,
@@ -750,8 +853,8 @@ class PropertyModel:
         item = group_model._add_item_by_params_dict(params)
 
         if isinstance(item, PropertyItemModel):
-            self.get_property_items(True)  # update property item list
-            self._listener.on_property_model_changed(self)
+            self.get_property_items(True)  # update property item list and index
+            self._notify_model_changed()
             return item
 
         return None
@@ -793,8 +896,8 @@ class PropertyModel:
         item = group_model._add_item_by_params_dict(params)
 
         if isinstance(item, PropertyItemModel):
-            self.get_property_items(True)  # update property item list
-            self._listener.on_property_model_changed(self)
+            self.get_property_items(True)  # update property item list and index
+            self._notify_model_changed()
             return item
 
         return None
@@ -822,8 +925,8 @@ class PropertyModel:
         item = group_model._add_item_by_params_dict(params)
 
         if isinstance(item, PropertyItemModel):
-            self.get_property_items(True)  # update property item list
-            self._listener.on_property_model_changed(self)
+            self.get_property_items(True)  # update property item list and index
+            self._notify_model_changed()
             return item
 
         return None
@@ -865,8 +968,8 @@ class PropertyModel:
         item = group_model._add_item_by_params_dict(params)
 
         if isinstance(item, PropertyItemModel):
-            self.get_property_items(True)  # update property item list
-            self._listener.on_property_model_changed(self)
+            self.get_property_items(True)  # update property item list and index
+            self._notify_model_changed()
             return item
 
         return None
@@ -901,8 +1004,8 @@ class PropertyModel:
         item = group_model._add_item_by_params_dict(params)
 
         if isinstance(item, PropertyItemModel):
-            self.get_property_items(True)  # update property item list
-            self._listener.on_property_model_changed(self)
+            self.get_property_items(True)  # update property item list and index
+            self._notify_model_changed()
             return item
 
         return None
@@ -937,8 +1040,8 @@ class PropertyModel:
         item = group_model._add_item_by_params_dict(params)
 
         if isinstance(item, PropertyItemModel):
-            self.get_property_items(True)  # update property item list
-            self._listener.on_property_model_changed(self)
+            self.get_property_items(True)  # update property item list and index
+            self._notify_model_changed()
             return item
 
         return None
@@ -966,8 +1069,8 @@ class PropertyModel:
         item = group_model._add_item_by_params_dict(params)
 
         if isinstance(item, PropertyItemModel):
-            self.get_property_items(True)  # update property item list
-            self._listener.on_property_model_changed(self)
+            self.get_property_items(True)  # update property item list and index
+            self._notify_model_changed()
             return item
 
         return None
@@ -999,8 +1102,8 @@ class PropertyModel:
         item = group_model._add_item_by_params_dict(params)
 
         if isinstance(item, PropertyItemModel):
-            self.get_property_items(True)  # update property item list
-            self._listener.on_property_model_changed(self)
+            self.get_property_items(True)  # update property item list and index
+            self._notify_model_changed()
             return item
 
         return None
@@ -1031,8 +1134,8 @@ class PropertyModel:
         item = group_model._add_item_by_params_dict(params)
 
         if isinstance(item, PropertyItemModel):
-            self.get_property_items(True)  # update property item list
-            self._listener.on_property_model_changed(self)
+            self.get_property_items(True)  # update property item list and index
+            self._notify_model_changed()
             return item
 
         return None
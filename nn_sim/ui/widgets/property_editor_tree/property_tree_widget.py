@@ -86,10 +86,27 @@ class PropertyTreeWidget(QTreeWidget):
                 self.addTopLevelItem(tree_item)
                 tree_item.setExpanded(True)
 
+        self.resize_columns()
+
+    def resize_columns(self) -> None:
         self.resizeColumnToContents(0)
         self.resizeColumnToContents(2)
         self.resizeColumnToContents(3)
 
+    def add_group_item(self, group_model: PropertyGroupModel) -> None:
+        """Append the tree item of a group added to the model (add_group)."""
+        tree_item = PropertyGroupTreeItemWidget(self, group_model)
+        self.addTopLevelItem(tree_item)
+        tree_item.setExpanded(True)
+
+    def remove_group_item(self, group_id: str) -> None:
+        """Remove the tree item of a top level group removed from the model."""
+        for idx in range(self.topLevelItemCount() - 1, -1, -1):
+            tree_item = self.topLevelItem(idx)
+            if tree_item.property_group_model.get_id() == group_id:
+                self.takeTopLevelItem(idx)
+                return
+
     def update_values(self, values) -> None:
         if isinstance(self.property_model, PropertyModel):
             self.property_model.update_values(values)
@@ -2,14 +2,77 @@ import numpy as np
 import pyqtgraph as pg
 from ..helpers import uihelper as dc
 
+# One bar per value stops being readable (and fast) on wide layers: above
+# AGGREGATE_THRESHOLD values a layer is drawn as a fixed number of bars, the
+# per-neuron statistics of a 2-D layer (mean bar, min/max whiskers, one bar
+# per column) when it has at most MAX_NEURON_BARS neurons, otherwise a
+# histogram of HISTOGRAM_BINS bins.
+
+AGGREGATE_THRESHOLD = 2048
+MAX_NEURON_BARS = 256
+HISTOGRAM_BINS = 64
+
+MODES = ("auto", "bars", "neurons", "histogram")
+STATISTICS = ("mean", "abs_mean")
+
+
+def neuron_statistics(array: np.ndarray) -> dict[str, np.ndarray]:
+    """Mean, absolute mean, min and max of every column (neuron)."""
+    array = np.reshape(array, (-1, array.shape[-1]))
+    return dict(
+        mean=array.mean(axis=0),
+        abs_mean=np.abs(array).mean(axis=0),
+        min=array.min(axis=0),
+        max=array.max(axis=0),
+    )
+
+
+def histogram(array: np.ndarray, bins: int) -> tuple[np.ndarray, np.ndarray, float]:
+    """Counts of the finite values.
+
+    Returns:
+        tuple: (bin centers, counts, bin width)
+    """
+    values = np.ravel(array)
+    values = values[np.isfinite(values)]
+    if len(values) == 0:
+        return np.zeros(0), np.zeros(0), 1.0
+    counts, edges = np.histogram(values, bins=bins)
+    width = edges[1] - edges[0]
+    if width == 0.0:  # all the values are equal
+        width = 1.0
+    return (edges[:-1] + edges[1:]) / 2.0, counts, width
+
 
 class BarPlotWidget(dc.QWidget):
+    """One bar plot per layer.
 
-    def __init__(self, inputs_as_first_layer=False) -> None:
+    Args:
+        inputs_as_first_layer: the first array is the input layer.
+        mode: "bars" (one bar per value), "neurons" (statistics per column),
+            "histogram", or "auto" to choose by size (see AGGREGATE_THRESHOLD).
+        statistic: height of the neuron bars, "mean" or "abs_mean".
+    """
+
+    def __init__(
+        self,
+        inputs_as_first_layer=False,
+        mode: str = "auto",
+        statistic: str = "mean",
+        threshold: int = AGGREGATE_THRESHOLD,
+        bins: int = HISTOGRAM_BINS,
+    ) -> None:
         super().__init__()
         self.inputs_as_first_layer = inputs_as_first_layer
+        self.mode: str = mode
+        self.statistic: str = statistic
+        self.threshold: int = threshold
+        self.bins: int = bins
         self.graph_widget = pg.GraphicsLayoutWidget()
         self.plot_items = []
+        self.bar_items: list[pg.BarGraphItem] = []
+        self.range_items: list[pg.ErrorBarItem] = []
+        self._linked: bool = True
         dc.Widget(
             widget=self,
             layout=dc.Rows(
@@ -18,33 +81,68 @@ class BarPlotWidget(dc.QWidget):
             ),
         )
 
+    def set_mode(self, mode: str, statistic: str | None = None) -> None:
+        if mode not in MODES:
+            raise ValueError(f"Unknown bar plot mode: {mode}")
+        self.mode = mode
+        if statistic is not None:
+            if statistic not in STATISTICS:
+                raise ValueError(f"Unknown statistic: {statistic}")
+            self.statistic = statistic
+
     def set_plot_count(self, n: int):
         current_count = len(self.plot_items)
         while current_count < n:
             layer_name = f"Layer {current_count}"
             plot = self.graph_widget.addPlot(title=layer_name)
-            if current_count > 0:
+            if current_count > 0 and self._linked:
                 plot.setYLink(self.plot_items[0])
             if current_count == 0:  # Set y-axis label only for the first plot
                 plot.setLabel("left", "Value")
+            bars = pg.BarGraphItem(x=[], height=[], width=0.6, brush="b")
+            ranges = pg.ErrorBarItem(x=np.zeros(0), y=np.zeros(0), pen="w")
+            plot.addItem(bars)
+            plot.addItem(ranges)
             self.plot_items.append(plot)
+            self.bar_items.append(bars)
+            self.range_items.append(ranges)
             current_count += 1
         while current_count > n:
             plot = self.plot_items.pop()
+            self.bar_items.pop()
+            self.range_items.pop()
             self.graph_widget.ci.removeItem(plot)
             current_count -= 1
 
+    def layer_mode(self, array: np.ndarray) -> str:
+        if self.mode != "auto":
+            return self.mode
+        if array.size <= self.threshold:
+            return "bars"
+        if array.ndim == 2 and len(array) > 1 and array.shape[1] <= MAX_NEURON_BARS:
+            return "neurons"
+        return "histogram"
+
+    def _link_y_axes(self, linked: bool) -> None:
+        # counts and values do not share an axis: link only one bar per value
+        if linked == self._linked:
+            return
+        self._linked = linked
+        for plot in self.plot_items[1:]:
+            plot.setYLink(self.plot_items[0] if linked else None)
+
     def update_plots(self, data: list[np.ndarray]) -> None:
         if len(data) != len(self.plot_items):
             self.set_plot_count(len(data))
 
-        for idx, array in enumerate(data):
-            plot_item = self.plot_items[idx]
+        modes = [self.layer_mode(np.asarray(array)) for array in data]
+        self._link_y_axes(all(mode == "bars" for mode in modes))
 
-            array = array.flatten()
-            bg = pg.BarGraphItem(
-                x=np.arange(len(array)), height=array, width=0.6, brush="b"
-            )
+        for idx, (array, mode) in enumerate(zip(data, modes)):
+            plot_item = self.plot_items[idx]
+            bars = self.bar_items[idx]
+            ranges = self.range_items[idx]
+            array = np.asarray(array)
 
             if self.inputs_as_first_layer:
                 if idx == 0:
@@ -54,6 +152,30 @@ class BarPlotWidget(dc.QWidget):
             else:
                 layer_name = f"Layer {idx}"
 
-            plot_item.clear()
-            plot_item.addItem(bg)
+            no_ranges = np.zeros(0)
+            if mode == "histogram":
+                centers, counts, width = histogram(array, self.bins)
+                bars.setOpts(x=centers, height=counts, width=width * 0.9)
+                ranges.setData(x=no_ranges, y=no_ranges, top=None, bottom=None)
+                layer_name += f" (histogram of {array.size} values)"
+            elif mode == "neurons":
+                if array.ndim < 2:
+                    array = np.reshape(array, (1, -1))
+                stats = neuron_statistics(array)
+                x = np.arange(len(stats["mean"]))
+                height = stats[self.statistic]
+                bars.setOpts(x=x, height=height, width=0.6)
+                ranges.setData(
+                    x=x,
+                    y=height,
+                    top=stats["max"] - height,
+                    bottom=height - stats["min"],
+                    beam=0.3,
+                )
+                layer_name += f" ({self.statistic} per neuron, min/max)"
+            else:
+                array = array.flatten()
+                bars.setOpts(x=np.arange(len(array)), height=array, width=0.6)
+                ranges.setData(x=no_ranges, y=no_ranges, top=None, bottom=None)
+
             plot_item.setTitle(layer_name)
@@ -1,6 +1,13 @@
+import threading
+
+from PySide6.QtWidgets import QProgressBar
+
 from ..helpers import uihelper as dc
 
-from ...data.dataset_loader import DatasetNN
+from ...data.dataset_loader import DatasetNN, LoadCancelled
+from ...data.dataset_cache import DatasetCache
+
+LOADING_STAGES = {"hash": "Checking", "parse": "Loading"}
 
 
 class DatasetWidget(dc.QWidget):
@@ -33,6 +40,23 @@ class DatasetWidget(dc.QWidget):
 
         self.sample_index = 0
 
+        # the file is hashed and parsed in a thread, polled by a timer
+        self.dataset_cache = DatasetCache()
+        self.load_thread: threading.Thread | None = None
+        self.load_result: DatasetNN | Exception | None = None
+        self.load_progress: tuple[str, int, int] = ("hash", 0, 0)
+        self._load_cancel = threading.Event()
+        self.timer_loading = dc.Timer(interval_ms=50, on_timeout=self.poll_loading)
+        self.progress_loading = QProgressBar()
+        self.progress_loading.setRange(0, 1000)
+        self.progress_loading.setVisible(False)
+        self.btn_cancel_loading = dc.Button(
+            "Cancel",
+            on_click=self.cancel_loading,
+            icon=dc.IconM("ma-cancel-black", color=(255, 0, 0, 255)),
+        )
+        self.btn_cancel_loading.setVisible(False)
+
         dc.Widget(
             widget=self,
             layout=dc.Columns(
@@ -42,6 +66,7 @@ class DatasetWidget(dc.QWidget):
                     icon=dc.IconM("ma-file-open-black", color=(255, 255, 0, 255)),
                     on_click=self.select_dataset,
                 ),
+                dc.Rows(self.progress_loading, self.btn_cancel_loading),
                 self.txt_name,
                 self.txt_n_inputs,
                 self.txt_n_outputs,
@@ -89,7 +114,76 @@ class DatasetWidget(dc.QWidget):
         if not file_path:
             return
 
-        self.dataset = DatasetNN(file_path)
+        self.cancel_loading()
+        self.wait_loading()
+
+        cancel = threading.Event()
+        self._load_cancel = cancel
+        self.load_result = None
+        self.load_progress = ("hash", 0, 0)
+        self.load_thread = threading.Thread(
+            target=self.run_loading, args=(file_path, cancel), daemon=True
+        )
+        self.progress_loading.setValue(0)
+        self.progress_loading.setFormat(f"{LOADING_STAGES['hash']} %p%")
+        self.progress_loading.setVisible(True)
+        self.btn_cancel_loading.setVisible(True)
+        self.load_thread.start()
+        self.timer_loading.start()
+
+    def is_loading(self) -> bool:
+        return self.load_thread is not None
+
+    def run_loading(self, file_path: str, cancel: threading.Event) -> None:
+        """Body of the loading thread, it must not touch the widgets."""
+
+        def progress(stage: str, n_read: int, total: int) -> None:
+            self.load_progress = (stage, n_read, total)
+
+        try:
+            self.load_result = self.dataset_cache.load(
+                file_path, progress, cancel.is_set
+            )
+        except Exception as error:
+            self.load_result = error
+
+    def cancel_loading(self) -> None:
+        self._load_cancel.set()
+
+    def wait_loading(self) -> None:
+        """Block until the loading thread ends, then show its dataset."""
+        if self.is_loading():
+            self.load_thread.join()
+            self.finish_loading()
+
+    def poll_loading(self) -> None:
+        if not self.is_loading():
+            return
+        if not self.load_thread.is_alive():
+            self.finish_loading()
+            return
+        stage, n_read, total = self.load_progress
+        self.progress_loading.setFormat(f"{LOADING_STAGES[stage]} %p%")
+        self.progress_loading.setValue(int(1000 * n_read / max(total, 1)))
+
+    def finish_loading(self) -> None:
+        self.timer_loading.stop()
+        self.load_thread.join()
+        self.load_thread = None
+        self.progress_loading.setVisible(False)
+        self.btn_cancel_loading.setVisible(False)
+
+        result = self.load_result
+        self.load_result = None
+        if isinstance(result, LoadCancelled):
+            return
+        if isinstance(result, Exception):
+            dc.Error("Dataset Loading Failed", str(result), self)
+            return
+        self.set_dataset(result)
+
+    def set_dataset(self, dataset: DatasetNN) -> None:
+        self.dataset = dataset
         self.sample_index = 0
 
         self.txt_name.setText(f"<b>Name:</b> {self.dataset.dataset_name}")
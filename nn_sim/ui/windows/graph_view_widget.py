@@ -1,3 +1,6 @@
+import time
+from collections import deque
+
 from ..helpers import uihelper as dc
 import numpy as np
 import cv2
@@ -8,6 +11,8 @@ from PySide6.QtWidgets import (
     QGraphicsLineItem,
     QGraphicsEllipseItem,
     QGraphicsPathItem,
+    QGraphicsItem,
+    QToolTip,
 )
 
 # from PySide6.QtOpenGLWidgets import QOpenGLWidget
@@ -15,34 +20,140 @@ from PySide6.QtCore import Qt
 from PySide6.QtGui import QColor, QBrush, QPen, QPainter, QSurfaceFormat
 
 from PySide6.QtGui import QPen, QPainterPath, QLinearGradient, QColor, QBrush, QPainter
-from PySide6.QtCore import Qt, QTimer, QPointF
+from PySide6.QtCore import Qt, QTimer, QPointF, QElapsedTimer
+
+FLOW_PULSE_LENGTH = 0.25  # fraction of the edge
+FLOW_WIDTH = 8
+FLOW_COLOR = QColor(255, 255, 255, 255)
 
 
 class FlowingLineItem(QGraphicsPathItem):
-    def __init__(self, start_point, end_point):
+    """Edge with a pulse moving from its start to its end point.
+
+    The items have no timer: the phase (position of the pulse, negative when
+    the edge is idle) is set by the `FlowAnimation` of the view.
+    """
+
+    def __init__(self, start_point, end_point, color=FLOW_COLOR):
         super().__init__()
         path = QPainterPath(start_point)
         path.lineTo(end_point)
         self.setPath(path)
-        self.gradient = QLinearGradient(start_point, end_point)
-        self.gradient.setColorAt(0.0, Qt.red)
-        self.gradient.setColorAt(1.0, Qt.blue)
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_gradient)
-        self.timer.start(20)  # Update every 100 ms
-
-    def update_gradient(self):
-        # Shift the gradient
-        new_stops = [
-            ((stop[0] + 0.01) % 1.0, stop[1]) for stop in self.gradient.stops()
-        ]
-        self.gradient.setStops(new_stops)
-        self.update()  # Trigger a repaint
+        self.start_point = QPointF(start_point)
+        self.end_point = QPointF(end_point)
+        self.color = QColor(color)
+        self.transparent = QColor(color)
+        self.transparent.setAlpha(0)
+        # the bounding rect (the area repainted by update()) covers the pulse
+        self.setPen(QPen(self.color, FLOW_WIDTH))
+        self.phase = -1.0
+
+    def point_at(self, t: float) -> QPointF:
+        return self.start_point + (self.end_point - self.start_point) * t
 
     def paint(self, painter, option, widget=None):
-        painter.setBrush(QBrush(self.gradient))
-        painter.setPen(QPen(QBrush(self.gradient), 2))
-        painter.drawPath(self.path())
+        if self.phase < 0.0:
+            return
+        tail = self.point_at(max(0.0, self.phase - FLOW_PULSE_LENGTH))
+        head = self.point_at(self.phase)
+        gradient = QLinearGradient(tail, head)
+        gradient.setColorAt(0.0, self.transparent)
+        gradient.setColorAt(1.0, self.color)
+        painter.setPen(QPen(QBrush(gradient), FLOW_WIDTH))
+        painter.drawLine(tail, head)
+
+
+class FlowAnimation:
+    """Scene level clock of the forward pass animation of a graph view.
+
+    A pulse crosses the edges of one layer after the other, `layer_duration`
+    seconds per layer. On every tick the phases of all the edges are
+    computed at once and only the visible edges whose phase changed are
+    repainted.
+    """
+
+    def __init__(
+        self,
+        view: QGraphicsView,
+        interval_ms: int = 33,
+        layer_duration: float = 0.8,
+    ) -> None:
+        self.view = view
+        self.layer_duration: float = layer_duration
+        self.items: list[FlowingLineItem] = []
+        self.layer_index = np.zeros(0)
+        self.bounds = np.zeros((0, 4))  # x_min, y_min, x_max, y_max
+        self.phases = np.zeros(0)
+        self.clock = QElapsedTimer()
+        self.timer = QTimer()
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self.tick)
+
+    def set_edges(self, items: list[FlowingLineItem], layer_index: list[int]) -> None:
+        self.items = items
+        self.layer_index = np.asarray(layer_index, dtype=np.float64)
+        self.bounds = np.array(
+            [
+                (
+                    min(item.start_point.x(), item.end_point.x()),
+                    min(item.start_point.y(), item.end_point.y()),
+                    max(item.start_point.x(), item.end_point.x()),
+                    max(item.start_point.y(), item.end_point.y()),
+                )
+                for item in items
+            ]
+        ).reshape(-1, 4)
+        self.phases = np.full(len(items), -1.0)
+
+    def is_running(self) -> bool:
+        return self.timer.isActive()
+
+    def start(self) -> None:
+        self.clock.start()
+        self.timer.start()
+
+    def pause(self) -> None:
+        """Stop the ticks, the clock keeps running."""
+        self.timer.stop()
+
+    def resume(self) -> None:
+        if not self.clock.isValid():
+            self.clock.start()
+        self.timer.start()
+
+    def stop(self) -> None:
+        self.timer.stop()
+        for item in self.items:
+            if item.phase >= 0.0:
+                item.phase = -1.0
+                item.update()
+        self.phases[:] = -1.0
+
+    def tick(self) -> None:
+        if len(self.items) == 0:
+            return
+        n_layers = self.layer_index[-1] + 1
+        t = (self.clock.elapsed() / 1000.0 / self.layer_duration) % n_layers
+        local = t - self.layer_index
+        phases = np.where((local >= 0.0) & (local < 1.0), local, -1.0)
+
+        visible = self.view.mapToScene(self.view.viewport().rect()).boundingRect()
+        margin = FLOW_WIDTH
+        in_view = (
+            (self.bounds[:, 2] >= visible.left() - margin)
+            & (self.bounds[:, 0] <= visible.right() + margin)
+            & (self.bounds[:, 3] >= visible.top() - margin)
+            & (self.bounds[:, 1] <= visible.bottom() + margin)
+        )
+        changed = in_view & ((phases >= 0.0) | (self.phases >= 0.0))
+        indexes = np.flatnonzero(changed)
+        if len(indexes) == 0:
+            return
+        for idx, phase in zip(indexes.tolist(), phases[indexes].tolist()):
+            item = self.items[idx]
+            item.phase = phase
+            item.update()
+        self.phases[indexes] = phases[indexes]
 
 
 NEURON_SIZE = 50
@@ -89,6 +200,22 @@ def create_circle(
     return circle
 
 
+# interactive rendering: while panning or zooming the antialiasing is off and,
+# above INTERACTION_MAX_EDGES edges, the edges are hidden; full quality is
+# restored INTERACTION_IDLE_MS after the last pan or zoom event
+INTERACTION_IDLE_MS = 250
+INTERACTION_MAX_EDGES = 1000
+FRAME_HISTORY = 240
+
+
+def create_layer_root(z_value: float) -> QGraphicsItem:
+    """Invisible parent item, shows or hides all its children at once."""
+    root = QGraphicsPathItem()
+    root.setFlag(QGraphicsItem.ItemHasNoContents)
+    root.setZValue(z_value)
+    return root
+
+
 def create_line(x1, y1, x2, y2, pen, z_value: int = 9) -> QGraphicsLineItem:
     line = QGraphicsLineItem(x1, y1, x2, y2)
     line.setPen(pen)
@@ -96,13 +223,182 @@ def create_line(x1, y1, x2, y2, pen, z_value: int = 9) -> QGraphicsLineItem:
     return line
 
 
+# hover/click inspection: the item under the cursor is found from the layout
+# of `update_graph` (columns HORIZONTAL_DISTANCE apart, neurons
+# VERTICAL_DISTANCE apart) instead of Qt item hit-testing. A point between two
+# columns is on the edge i -> j where the straight line from source i crosses
+# the point, solved for j (or for i near the source column), so a query costs
+# O(inputs + outputs) whatever the number of edges.
+INSPECT_TOLERANCE = 4  # pixels
+
+
+class GraphLayoutIndex:
+    """Neurons and edges of the graph layout, looked up by scene position.
+
+    Args:
+        layers: number of neurons of every column, inputs first.
+        biases: bias of the layer fed by every column (no bias for the last).
+    """
+
+    def __init__(self, layers: list[int], biases: list[bool]) -> None:
+        self.layers: list[int] = list(layers)
+        self.x = np.arange(len(layers)) * float(HORIZONTAL_DISTANCE) + NEURON_SIZE_2
+        # center of the first neuron of every column
+        self.y0 = np.array(
+            [-n * VERTICAL_DISTANCE / 2.0 + NEURON_SIZE_2 for n in layers]
+        )
+        # center of the bias circle of every column, or None
+        self.bias_centers: list[tuple[float, float] | None] = list()
+        for idx, n_neurons in enumerate(layers):
+            if idx < len(layers) - 1 and idx < len(biases) and biases[idx]:
+                self.bias_centers.append(
+                    (
+                        self.x[idx] + NEURON_SIZE * 2,
+                        self.y0[idx] + n_neurons * VERTICAL_DISTANCE,
+                    )
+                )
+            else:
+                self.bias_centers.append(None)
+
+    def neuron_center(self, layer: int, index: int) -> tuple[float, float]:
+        return self.x[layer], self.y0[layer] + index * VERTICAL_DISTANCE
+
+    def edge_points(self, layer: int, source: int | None, target: int):
+        """End points of an edge, `source` None for the bias edges."""
+        if source is None:
+            start = self.bias_centers[layer]
+        else:
+            start = self.neuron_center(layer, source)
+        return start, self.neuron_center(layer + 1, target)
+
+    def find(self, x: float, y: float, tolerance: float = 0.0) -> dict | None:
+        """Item at the scene position: neurons over bias circles over edges.
+
+        Returns:
+            dict: "kind" ("neuron", "bias" or "edge") and "layer" (column of
+            the neuron, source column of the edge), "index" of the neuron, or
+            "source" (None for a bias edge), "target" and "index" of the edge
+            in the flattened layer data (bias row last). None when nothing is
+            within `tolerance` scene units.
+        """
+        n_columns = len(self.layers)
+        if n_columns == 0:
+            return None
+        radius = NEURON_SIZE_2 + tolerance
+
+        column = int(
+            np.clip(np.rint((x - self.x[0]) / HORIZONTAL_DISTANCE), 0, n_columns - 1)
+        )
+        n_neurons = self.layers[column]
+        if n_neurons > 0:
+            index = int(
+                np.clip(
+                    np.rint((y - self.y0[column]) / VERTICAL_DISTANCE), 0, n_neurons - 1
+                )
+            )
+            cx, cy = self.neuron_center(column, index)
+            if (x - cx) ** 2 + (y - cy) ** 2 <= radius**2:
+                return dict(kind="neuron", layer=column, index=index)
+        center = self.bias_centers[column]
+        if center is not None:
+            if (x - center[0]) ** 2 + (y - center[1]) ** 2 <= radius**2:
+                return dict(kind="bias", layer=column)
+
+        return self._find_edge(x, y, tolerance + WEIGHT_WIDTH / 2.0)
+
+    def _find_edge(self, x: float, y: float, tolerance: float) -> dict | None:
+        # the edges of the gap of the point, and of the neighbouring gap when
+        # the point is within the tolerance of a column
+        first = int(np.floor((x - tolerance - self.x[0]) / HORIZONTAL_DISTANCE))
+        last = int(np.floor((x + tolerance - self.x[0]) / HORIZONTAL_DISTANCE))
+        best_distance = tolerance
+        best = None
+        for layer in range(max(first, 0), min(last, len(self.layers) - 2) + 1):
+            distance, location = self._nearest_edge(layer, x, y)
+            if distance <= best_distance:
+                best_distance = distance
+                best = location
+        return best
+
+    def _nearest_edge(self, layer: int, x: float, y: float) -> tuple[float, dict]:
+        n_sources = self.layers[layer]
+        n_targets = self.layers[layer + 1]
+        if n_targets == 0:
+            return np.inf, None
+        t = min(max((x - self.x[layer]) / HORIZONTAL_DISTANCE, 0.0), 1.0)
+        y_sources = self.y0[layer] + np.arange(n_sources) * VERTICAL_DISTANCE
+        y_targets = self.y0[layer + 1] + np.arange(n_targets) * VERTICAL_DISTANCE
+
+        # nearest crossing: solve for the far end, it moves less per unit
+        if t >= 0.5:
+            solved = (y - (1.0 - t) * y_sources) / t
+            nearest = np.rint((solved - y_targets[0]) / VERTICAL_DISTANCE)
+            sources = np.repeat(np.arange(n_sources), 3)
+            targets = (nearest[:, None] + np.arange(-1, 2)).ravel()
+            targets = np.clip(targets, 0, n_targets - 1).astype(np.intp)
+        elif n_sources > 0:
+            solved = (y - t * y_targets) / (1.0 - t)
+            nearest = np.rint((solved - y_sources[0]) / VERTICAL_DISTANCE)
+            targets = np.repeat(np.arange(n_targets), 3)
+            sources = (nearest[:, None] + np.arange(-1, 2)).ravel()
+            sources = np.clip(sources, 0, n_sources - 1).astype(np.intp)
+        else:
+            sources = targets = np.empty(0, dtype=np.intp)
+
+        x1 = np.full(len(sources), self.x[layer])
+        y1 = y_sources[sources]
+        bias_center = self.bias_centers[layer]
+        if bias_center is not None:
+            x1 = np.concatenate((x1, np.full(n_targets, bias_center[0])))
+            y1 = np.concatenate((y1, np.full(n_targets, bias_center[1])))
+            sources = np.concatenate((sources, np.full(n_targets, -1)))
+            targets = np.concatenate((targets, np.arange(n_targets)))
+        if len(sources) == 0:
+            return np.inf, None
+
+        distances = segment_distances(
+            x, y, x1, y1, self.x[layer + 1], y_targets[targets]
+        )
+        best = int(np.argmin(distances))
+        source = int(sources[best])
+        target = int(targets[best])
+        location = dict(kind="edge", layer=layer, source=source, target=target)
+        if source < 0:
+            location.update(source=None, index=n_sources * n_targets + target)
+        else:
+            location.update(index=source * n_targets + target)
+        return float(distances[best]), location
+
+
+def segment_distances(x, y, x1, y1, x2, y2) -> np.ndarray:
+    """Distances from the point (x, y) to the segments (x1, y1) - (x2, y2)."""
+    dx = x2 - x1
+    dy = y2 - y1
+    length2 = np.maximum(dx * dx + dy * dy, 1e-12)
+    t = np.clip(((x - x1) * dx + (y - y1) * dy) / length2, 0.0, 1.0)
+    return np.hypot(x1 + t * dx - x, y1 + t * dy - y)
+
+
+def describe_location(location: dict) -> str:
+    if location["kind"] == "neuron":
+        return f"Neuron {location['index']} (layer {location['layer']})"
+    if location["kind"] == "bias":
+        return f"Bias (layer {location['layer']})"
+    source = "bias" if location["source"] is None else f"neuron {location['source']}"
+    return (
+        f"Edge {source} -> neuron {location['target']} "
+        f"(layer {location['layer']} -> {location['layer'] + 1})"
+    )
+
+
 class GraphViewWidget(QGraphicsView):
+    on_item_inspected = dc.Signal(object)
 
     def __init__(self) -> None:
         super().__init__()
 
         format = QSurfaceFormat.defaultFormat()
-        format.setSamples(32)
+        format.setSamples(4)  # only used by an OpenGL viewport
         QSurfaceFormat.setDefaultFormat(format)
 
         self.setDragMode(QGraphicsView.NoDrag)
@@ -111,6 +407,15 @@ class GraphViewWidget(QGraphicsView):
         self._panStartY = 0
         self.setRenderHints(QPainter.Antialiasing | QPainter.SmoothPixmapTransform)
 
+        # the items are static between updates: repaint the bounding rect of
+        # the changed items, draw the solid background from a cache and do not
+        # save the painter state per item (the items restore what they change)
+        self.setViewportUpdateMode(QGraphicsView.SmartViewportUpdate)
+        self.setCacheMode(QGraphicsView.CacheBackground)
+        self.setOptimizationFlags(
+            QGraphicsView.DontSavePainterState | QGraphicsView.DontAdjustForAntialiasing
+        )
+
         self._scene = QGraphicsScene(self)
         self.setScene(self._scene)
         self._scene.setBackgroundBrush(BACKGROUND_BRUSH)
@@ -118,12 +423,124 @@ class GraphViewWidget(QGraphicsView):
         self._neurons: list[list[QGraphicsEllipseItem]] = []
         self._biases = []
         self._weights: list[list[QGraphicsLineItem]] = []
+        self._flow_items: list[FlowingLineItem] = []
+        self.flow_animation = FlowAnimation(self)
+        self._create_layer_roots()
+
+        # values shown by the colors, for the inspector
+        self.layout_index: GraphLayoutIndex | None = None
+        self._edge_values: list[np.ndarray] | None = None
+        self._neuron_values: list[np.ndarray] | None = None
+        # optional callback adding values (e.g. weight, gradient) to a location
+        self.inspector_values = None
+        self._pinned: dict | None = None
+
+        self.interacting = False
+        self._resume_flow = False
+        self._interaction_timer = QTimer(self)
+        self._interaction_timer.setSingleShot(True)
+        self._interaction_timer.setInterval(INTERACTION_IDLE_MS)
+        self._interaction_timer.timeout.connect(self.end_interaction)
+        # paint time (seconds) of the last frames, per rendering mode
+        self.frame_times = {
+            "full": deque(maxlen=FRAME_HISTORY),
+            "interactive": deque(maxlen=FRAME_HISTORY),
+        }
+
+    def _create_layer_roots(self) -> None:
+        self._edges_root = create_layer_root(9)
+        self._flow_root = create_layer_root(9.5)  # over the edges
+        self._scene.addItem(self._edges_root)
+        self._scene.addItem(self._flow_root)
+        self._highlight = QGraphicsPathItem()
+        self._highlight.setPen(QPen(QBrush(FLOW_COLOR), WEIGHT_WIDTH))
+        self._highlight.setZValue(11)
+        self._highlight.setVisible(False)
+        self._scene.addItem(self._highlight)
+
+    def n_edges(self) -> int:
+        return sum(len(weights) for weights in self._weights)
+
+    def begin_interaction(self) -> None:
+        """Draw fast until INTERACTION_IDLE_MS after the last call."""
+        self._interaction_timer.start()
+        if self.interacting:
+            return
+        self.interacting = True
+        self.setRenderHint(QPainter.Antialiasing, False)
+        self.setRenderHint(QPainter.SmoothPixmapTransform, False)
+        if self.n_edges() > INTERACTION_MAX_EDGES:
+            self._edges_root.setVisible(False)
+        self._flow_root.setVisible(False)
+        if self.flow_animation.is_running():
+            self.flow_animation.pause()
+            self._resume_flow = True
+
+    def end_interaction(self) -> None:
+        """Restore the full quality rendering."""
+        self._interaction_timer.stop()
+        if not self.interacting:
+            return
+        self.interacting = False
+        self.setRenderHints(QPainter.Antialiasing | QPainter.SmoothPixmapTransform)
+        self._edges_root.setVisible(True)
+        self._flow_root.setVisible(True)
+        if self._resume_flow:
+            self.flow_animation.resume()
+        self.viewport().update()
+
+    def paintEvent(self, event) -> None:
+        start = time.perf_counter()
+        super().paintEvent(event)
+        mode = "interactive" if self.interacting else "full"
+        self.frame_times[mode].append(time.perf_counter() - start)
+
+    def frame_stats(self) -> dict:
+        """Mean and max paint time in ms of the last frames of each mode."""
+        stats = dict()
+        for mode, times in self.frame_times.items():
+            if times:
+                stats[mode] = dict(
+                    frames=len(times),
+                    mean_ms=1000.0 * sum(times) / len(times),
+                    max_ms=1000.0 * max(times),
+                )
+        return stats
+
+    def set_flow_animation(self, active: bool) -> None:
+        """Start or stop the animation of the forward pass over the edges."""
+        if active:
+            if not self._flow_items:
+                self._create_flow_items()
+            if self.interacting:
+                self._resume_flow = True  # started at the end of the interaction
+            else:
+                self.flow_animation.start()
+        else:
+            self._resume_flow = False
+            self.flow_animation.stop()
+
+    def _create_flow_items(self) -> None:
+        layer_index = list()
+        for idx_layer, weights in enumerate(self._weights):
+            for line in weights:
+                item = FlowingLineItem(line.line().p1(), line.line().p2())
+                item.setParentItem(self._flow_root)
+                self._flow_items.append(item)
+                layer_index.append(idx_layer)
+        self.flow_animation.set_edges(self._flow_items, layer_index)
 
     def update_graph(self, model_info: dict) -> None:
+        self._flow_items.clear()
+        self.flow_animation.set_edges([], [])
         self._neurons.clear()
         self._weights.clear()
         self._biases.clear()
         self._scene.clear()
+        self._create_layer_roots()
+        self._edge_values = None
+        self._neuron_values = None
+        self._pinned = None
 
         n_inputs = model_info["arch_n_inputs"]
         n_outputs = model_info["arch_n_outputs"]
@@ -135,6 +552,7 @@ class GraphViewWidget(QGraphicsView):
             biases.append(model_info["hidden_layers"][f"layer_bias_{idx:04d}"])
         layers.append(n_outputs)
         biases.append(model_info["arch_output_bias"])
+        self.layout_index = GraphLayoutIndex(layers, biases)
 
         pen = QPen(Qt.white)
         pen.setWidth(NEURON_PEN_WIDTH)
@@ -183,7 +601,7 @@ class GraphViewWidget(QGraphicsView):
                         9,
                     )
                     line.weight_value = 1.0
-                    self._scene.addItem(line)
+                    line.setParentItem(self._edges_root)
                     weights.append(line)
 
             if len(biases) > idx_layer and biases[idx_layer] is True:
@@ -197,7 +615,7 @@ class GraphViewWidget(QGraphicsView):
                         pen_weight,
                         9,
                     )
-                    self._scene.addItem(line)
+                    line.setParentItem(self._edges_root)
                     weights.append(line)
 
         rect = self._scene.itemsBoundingRect()
@@ -206,14 +624,77 @@ class GraphViewWidget(QGraphicsView):
         self._scene.setSceneRect(rect)
         self.fitInView(rect, Qt.KeepAspectRatio)
 
+        # also when paused by an interaction, it resumes at its end
+        if self.flow_animation.is_running() or self._resume_flow:
+            self._create_flow_items()
+
     def wheelEvent(self, event):
+        self.begin_interaction()
         scaleFactor = 1.10  # Zoom factor
         if event.angleDelta().y() > 0:  # Zoom in
             self.scale(scaleFactor, scaleFactor)
         else:  # Zoom out
             self.scale(1 / scaleFactor, 1 / scaleFactor)
 
+    def locate(self, position: QPointF) -> dict | None:
+        """Neuron or edge under a viewport position, see `GraphLayoutIndex.find`."""
+        if self.layout_index is None:
+            return None
+        point = self.mapToScene(position.toPoint())
+        tolerance = INSPECT_TOLERANCE / max(abs(self.transform().m11()), 1e-9)
+        return self.layout_index.find(point.x(), point.y(), tolerance)
+
+    def inspect(self, location: dict) -> dict:
+        """Values of a location: the one shown by its color and the callback's."""
+        values = dict()
+        if location["kind"] == "edge" and self._edge_values is not None:
+            values["value"] = float(
+                self._edge_values[location["layer"]][location["index"]]
+            )
+        elif location["kind"] == "neuron" and self._neuron_values is not None:
+            values["activation"] = float(
+                self._neuron_values[location["layer"]][location["index"]]
+            )
+        if self.inspector_values is not None:
+            values.update(self.inspector_values(location))
+        return values
+
+    def show_location(self, location: dict | None, global_position=None) -> None:
+        """Highlight a location and show its values in a tooltip."""
+        if location is None:
+            self._highlight.setVisible(False)
+            QToolTip.hideText()
+            return
+        index = self.layout_index
+        path = QPainterPath()
+        if location["kind"] == "edge":
+            start, end = index.edge_points(
+                location["layer"], location["source"], location["target"]
+            )
+            path.moveTo(*start)
+            path.lineTo(*end)
+        else:
+            if location["kind"] == "neuron":
+                center = index.neuron_center(location["layer"], location["index"])
+            else:
+                center = index.bias_centers[location["layer"]]
+            path.addEllipse(QPointF(*center), NEURON_SIZE_2, NEURON_SIZE_2)
+        self._highlight.setPath(path)
+        self._highlight.setVisible(True)
+
+        lines = [describe_location(location)]
+        for name, value in self.inspect(location).items():
+            lines.append(f"{name}: {value:.6g}")
+        if global_position is not None:
+            QToolTip.showText(global_position, "\n".join(lines), self)
+
     def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            # click pins the inspected item, click on the background unpins
+            self._pinned = self.locate(event.position())
+            self.show_location(self._pinned, event.globalPosition().toPoint())
+            if self._pinned is not None:
+                self.on_item_inspected.emit(self._pinned)
         if event.button() == Qt.RightButton:
             self._isPanning = True
             self._panStartX, self._panStartY = (
@@ -225,6 +706,7 @@ class GraphViewWidget(QGraphicsView):
 
     def mouseMoveEvent(self, event):
         if self._isPanning:
+            self.begin_interaction()
             # Calculate the new scroll positions
             deltaX = event.position().x() - self._panStartX
             deltaY = event.position().y() - self._panStartY
@@ -236,8 +718,17 @@ class GraphViewWidget(QGraphicsView):
                 event.position().x(),
                 event.position().y(),
             )
+        elif self._pinned is None and not self.interacting:
+            self.show_location(
+                self.locate(event.position()), event.globalPosition().toPoint()
+            )
         super().mouseMoveEvent(event)
 
+    def leaveEvent(self, event):
+        if self._pinned is None:
+            self.show_location(None)
+        super().leaveEvent(event)
+
     def mouseReleaseEvent(self, event):
         if event.button() == Qt.RightButton:
             self._isPanning = False
@@ -261,8 +752,10 @@ class GraphViewWidget(QGraphicsView):
         pen = QPen()
         pen.setWidth(WEIGHT_WIDTH)
 
+        self._edge_values = list()
         for layer_idx in range(n):
             wb = layers_data[layer_idx].flatten()
+            self._edge_values.append(wb)
             # v_min = wb.min()
             # v_max = wb.max()
             for idx, line in enumerate(self._weights[layer_idx]):
@@ -283,8 +776,10 @@ class GraphViewWidget(QGraphicsView):
         v_min: float = 0.0,
         v_max: float = 1.0,
     ):
+        self._neuron_values = list()
         for idx_layer, neuron_layer in enumerate(self._neurons):
             activations = neurons_data[idx_layer].flatten()
+            self._neuron_values.append(activations)
             # print(idx_layer, activations)
 
             for idx_neuron, neuron in enumerate(neuron_layer):
@@ -297,6 +792,7 @@ class GraphViewWidget(QGraphicsView):
                 neuron.setBrush(QBrush(QColor(vc[2], vc[1], vc[0], 255)))
 
     def set_neuron_colors_default(self):
+        self._neuron_values = None
         for idx_layer, neuron_layer in enumerate(self._neurons):
             for idx_neuron, neuron in enumerate(neuron_layer):
                 neuron.setBrush(BRUSH_NEURON)
@@ -1,3 +1,6 @@
+import os
+import threading
+
 import numpy as np
 
 from ..helpers import uihelper as dc
@@ -15,8 +18,20 @@ from .train_widget import TrainWidget
 from .plot_loss_widget import PlotLossWidget
 from .bar_plot_widget import BarPlotWidget
 
+from ...data.dataset_loader import split_dataset
 from ...net import train
+from ...net.activation_cache import ActivationCache
 from ...net import train_store_grad
+from ...net.callbacks import Validation
+from ...net.checkpoint import Checkpointer, save_checkpoint, load_checkpoint
+from ...net.optimizers import create_optimizer
+from ...net.run_store import RunStore, RunRecorder, RUNS_DIR, dataset_hash
+from ...net.telemetry import TelemetryChannel, TelemetryPublisher, weights_snapshot
+from ...net.utils import create_net, get_loss_function_by_name
+from ...net.metrics import ConfusionMatrix
+
+CHECKPOINT_FILE_FILTER = "nn_sim model (*.npz);;All Files(*)"
+CHECKPOINT_PATH = os.path.join("checkpoints", "last.npz")
 
 
 class MainWindow(dc.QMainWindow, PropertyModelListener):
@@ -25,6 +40,27 @@ class MainWindow(dc.QMainWindow, PropertyModelListener):
         super().__init__()
         self.ctx = ctx
         self.net = None
+        self.optimizer = None
+        self.model_info = None
+        self.train_params = None
+        self.epoch = 0  # completed epochs of self.net
+        self.train_losses = list()
+        self.learning_rates = list()  # learning rate of every epoch
+        self.activation_cache = None  # sample view, rebuilt when the weights change
+        self.run_store = None  # opened on the first recorded run
+        self.run_recorder = None
+
+        # training runs in a worker thread, the widgets poll its telemetry
+        self.train_thread = None
+        self.train_result = None
+        self.train_state = None  # (start_epoch, losses, learning_rates) before it
+        self.telemetry = TelemetryChannel()
+        self.telemetry_publisher = None
+        self.loss_telemetry = self.telemetry.subscribe("loss", "validation")
+        self.weights_telemetry = None  # subscribed while the weights are shown
+        self.gradients_telemetry = None
+        self.live_losses = ([], [])  # (epochs, losses) of the plot
+        self.live_val_losses = ([], [])
 
         self.arch_edit = ModelArchitectureWidget()
         self.dock_arch = dc.DockWidget(
@@ -32,6 +68,7 @@ class MainWindow(dc.QMainWindow, PropertyModelListener):
         )
 
         self.graph_view = GraphViewWidget()
+        self.graph_view.inspector_values = self.inspect_graph_item
         self.dock_graph = dc.DockWidget(title="Graph View", widget=self.graph_view)
 
         self.arch_edit.on_architecture_changed.connect(self.graph_view.update_graph)
@@ -64,6 +101,19 @@ class MainWindow(dc.QMainWindow, PropertyModelListener):
 
         self.action_about = dc.Action("About QT", triggered=self.about_qt)
         self.action_app_info = dc.Action("App Info", triggered=self.app_info)
+        self.action_save_model = dc.Action("Save Model...", triggered=self.save_model)
+        self.action_load_model = dc.Action("Load Model...", triggered=self.load_model)
+        self.action_overlay_runs = dc.Action(
+            "Overlay Runs of this Dataset", triggered=self.overlay_runs
+        )
+        self.action_animate_flow = dc.Action(
+            "Animate Forward Pass", triggered=self.graph_view.set_flow_animation
+        )
+        self.action_animate_flow.setCheckable(True)
+        self.action_clear_overlay = dc.Action(
+            "Clear Runs Overlay",
+            triggered=lambda: self.plot_loss.set_overlay_losses([]),
+        )
 
         dc.MainWindow(
             widget=self,
@@ -85,7 +135,19 @@ class MainWindow(dc.QMainWindow, PropertyModelListener):
                 dc.Menu(
                     "Menu",
                     items=[self.action_about, "separator", self.action_app_info],
-                )
+                ),
+                dc.Menu(
+                    "Model",
+                    items=[self.action_save_model, self.action_load_model],
+                ),
+                dc.Menu(
+                    "View",
+                    items=[self.action_animate_flow],
+                ),
+                dc.Menu(
+                    "Runs",
+                    items=[self.action_overlay_runs, self.action_clear_overlay],
+                ),
             ),
         )
 
@@ -146,6 +208,14 @@ class MainWindow(dc.QMainWindow, PropertyModelListener):
         )
         self.train_widget.btn_play_gradient.clicked.connect(self.play_gradients)
 
+        self.timer_telemetry = dc.Timer(
+            interval_ms=33,  # display rate
+            single_shot=False,
+            on_timeout=self.poll_telemetry,
+        )
+        for dock in [self.dock_graph, self.dock_weights_plot, self.dock_gradients_plot]:
+            dock.visibilityChanged.connect(self.update_telemetry_subscriptions)
+
     def about_qt(self) -> None:
         dc.QMessageBox.aboutQt(self, "About Qt")
 
@@ -156,9 +226,88 @@ class MainWindow(dc.QMainWindow, PropertyModelListener):
             self,
         )
 
-    def play_samples(self) -> None:
+    def closeEvent(self, event) -> None:
+        if self.is_training():
+            self.telemetry_publisher.stop_requested = True
+            self.wait_training()
+        super().closeEvent(event)
 
+    def save_model(self) -> None:
+        if self.is_training():
+            return
         if self.net is None:
+            dc.Error("Network not trained", "Train the network model first.", self)
+            return
+
+        file_path = dc.SaveFile(
+            "Save model", file_filter=CHECKPOINT_FILE_FILTER, parent=self
+        )
+        if not file_path:
+            return
+        if not file_path.endswith(".npz"):
+            file_path += ".npz"
+
+        save_checkpoint(
+            file_path,
+            self.net,
+            model_info=self.model_info,
+            train_params=self.train_params,
+            optimizer=self.optimizer,
+            epoch=self.epoch,
+            train_losses=self.train_losses,
+        )
+
+    def load_model(self, file_path: str | None = None) -> None:
+        if self.is_training():
+            return
+        if not file_path:
+            file_path = dc.OpenFile("Load model", CHECKPOINT_FILE_FILTER, parent=self)
+        if not file_path:
+            return
+
+        try:
+            checkpoint = load_checkpoint(file_path)
+        except Exception as e:
+            dc.Error("Fail to Load Model", str(e), self)
+            return
+
+        if checkpoint["model_info"] is None:
+            dc.Error("Fail to Load Model", "Model architecture not stored.", self)
+            return
+
+        if self.timer_samples.isActive():
+            self.play_samples()
+        if self.timer_gradients.isActive():
+            self.play_gradients()
+
+        self.arch_edit.set_model_info(checkpoint["model_info"])
+
+        self.net = checkpoint["net"]
+        self.activation_cache = None
+        self.model_info = checkpoint["model_info"]
+        self.train_params = checkpoint["train_params"]
+        self.epoch = checkpoint["epoch"]
+        self.train_losses = checkpoint["train_losses"] or list()
+        self.learning_rates = list()
+
+        # restore the optimizer so the training can be continued
+        self.optimizer = None
+        if self.train_params is not None and checkpoint["optimizer_state"]:
+            self.optimizer = create_optimizer(self.net, self.train_params)
+            self.optimizer.load_state_dict(checkpoint["optimizer_state"])
+
+        self.gradients = None
+        self.current_grad_index = 0
+        self.train_widget.txt_epoch_grad.setText("")
+        self.graph_view.set_neuron_colors_default()
+        self.plot_loss.set_validation_loss([])
+        self.plot_loss.set_train_loss(self.train_losses)
+        self.plot_loss.set_learning_rate([])
+        self.show_net_weights()
+
+    def play_samples(self) -> None:
+
+        if self.net is None or self.is_training():
             return
 
         if self.timer_gradients.isActive():
@@ -179,7 +328,7 @@ class MainWindow(dc.QMainWindow, PropertyModelListener):
 
     def play_gradients(self) -> None:
 
-        if self.net is None:
+        if self.net is None or self.is_training():
             return
 
         if self.timer_samples.isActive():
@@ -227,8 +376,14 @@ class MainWindow(dc.QMainWindow, PropertyModelListener):
     def on_property_model_changed(self, property_model: PropertyModel) -> None:
         print(property_model)
 
+    def is_training(self) -> bool:
+        return self.train_thread is not None
+
     def start_training(self) -> None:
 
+        if self.is_training():
+            return
+
         print("Start Training")
 
         if self.timer_samples.isActive():
@@ -273,21 +428,234 @@ class MainWindow(dc.QMainWindow, PropertyModelListener):
         # read last model
         loss_func = get_loss_function_by_name(model_info["arch_loss_function"])
 
-        net = create_net(model_info)
-        self.net = net
+        # continue training the current network when the architecture is the same
+        resume = (
+            self.train_widget.ck_continue_training.isChecked()
+            and self.net is not None
+            and model_info == self.model_info
+        )
+        if resume:
+            net = self.net
+            start_epoch = self.epoch
+            previous_losses = list(self.train_losses)
+            previous_learning_rates = list(self.learning_rates)
+            train_params["epochs"] += start_epoch  # train for more epochs
+        else:
+            net = create_net(model_info)
+            start_epoch = 0
+            previous_losses = list()
+            previous_learning_rates = list()
+            self.gradients = None
         # print(str(net))
 
+        optimizer = create_optimizer(net, train_params)
+        if (
+            resume
+            and self.optimizer is not None
+            and type(self.optimizer) is type(optimizer)
+        ):
+            optimizer.load_state_dict(self.optimizer.state_dict())
+
         self.graph_view.set_neuron_colors_default()
         self.current_grad_index = 0
 
-        if self.train_widget.ck_store_gradients.isChecked():
-            loss_train, self.gradients = train_store_grad.train_net_adam(
-                net, dataset, train_params, loss_func
+        train_dataset = dataset
+        callbacks = []
+        self.plot_loss.set_validation_loss([])
+        if train_params["val_split"] > 0:
+            train_dataset, val_dataset = split_dataset(
+                dataset, train_params["val_split"]
+            )
+            if len(train_dataset) == 0 or len(val_dataset) == 0:
+                dc.Error(
+                    "Fail to Start Training",
+                    "Validation split leaves no samples for training or validation.",
+                    self,
+                )
+                return
+            confusion = None
+            if "Cross Entropy" in model_info["arch_loss_function"]:
+                confusion = ConfusionMatrix(max(2, n_outputs))
+            callbacks.append(
+                Validation(
+                    val_dataset,
+                    loss_func,
+                    every=train_params["val_every"],
+                    patience=train_params["patience"],
+                    on_validation=self.on_validation_loss,
+                    confusion=confusion,
+                )
             )
+
+        if train_params["checkpoint_every"] > 0:
+            # after the validation, which may restore the best weights at the end
+            os.makedirs(os.path.dirname(CHECKPOINT_PATH), exist_ok=True)
+            callbacks.append(
+                Checkpointer(
+                    CHECKPOINT_PATH,
+                    optimizer,
+                    every=train_params["checkpoint_every"],
+                    model_info=model_info,
+                    train_params=train_params,
+                    start_epoch=start_epoch,
+                    train_losses=previous_losses,
+                )
+            )
+
+        self.run_recorder = None
+        if train_params["record_run"]:
+            if self.run_store is None:
+                self.run_store = RunStore(RUNS_DIR)
+            self.run_recorder = RunRecorder(
+                self.run_store,
+                train_dataset,
+                model_info,
+                train_params,
+                start_epoch=start_epoch,
+            )
+            callbacks.append(self.run_recorder)
+
+        self.telemetry.clear()
+        self.telemetry_publisher = TelemetryPublisher(self.telemetry, optimizer)
+        callbacks.append(self.telemetry_publisher)
+        self.live_losses = (list(range(len(previous_losses))), list(previous_losses))
+        self.live_val_losses = ([], [])
+        self.update_telemetry_subscriptions()
+
+        self.net = net
+        self.activation_cache = None
+        self.optimizer = optimizer
+        self.model_info = model_info
+        self.train_params = train_params
+        self.train_state = (start_epoch, previous_losses, previous_learning_rates)
+
+        self.train_widget.btn_start_train.setEnabled(False)
+        self.train_result = None
+        self.train_thread = threading.Thread(
+            target=self.run_training,
+            args=(net, train_dataset, train_params, loss_func, callbacks, optimizer),
+            kwargs=dict(
+                start_epoch=start_epoch,
+                store_gradients=self.train_widget.ck_store_gradients.isChecked(),
+            ),
+            daemon=True,
+        )
+        self.train_thread.start()
+        self.timer_telemetry.start()
+
+    def run_training(
+        self,
+        net,
+        dataset,
+        train_params,
+        loss_func,
+        callbacks,
+        optimizer,
+        *,
+        start_epoch: int,
+        store_gradients: bool,
+    ) -> None:
+        """Body of the training thread, it must not touch the widgets."""
+        try:
+            if store_gradients:
+                self.train_result = train_store_grad.train_net_adam(
+                    net,
+                    dataset,
+                    train_params,
+                    loss_func,
+                    callbacks,
+                    optimizer,
+                    start_epoch,
+                )
+            else:
+                loss_train = train.train_net(
+                    net,
+                    dataset,
+                    train_params,
+                    loss_func,
+                    callbacks,
+                    optimizer,
+                    start_epoch,
+                )
+                self.train_result = (loss_train, None)
+        except Exception as e:
+            self.train_result = e
+
+    def wait_training(self) -> None:
+        """Block until the training thread ends, then show its results."""
+        if self.is_training():
+            self.train_thread.join()
+            self.poll_telemetry()
+
+    def update_telemetry_subscriptions(self, *args) -> None:
+        """Copy the live weights and gradients only while a widget shows them."""
+        show_weights = self.dock_graph.isVisible() or self.dock_weights_plot.isVisible()
+        if show_weights and self.weights_telemetry is None:
+            self.weights_telemetry = self.telemetry.subscribe("weights")
+        elif not show_weights and self.weights_telemetry is not None:
+            self.weights_telemetry.close()
+            self.weights_telemetry = None
+
+        show_gradients = self.dock_gradients_plot.isVisible()
+        if show_gradients and self.gradients_telemetry is None:
+            self.gradients_telemetry = self.telemetry.subscribe("gradients")
+        elif not show_gradients and self.gradients_telemetry is not None:
+            self.gradients_telemetry.close()
+            self.gradients_telemetry = None
+
+    def poll_telemetry(self) -> None:
+        # checked first: everything published by a finished thread is polled
+        finished = self.is_training() and not self.train_thread.is_alive()
+        data = self.loss_telemetry.poll()
+        if "loss" in data:
+            epochs, losses = self.live_losses
+            for epoch, loss in data["loss"]:
+                epochs.append(epoch)
+                losses.append(loss)
+            self.plot_loss.set_train_loss(losses, epochs)
+        if "validation" in data:
+            epochs, losses = self.live_val_losses
+            for epoch, loss in data["validation"]:
+                epochs.append(epoch)
+                losses.append(loss)
+            self.plot_loss.set_validation_loss(losses, epochs)
+
+        if self.weights_telemetry is not None:
+            weights = self.weights_telemetry.poll().get("weights")
+            if weights is not None:
+                self.show_layers_weights(weights[1])
+        if self.gradients_telemetry is not None:
+            gradients = self.gradients_telemetry.poll().get("gradients")
+            if gradients is not None:
+                self.plot_gradients.update_plots(gradients[1])
+
+        if finished:
+            self.finish_training()
+
+    def finish_training(self) -> None:
+        self.timer_telemetry.stop()
+        self.train_thread.join()
+        self.train_thread = None
+        self.train_widget.btn_start_train.setEnabled(True)
+
+        result = self.train_result
+        self.train_result = None
+        if isinstance(result, Exception):
+            dc.Error("Training Failed", str(result), self)
+            return
+
+        loss_train, self.gradients = result
+        if self.gradients:
             self.plot_gradients.update_plots(self.gradients[0])
+        optimizer = self.optimizer
+        start_epoch, previous_losses, previous_learning_rates = self.train_state
+        self.train_losses = previous_losses + [float(loss) for loss in loss_train]
+        self.epoch = start_epoch + len(loss_train)
+        if optimizer.scheduler is not None:
+            learning_rates = optimizer.scheduler.learning_rates
         else:
-            loss_train = train.train_net(net, dataset, train_params, loss_func)
-            self.gradients = None
+            learning_rates = [optimizer.learning_rate] * len(loss_train)
+        self.learning_rates = previous_learning_rates + learning_rates
 
         if self.gradients is not None:
             self.train_widget.txt_epoch_grad.setText(
@@ -296,17 +664,57 @@ class MainWindow(dc.QMainWindow, PropertyModelListener):
         else:
             self.train_widget.txt_epoch_grad.setText("")
 
-        self.plot_loss.set_train_loss(loss_train)
+        self.plot_loss.set_train_loss(self.train_losses)
+        # only a schedule is worth a plot, not a constant learning rate
+        if len(set(self.learning_rates)) > 1:
+            self.plot_loss.set_learning_rate(self.learning_rates)
+        else:
+            self.plot_loss.set_learning_rate([])
+        self.show_net_weights()
+
+        if self.dataset_widget.dataset is not None:
+            self.get_activation_cache()  # ready for the sample playback
+
+    def get_activation_cache(self) -> ActivationCache:
+        """Sample view data of the whole dataset, built on the first use."""
+        X = self.dataset_widget.dataset.X
+        if self.activation_cache is None or self.activation_cache.X is not X:
+            self.activation_cache = ActivationCache(self.net, X)
+        return self.activation_cache
 
-        layers_data = list()
+    def overlay_runs(self, max_runs: int = 5) -> None:
+        """Overlay the loss curves of the last recorded runs of the dataset."""
+        dataset = self.dataset_widget.dataset
+        if dataset is None or self.is_training():
+            return
+        if self.run_store is None:
+            if not os.path.exists(RUNS_DIR):
+                return
+            self.run_store = RunStore(RUNS_DIR)
+
+        current_run = None
+        if self.run_recorder is not None:
+            current_run = self.run_recorder.run_id
+        runs = self.run_store.list_runs(
+            dataset_hash(dataset), status="finished", limit=max_runs + 1
+        )
+        curves = list()
+        for run in runs:
+            if run["id"] == current_run:
+                continue
+            losses = self.run_store.load_losses(run["id"])
+            epochs = run["start_epoch"] + np.arange(len(losses))
+            name = f"Run {run['id']} ({run['train_params'].get('optim', '')})"
+            curves.append((name, epochs, losses))
+        self.plot_loss.set_overlay_losses(curves[:max_runs])
+
+    def show_net_weights(self) -> None:
+        self.show_layers_weights(weights_snapshot(self.net))
+
+    def show_layers_weights(self, layers_data: list[np.ndarray]) -> None:
         v_min = None
         v_max = None
-        for idx, layer in enumerate(net.layers):
-            w = layer.weights
-            if layer.bias_active:
-                w = np.row_stack((w, layer.bias))
-            layers_data.append(w)
-
+        for w in layers_data:
             if v_min is None:
                 v_min = w.min()
             else:
@@ -319,60 +727,56 @@ class MainWindow(dc.QMainWindow, PropertyModelListener):
         self.graph_view.update_net_weights_and_bias(layers_data, v_min, v_max)
         self.plot_weights.update_plots(layers_data)
 
+    def inspect_graph_item(self, location: dict) -> dict:
+        """Weight and gradient of a graph view edge, bias of a neuron.
+
+        The gradient is the one of the last training step, it is left out
+        when the network has none (loaded from a checkpoint). Nothing is read
+        while training, the training thread updates the arrays.
+        """
+        values = dict()
+        if self.net is None or self.is_training() or location["kind"] == "bias":
+            return values
+        if location["kind"] == "neuron":
+            if 0 < location["layer"] <= len(self.net.layers):
+                layer = self.net.layers[location["layer"] - 1]
+                if layer.bias_active and location["index"] < layer.bias.size:
+                    values["bias"] = float(np.ravel(layer.bias)[location["index"]])
+            return values
+
+        if location["layer"] >= len(self.net.layers):
+            return values
+        layer = self.net.layers[location["layer"]]
+        n_inputs, n_outputs = layer.weights.shape
+        source, target = location["source"], location["target"]
+        if target >= n_outputs or (source is not None and source >= n_inputs):
+            return values  # the architecture changed since the training
+        has_gradients = layer.grad_weights.any() or layer.grad_bias.any()
+        if source is None:
+            values["bias"] = float(np.ravel(layer.bias)[target])
+            if has_gradients:
+                values["gradient"] = float(np.ravel(layer.grad_bias)[target])
+        else:
+            values["weight"] = float(layer.weights[source, target])
+            if has_gradients:
+                values["gradient"] = float(layer.grad_weights[source, target])
+        return values
+
+    def on_validation_loss(self, epochs: list[int], losses: list[float]) -> None:
+        # called by the training thread, the plot polls the telemetry
+        self.telemetry.publish("validation", epochs[-1], losses[-1])
+
     def on_dataset_sample_index_changed(self, sample_index: int) -> None:
+        if self.is_training():
+            # the forward pass would overwrite the buffers of the training
+            return
         if self.net is None:
             dc.Error("Network not trained", "Train the network model first.", self)
             return
 
-        dataset = self.dataset_widget.dataset
-        x, y = dataset[sample_index]
-        X = np.expand_dims(x, axis=0)
-        Y = np.expand_dims(y, axis=0)
-
-        self.net.zero_gradients()
-        y_pred = self.net(X)
-
-        neurons_data = [x]
-        layers_data = []
-
-        n_min = None
-        n_max = None
-        v_min = None
-        v_max = None
-        for layer in self.net.layers:
-            # neuros
-            neurons_data.append(layer.A_OUT)
-
-            if n_min is None:
-                n_min = layer.A_OUT.min()
-            else:
-                n_min = min(layer.A_OUT.min(), n_min)
-
-            if n_max is None:
-                n_max = layer.A_OUT.max()
-            else:
-                n_max = max(layer.A_OUT.max(), n_max)
-
-            # weights and bias
-            ni, no = layer.weights.shape
-
-            # print("wx", layer.weights.shape, x.shape)
-            aux = np.tile(x.reshape(-1, 1), (1, no))
-
-            w = layer.weights * aux
-            x = layer.A_OUT
-            if layer.bias_active:
-                w = np.row_stack((w, layer.bias))
-            layers_data.append(w)
-
-            if v_min is None:
-                v_min = w.min()
-            else:
-                v_min = min(w.min(), v_min)
-            if v_max is None:
-                v_max = w.max()
-            else:
-                v_max = max(w.max(), v_max)
+        neurons_data, layers_data, v_min, v_max = self.get_activation_cache().sample(
+            sample_index
+        )
 
         self.graph_view.update_net_neurons(neurons_data, 0.0, 1.0)
         self.graph_view.update_net_weights_and_bias(layers_data, v_min, v_max)
@@ -396,63 +800,3 @@ class MainWindow(dc.QMainWindow, PropertyModelListener):
         self.plot_gradients.update_plots(grads)
         self.graph_view.update_net_weights_and_bias(grads, v_min, v_max)
         self.graph_view.set_neuron_colors_default()
-
-
-from ...net.feedfoward import FeedFowardNeuralNetwork
-from ...net.layers import (
-    IdentityActivation,
-    Sigmoid,
-    Step,
-    ReLU,
-    Module,
-    BinaryCrossEntropyLoss,
-    SSELoss,
-    MSELoss,
-    MAELoss,
-)
-
-
-def get_activation_function_by_name(name: str) -> Module:
-    if name == "Identity":
-        return IdentityActivation()
-    if name == "ReLU":
-        return ReLU()
-    if name == "Sigmoid":
-        return Sigmoid()
-    if name == "Step":
-        return Step()
-    raise AttributeError(f"{name} is not a valid activation function.")
-
-
-def get_loss_function_by_name(name: str) -> Module:
-    if name == "Sum of Squared Errors":
-        return SSELoss()
-    if name == "Binary Cross Entropy Loss (log-loss)":
-        return BinaryCrossEntropyLoss()
-    if name == "Mean Squared Error (MSE)":
-        return MSELoss()
-    if name == "Mean Absolute Error (MAE)":
-        return MAELoss()
-    raise AttributeError(f"{name} is not a valid loss function.")
-
-
-def create_net(model_info: dict):
-    n_outputs = model_info["arch_n_outputs"]
-    n_inputs = model_info["arch_n_inputs"]
-    n_hidden = model_info["arch_n_hidden"]
-    hidden_layers = model_info["hidden_layers"]
-
-    layers = []
-    for idx in range(n_hidden):
-        n_neurons = hidden_layers[f"layer_n_neurons_{idx:04d}"]
-        has_bias = hidden_layers[f"layer_bias_{idx:04d}"]
-        name_act = hidden_layers[f"layer_activation_function_{idx:04d}"]
-        activation_function = get_activation_function_by_name(name_act)
-        layers.append((n_neurons, has_bias, activation_function))
-
-    has_bias = model_info["arch_output_bias"]
-    name_act = model_info["arch_output_activation_function"]
-    activation_function = get_activation_function_by_name(name_act)
-    layers.append((n_outputs, has_bias, activation_function))
-    net = FeedFowardNeuralNetwork(n_inputs, layers)
-    return net
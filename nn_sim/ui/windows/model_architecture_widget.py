@@ -2,6 +2,7 @@
 from copy import deepcopy
 from ..helpers import uihelper as dc
 
+from ...net.layers import get_activation_function_names
 from ..widgets.property_editor_tree import (
     PropertyItemModel,
     PropertyModel,
@@ -56,13 +57,9 @@ PARAMS_ARCHITECTURE = {
                         "can_be_null": False,
                         "default_value": "Sigmoid",
                         "combo_box": True,
-                        "combo_box_options": [
-                            "Identity",
-                            "ReLU",
-                            "Sigmoid",
-                            "Step",
-                            # "Tanh",
-                        ],
+                        "combo_box_options": get_activation_function_names(
+                            output_layer=True
+                        ),
                     },
                 },
                 {
@@ -106,6 +103,7 @@ PARAMS_ARCHITECTURE = {
                             "Binary Cross Entropy Loss (log-loss)",
                             "Mean Squared Error (MSE)",
                             "Mean Absolute Error (MAE)",
+                            "Categorical Cross Entropy",
                         ],
                     },
                 },
@@ -145,13 +143,7 @@ PARAMS_LAYER = {
                         "can_be_null": False,
                         "default_value": "Sigmoid",
                         "combo_box": True,
-                        "combo_box_options": [
-                            "Identity",
-                            "ReLU",
-                            "Sigmoid",
-                            "Step",
-                            # "Tanh",
-                        ],
+                        "combo_box_options": get_activation_function_names(),
                     },
                 },
                 {
@@ -229,32 +221,40 @@ class ModelArchitectureWidget(dc.QWidget, PropertyModelListener):
         pass
 
     def update_hidden_layers(self, n_layers):
-        prop_model = self.model_layers.get_model_dict()
-        if len(prop_model["property_model"]) != n_layers:
-            if len(prop_model["property_model"]) > n_layers:
-                prop_model["property_model"] = prop_model["property_model"][:n_layers]
-            else:
-                while len(prop_model["property_model"]) < n_layers:
-                    if len(prop_model["property_model"]) > 0:
-                        prop_model["property_model"].append(
-                            deepcopy(prop_model["property_model"][-1])
-                        )
-                    else:
-                        prop_model["property_model"].append(
-                            deepcopy(PARAMS_LAYER["property_model"][0])
-                        )
+        """Add or remove the last hidden layers, the others are kept.
 
-                for idx, layer_group in enumerate(prop_model["property_model"]):
-                    layer_group["id"] = f"layer_{idx:04}"
-                    layer_group["name"] = f"Hidden Layer {idx}"
-                    layer_group["items"][0]["id"] = f"layer_n_neurons_{idx:04}"
-                    layer_group["items"][1][
-                        "id"
-                    ] = f"layer_activation_function_{idx:04}"
-                    layer_group["items"][2]["id"] = f"layer_bias_{idx:04}"
+        A new layer copies the properties of the previous one.
+        """
+        layer_groups = self.model_layers.get_items()
+        n_current = len(layer_groups)
+        if n_current == n_layers:
+            return
 
-            self.model_layers = PropertyModel(self, prop_model)
-            self.tree_layers.set_property_model(self.model_layers)
+        self.tree_layers.setUpdatesEnabled(False)
+        with self.model_layers.batch_update():
+            while len(layer_groups) > n_layers:
+                group_id = layer_groups[-1].get_id()
+                self.model_layers.remove_group(group_id)
+                self.tree_layers.remove_group_item(group_id)
+
+            while len(layer_groups) < n_layers:
+                idx = len(layer_groups)
+                if idx > 0:
+                    layer_group = layer_groups[-1].get_dict()
+                else:
+                    layer_group = deepcopy(PARAMS_LAYER["property_model"][0])
+                layer_group["id"] = f"layer_{idx:04}"
+                layer_group["name"] = f"Hidden Layer {idx}"
+                layer_group["items"][0]["id"] = f"layer_n_neurons_{idx:04}"
+                layer_group["items"][1]["id"] = f"layer_activation_function_{idx:04}"
+                layer_group["items"][2]["id"] = f"layer_bias_{idx:04}"
+
+                group_model = self.model_layers.add_group(layer_group)
+                self.tree_layers.add_group_item(group_model)
+        if n_current == 0:
+            # the width of the icon columns does not depend on the layers
+            self.tree_layers.resize_columns()
+        self.tree_layers.setUpdatesEnabled(True)
 
     def get_model_info(self) -> dict:
         info = self.model_arch.get_values()
@@ -262,5 +262,17 @@ class ModelArchitectureWidget(dc.QWidget, PropertyModelListener):
         print(info)
         return info
 
+    def set_model_info(self, model_info: dict) -> None:
+        """Show the architecture of `model_info` (see `get_model_info`)."""
+        arch_values = {
+            key: value for key, value in model_info.items() if key != "hidden_layers"
+        }
+        self.model_arch.update_values(arch_values, trigger_event=False)
+        self.update_hidden_layers(model_info["arch_n_hidden"])
+        self.model_layers.update_values(
+            model_info["hidden_layers"], trigger_event=False
+        )
+        self.emit_change()
+
     def emit_change(self) -> None:
         self.on_architecture_changed.emit(self.get_model_info())
@@ -1,3 +1,4 @@
+import numpy as np
 import pyqtgraph as pg
 from ..helpers import uihelper as dc
 
@@ -18,22 +19,67 @@ class PlotLossWidget(dc.QWidget):
         self.legend = pg.LegendItem(offset=(-10, 10))
         self.legend.setParentItem(self.graph_widget.graphicsItem())
         self.legend.addItem(self.train_plot, "Training Loss")
-        # self.legend.addItem(self.val_plot, "Validation Loss")
+        self.legend.addItem(self.val_plot, "Validation Loss")
+        self.overlay_plots = list()  # loss curves of recorded runs
+
+        # learning rate of the schedulers, hidden without a schedule
+        self.lr_widget = pg.PlotWidget()
+        self.lr_plot = self.lr_widget.plot(pen="y")
+        self.lr_widget.setLabel("left", "Learning Rate")
+        self.lr_widget.showGrid(x=True, y=True, alpha=0.7)
+        self.lr_widget.setXLink(self.graph_widget)
+        self.lr_widget.setMaximumHeight(120)
+        self.lr_widget.setVisible(False)
 
         dc.Widget(
             widget=self,
             layout=dc.Rows(
                 self.graph_widget,
+                dc.NextRow,
+                self.lr_widget,
                 align=dc.Align.Top,
             ),
         )
 
-    def set_validation_loss(self, losses: list[float]) -> None:
-        self.val_plot.setData(losses)
+    def set_validation_loss(
+        self, losses: list[float], epochs: list[int] | None = None
+    ) -> None:
+        if epochs is None:
+            self.val_plot.setData(losses)
+        else:
+            self.val_plot.setData(epochs, losses)
         self.graph_widget.autoRange()
 
-    def set_train_loss(self, losses: list[float]) -> None:
-        self.train_plot.setData(losses)
+    def set_overlay_losses(
+        self, curves: list[tuple[str, np.ndarray, np.ndarray]]
+    ) -> None:
+        """Overlay (name, epochs, losses) curves, e.g. of previous runs."""
+        for plot in self.overlay_plots:
+            self.legend.removeItem(plot)
+            self.graph_widget.removeItem(plot)
+        self.overlay_plots.clear()
+
+        for idx, (name, epochs, losses) in enumerate(curves):
+            pen = pg.mkPen(pg.intColor(idx, hues=max(len(curves), 6)), width=1)
+            pen.setStyle(dc.Qt.PenStyle.DashLine)
+            plot = self.graph_widget.plot(epochs, losses, pen=pen, name=name)
+            self.legend.addItem(plot, name)
+            self.overlay_plots.append(plot)
+        self.graph_widget.autoRange()
+
+    def set_learning_rate(self, learning_rates: list[float]) -> None:
+        self.lr_plot.setData(learning_rates)
+        self.lr_widget.setVisible(len(learning_rates) > 0)
+
+    def set_train_loss(
+        self, losses: list[float], epochs: list[int] | None = None
+    ) -> None:
+        if epochs is None:
+            self.train_plot.setData(losses)
+        else:
+            self.train_plot.setData(epochs, losses)
+        if len(losses) == 0:
+            return
 
         max_val = max(losses)
 
@@ -1,7 +1,10 @@
+import os
 from typing import Optional
 from ..helpers import uihelper as dc
 
 from ...data.dataset_loader import DatasetNN
+from ...net.schedulers import SCHEDULERS
+from ...net.jit import JIT_AVAILABLE
 
 
 class TrainWidget(dc.QWidget):
@@ -22,13 +25,33 @@ class TrainWidget(dc.QWidget):
             items=[
                 "SGD",
                 "SGD with Momentum",
+                "SGD with Nesterov Momentum",
+                "RMSprop",
+                "Adagrad",
                 "ADAM",
+                "AdamW",
+                "L-BFGS",
             ],
             on_index_changed=self.on_optim_changed,
         )
 
         self.sp_epochs = dc.SpinBox(range=(1, 1000000), single_step=10, value=100)
 
+        self.cb_lr_scheduler = dc.ComboBox(
+            selected_item="Constant",
+            items=SCHEDULERS,
+            on_index_changed=self.on_lr_scheduler_changed,
+        )
+        self.sp_lr_warmup = dc.SpinBox(range=(0, 1000000), value=0, single_step=10)
+        self.lb_lr_gamma = dc.Label("Decay Factor:")
+        self.sp_lr_gamma = dc.DoubleSpinBox(
+            range=(0.0001, 1.0), value=0.5, single_step=0.01, decimals=4
+        )
+        self.lb_lr_step = dc.Label("Decay Every (epochs):")
+        self.sp_lr_step = dc.SpinBox(range=(1, 1000000), value=100, single_step=10)
+        self.lb_lr_patience = dc.Label("Plateau Patience (epochs):")
+        self.sp_lr_patience = dc.SpinBox(range=(0, 1000000), value=10, single_step=1)
+
         self.cb_batch_mode = dc.ComboBox(
             selected_item="Mini Batch",
             items=["Mini Batch", "Single Batch (all samples)"],
@@ -36,6 +59,7 @@ class TrainWidget(dc.QWidget):
         )
         self.sp_batch_size = dc.SpinBox(range=(1, 100), value=100, single_step=1)
         self.max_batch_size = 100
+        self.sp_accumulate_steps = dc.SpinBox(range=(1, 100000), value=1, single_step=1)
 
         self.lb_momentum = dc.Label("Momentum:")
         self.sp_momentum = dc.DoubleSpinBox(
@@ -57,6 +81,76 @@ class TrainWidget(dc.QWidget):
             range=(0.00000001, 1.0), value=0.0000001, single_step=0.0000001, decimals=8
         )
 
+        self.lb_rho = dc.Label("Decay Rate (rho):")
+        self.sp_rho = dc.DoubleSpinBox(
+            range=(0.001, 0.999), value=0.9, single_step=0.01, decimals=3
+        )
+
+        self.lb_weight_decay = dc.Label("Weight Decay:")
+        self.sp_weight_decay = dc.DoubleSpinBox(
+            range=(0.0, 1.0), value=0.01, single_step=0.001, decimals=4
+        )
+
+        self.lb_history_size = dc.Label("History Size (L-BFGS):")
+        self.sp_history_size = dc.SpinBox(range=(1, 100), value=10, single_step=1)
+
+        # parameter widgets shown for each optimizer
+        self.optim_parameters = {
+            "SGD": [],
+            "SGD with Momentum": [self.lb_momentum, self.sp_momentum],
+            "SGD with Nesterov Momentum": [self.lb_momentum, self.sp_momentum],
+            "RMSprop": [self.lb_rho, self.sp_rho, self.lb_epsilon, self.sp_epsilon],
+            "Adagrad": [self.lb_epsilon, self.sp_epsilon],
+            "ADAM": [
+                self.lb_beta1,
+                self.sp_beta1,
+                self.lb_beta2,
+                self.sp_beta2,
+                self.lb_epsilon,
+                self.sp_epsilon,
+            ],
+            "AdamW": [
+                self.lb_beta1,
+                self.sp_beta1,
+                self.lb_beta2,
+                self.sp_beta2,
+                self.lb_epsilon,
+                self.sp_epsilon,
+                self.lb_weight_decay,
+                self.sp_weight_decay,
+            ],
+            "L-BFGS": [self.lb_history_size, self.sp_history_size],
+        }
+
+        self.sp_val_split = dc.DoubleSpinBox(
+            range=(0.0, 0.9), value=0.0, single_step=0.05, decimals=2
+        )
+        self.sp_val_every = dc.SpinBox(range=(1, 100000), value=1, single_step=1)
+        self.sp_patience = dc.SpinBox(range=(0, 1000000), value=0, single_step=10)
+
+        self.sp_workers = dc.SpinBox(
+            range=(1, os.cpu_count() or 1), value=1, single_step=1
+        )
+
+        self.ck_hogwild = dc.CheckBox(
+            "Asynchronous SGD (Hogwild)", on_state_changed=self.on_hogwild_changed
+        )
+
+        self.ck_jit = dc.CheckBox("JIT Compiled Training (Numba)")
+        self.ck_jit.setToolTip(
+            "Full-batch training of small networks in one compiled loop."
+            if JIT_AVAILABLE
+            else "Numba is not installed."
+        )
+        self.ck_jit.setEnabled(JIT_AVAILABLE)
+
+        self.ck_continue_training = dc.CheckBox("Continue Training")
+        self.ck_record_run = dc.CheckBox("Record Run (runs folder)")
+        self.ck_record_run.setChecked(True)
+        self.sp_checkpoint_every = dc.SpinBox(
+            range=(0, 1000000), value=0, single_step=100
+        )
+
         self.ck_store_gradients = dc.CheckBox("Store Gradients")
         self.btn_next_gradient = dc.Button(
             "grad", icon=dc.IconM("ma-navigate-next-black", color=(0, 255, 0, 255))
@@ -84,6 +178,26 @@ class TrainWidget(dc.QWidget):
                 dc.NextRow,
                 self.sp_epochs,
                 dc.NextRow,
+                dc.Label("Learning Rate Schedule:"),
+                dc.NextRow,
+                self.cb_lr_scheduler,
+                dc.NextRow,
+                dc.Label("Warmup (epochs):"),
+                dc.NextRow,
+                self.sp_lr_warmup,
+                dc.NextRow,
+                self.lb_lr_gamma,
+                dc.NextRow,
+                self.sp_lr_gamma,
+                dc.NextRow,
+                self.lb_lr_step,
+                dc.NextRow,
+                self.sp_lr_step,
+                dc.NextRow,
+                self.lb_lr_patience,
+                dc.NextRow,
+                self.sp_lr_patience,
+                dc.NextRow,
                 dc.Label("Batch Mode:"),
                 dc.NextRow,
                 self.cb_batch_mode,
@@ -92,6 +206,10 @@ class TrainWidget(dc.QWidget):
                 dc.NextRow,
                 self.sp_batch_size,
                 dc.NextRow,
+                dc.Label("Accumulate Batches per Update:"),
+                dc.NextRow,
+                self.sp_accumulate_steps,
+                dc.NextRow,
                 dc.Label("Optimizer:"),
                 dc.NextRow,
                 self.cb_optim,
@@ -112,6 +230,46 @@ class TrainWidget(dc.QWidget):
                 dc.NextRow,
                 self.sp_epsilon,
                 dc.NextRow,
+                self.lb_rho,
+                dc.NextRow,
+                self.sp_rho,
+                dc.NextRow,
+                self.lb_weight_decay,
+                dc.NextRow,
+                self.sp_weight_decay,
+                dc.NextRow,
+                self.lb_history_size,
+                dc.NextRow,
+                self.sp_history_size,
+                dc.NextRow,
+                dc.Label("Validation Split:"),
+                dc.NextRow,
+                self.sp_val_split,
+                dc.NextRow,
+                dc.Label("Validate Every (epochs):"),
+                dc.NextRow,
+                self.sp_val_every,
+                dc.NextRow,
+                dc.Label("Early Stopping Patience (0 = off):"),
+                dc.NextRow,
+                self.sp_patience,
+                dc.NextRow,
+                dc.Label("Worker Processes (data parallel):"),
+                dc.NextRow,
+                self.sp_workers,
+                dc.NextRow,
+                self.ck_hogwild,
+                dc.NextRow,
+                self.ck_jit,
+                dc.NextRow,
+                dc.Label("Checkpoint Every (epochs, 0 = off):"),
+                dc.NextRow,
+                self.sp_checkpoint_every,
+                dc.NextRow,
+                self.ck_continue_training,
+                dc.NextRow,
+                self.ck_record_run,
+                dc.NextRow,
                 self.ck_store_gradients,
                 dc.NextRow,
                 # dc.Rows(
@@ -127,6 +285,7 @@ class TrainWidget(dc.QWidget):
         )
 
         self.on_optim_changed()
+        self.on_lr_scheduler_changed()
 
     def on_dataset_changed(self, dataset: DatasetNN) -> None:
         self.max_batch_size = len(dataset)
@@ -136,82 +295,108 @@ class TrainWidget(dc.QWidget):
     def batch_mode_changed(self, arg1=None) -> None:
         if self.cb_batch_mode.currentText() == "Mini Batch":
             self.sp_batch_size.setEnabled(True)
+            self.sp_accumulate_steps.setEnabled(not self.ck_hogwild.isChecked())
         else:
             self.sp_batch_size.setValue(self.max_batch_size)
             self.sp_batch_size.setEnabled(False)
+            self.sp_accumulate_steps.setEnabled(False)
+
+    def on_lr_scheduler_changed(self, arg1=None) -> None:
+        scheduler = self.cb_lr_scheduler.currentText()
+        uses_gamma = scheduler in ("Step", "Exponential", "Reduce on Plateau")
+        self.lb_lr_gamma.setVisible(uses_gamma)
+        self.sp_lr_gamma.setVisible(uses_gamma)
+        self.lb_lr_step.setVisible(scheduler == "Step")
+        self.sp_lr_step.setVisible(scheduler == "Step")
+        self.lb_lr_patience.setVisible(scheduler == "Reduce on Plateau")
+        self.sp_lr_patience.setVisible(scheduler == "Reduce on Plateau")
 
     def on_optim_changed(self, arg1=None) -> None:
         optim = self.cb_optim.currentText()
-        if optim == "SGD":
-            for item in [
-                self.lb_momentum,
-                self.sp_momentum,
-                self.lb_beta1,
-                self.sp_beta1,
-                self.lb_beta2,
-                self.sp_beta2,
-                self.lb_epsilon,
-                self.sp_epsilon,
-                self.ck_store_gradients,
-                self.btn_prev_gradient,
-                self.btn_play_gradient,
-                self.btn_next_gradient,
-                self.txt_epoch_grad,
-            ]:
-                item.setVisible(False)
-            self.ck_store_gradients.setChecked(False)
-        elif optim == "SGD with Momentum":
-            for item in [
-                self.lb_beta1,
-                self.sp_beta1,
-                self.lb_beta2,
-                self.sp_beta2,
-                self.lb_epsilon,
-                self.sp_epsilon,
-                self.ck_store_gradients,
-                self.btn_prev_gradient,
-                self.btn_play_gradient,
-                self.btn_next_gradient,
-                self.txt_epoch_grad,
-            ]:
-                item.setVisible(False)
+        shown = self.optim_parameters[optim]
+        for items in self.optim_parameters.values():
+            for item in items:
+                item.setVisible(item in shown)
+
+        # the stored gradients are recorded by the ADAM training loop
+        for item in [
+            self.ck_store_gradients,
+            self.btn_prev_gradient,
+            self.btn_play_gradient,
+            self.btn_next_gradient,
+            self.txt_epoch_grad,
+        ]:
+            item.setVisible(optim == "ADAM")
+        if optim != "ADAM":
             self.ck_store_gradients.setChecked(False)
-            self.lb_momentum.setVisible(True)
-            self.sp_momentum.setVisible(True)
-        else:
-            self.lb_momentum.setVisible(False)
-            self.sp_momentum.setVisible(False)
-            for item in [
-                self.lb_beta1,
-                self.sp_beta1,
-                self.lb_beta2,
-                self.sp_beta2,
-                self.lb_epsilon,
-                self.sp_epsilon,
-                self.ck_store_gradients,
-                self.btn_prev_gradient,
-                self.btn_play_gradient,
-                self.btn_next_gradient,
-                self.txt_epoch_grad,
-            ]:
-                item.setVisible(True)
+
+        # Hogwild workers run plain SGD
+        self.ck_hogwild.setVisible(optim == "SGD")
+        if optim != "SGD":
+            self.ck_hogwild.setChecked(False)
+
+        # the L-BFGS line search evaluates the loss of the whole dataset in one
+        # process, the learning rate is its first trial step length
+        if optim == "L-BFGS":
+            self.cb_batch_mode.setCurrentText("Single Batch (all samples)")
+            self.sp_lr.setValue(1.0)
+            self.sp_workers.setValue(1)
+        self.cb_batch_mode.setEnabled(optim != "L-BFGS")
+        self.sp_workers.setEnabled(optim != "L-BFGS")
+
+    def on_hogwild_changed(self, arg1=None) -> None:
+        # the Hogwild workers run NumPy SGD at a constant learning rate, with
+        # one update per batch
+        hogwild = self.ck_hogwild.isChecked()
+        if hogwild:
+            self.cb_lr_scheduler.setCurrentText("Constant")
+            self.sp_lr_warmup.setValue(0)
+            self.sp_accumulate_steps.setValue(1)
+            self.ck_jit.setChecked(False)
+        self.cb_lr_scheduler.setEnabled(not hogwild)
+        self.sp_lr_warmup.setEnabled(not hogwild)
+        self.ck_jit.setEnabled(JIT_AVAILABLE and not hogwild)
+        self.batch_mode_changed()
 
     def get_parameters(self) -> None:
         out = dict(
             learning_rate=self.sp_lr.value(),
             optim=self.cb_optim.currentText(),
             epochs=self.sp_epochs.value(),
+            lr_scheduler=self.cb_lr_scheduler.currentText(),
+            lr_warmup_epochs=self.sp_lr_warmup.value(),
+            lr_gamma=self.sp_lr_gamma.value(),
+            lr_step_epochs=self.sp_lr_step.value(),
+            lr_patience=self.sp_lr_patience.value(),
             batch_mode=self.cb_batch_mode.currentText(),
+            val_split=self.sp_val_split.value(),
+            val_every=self.sp_val_every.value(),
+            patience=self.sp_patience.value(),
+            checkpoint_every=self.sp_checkpoint_every.value(),
+            n_workers=self.sp_workers.value(),
+            hogwild=self.ck_hogwild.isChecked(),
+            jit=self.ck_jit.isChecked(),
+            record_run=self.ck_record_run.isChecked(),
         )
 
         if out["batch_mode"] == "Mini Batch":
             out["batch_size"] = self.sp_batch_size.value()
+            out["accumulate_steps"] = self.sp_accumulate_steps.value()
 
-        if out["optim"] == "SGD with Momentum":
+        if out["optim"] in ("SGD with Momentum", "SGD with Nesterov Momentum"):
             out["momentum"] = self.sp_momentum.value()
-        elif out["optim"] == "ADAM":
+        elif out["optim"] in ("ADAM", "AdamW"):
             out["beta1"] = self.sp_beta1.value()
             out["beta2"] = self.sp_beta2.value()
             out["epsilon"] = self.sp_epsilon.value()
+            if out["optim"] == "AdamW":
+                out["weight_decay"] = self.sp_weight_decay.value()
+        elif out["optim"] == "RMSprop":
+            out["rho"] = self.sp_rho.value()
+            out["epsilon"] = self.sp_epsilon.value()
+        elif out["optim"] == "Adagrad":
+            out["epsilon"] = self.sp_epsilon.value()
+        elif out["optim"] == "L-BFGS":
+            out["history_size"] = self.sp_history_size.value()
 
         return out
@@ -7,12 +7,13 @@ from nn_sim.ui.windows import MainWindow
 
 import qtmodern.styles
 
-ctx = dc.ApplicationContext()
-app = dc.Application(ctx, sys.argv)
-qtmodern.styles.dark(app)
-dc.app_set_font(app, font_size=14)
+if __name__ == "__main__":
+    ctx = dc.ApplicationContext()
+    app = dc.Application(ctx, sys.argv)
+    qtmodern.styles.dark(app)
+    dc.app_set_font(app, font_size=14)
 
-mw = MainWindow(ctx)
-mw.show()
+    mw = MainWindow(ctx)
+    mw.show()
 
-sys.exit(app.exec())
+    sys.exit(app.exec())
@@ -0,0 +1,47 @@
+import contextlib
+import io
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# the tests import the nn_sim package of this checkout, run from anywhere
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nn_sim.data.dataset_loader import ArrayDataset  # noqa: E402
+
+
+@pytest.fixture
+def make_dataset():
+    """Factory of random datasets: normal inputs, uniform or one-hot targets."""
+
+    def make_dataset(
+        n_samples: int = 20,
+        n_inputs: int = 3,
+        n_outputs: int = 2,
+        *,
+        one_hot: bool = False,
+        seed: int = 0,
+    ) -> ArrayDataset:
+        rng = np.random.default_rng(seed)
+        X = rng.normal(size=(n_samples, n_inputs))
+        if one_hot:
+            Y = np.eye(n_outputs)[rng.integers(0, n_outputs, n_samples)]
+        else:
+            Y = rng.uniform(size=(n_samples, n_outputs))
+        return ArrayDataset(X, Y)
+
+    return make_dataset
+
+
+@pytest.fixture
+def quiet():
+    """Call a training function without its progress bar and loss print."""
+
+    def quiet(train_func, *args, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            with contextlib.redirect_stderr(io.StringIO()):
+                return train_func(*args, **kwargs)
+
+    return quiet
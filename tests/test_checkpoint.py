@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+
+from nn_sim.net.checkpoint import Checkpointer, load_checkpoint, save_checkpoint
+from nn_sim.net.feedfoward import FeedFowardNeuralNetwork
+from nn_sim.net.layers import ReLU, SSELoss, Sigmoid
+from nn_sim.net.optimizers import create_optimizer
+from nn_sim.net.train import fit
+
+TRAIN_PARAMS = dict(
+    optim="ADAM",
+    learning_rate=0.01,
+    beta1=0.9,
+    beta2=0.999,
+    epsilon=1e-8,
+    epochs=30,
+)
+
+
+def create_net() -> FeedFowardNeuralNetwork:
+    np.random.seed(0)
+    return FeedFowardNeuralNetwork(3, [(5, True, ReLU()), (2, False, Sigmoid())])
+
+
+@pytest.fixture
+def train(make_dataset, quiet):
+    dataset = make_dataset(16)
+
+    def train(net, optimizer, epochs, callbacks=None, start_epoch=0) -> list[float]:
+        return quiet(
+            fit,
+            net,
+            dataset,
+            SSELoss(),
+            optimizer,
+            epochs,
+            None,
+            callbacks,
+            start_epoch,
+        )
+
+    return train
+
+
+def test_round_trip(train, tmp_path):
+    net = create_net()
+    optimizer = create_optimizer(net, TRAIN_PARAMS)
+    train_losses = train(net, optimizer, 5)
+    file_path = str(tmp_path / "net.npz")
+    model_info = dict(arch_n_inputs=3)
+    save_checkpoint(
+        file_path,
+        net,
+        model_info=model_info,
+        train_params=TRAIN_PARAMS,
+        optimizer=optimizer,
+        epoch=5,
+        train_losses=train_losses,
+    )
+
+    checkpoint = load_checkpoint(file_path)
+    assert checkpoint["model_info"] == model_info
+    assert checkpoint["train_params"] == TRAIN_PARAMS
+    assert checkpoint["epoch"] == 5
+    assert checkpoint["train_losses"] == train_losses
+    for layer, loaded in zip(net.layers, checkpoint["net"].layers):
+        np.testing.assert_array_equal(loaded.weights, layer.weights)
+        np.testing.assert_array_equal(loaded.bias, layer.bias)
+        assert loaded.bias_active == layer.bias_active
+        assert type(loaded.activation) is type(layer.activation)
+    state = optimizer.state_dict()
+    loaded_state = checkpoint["optimizer_state"]
+    assert loaded_state["t"] == state["t"] == 5
+    for layer_state, loaded in zip(state["state"], loaded_state["state"]):
+        assert layer_state.keys() == loaded.keys()
+        for key in layer_state:
+            np.testing.assert_array_equal(loaded[key], layer_state[key])
+
+
+def test_resumed_training_matches_uninterrupted(train, tmp_path):
+    net = create_net()
+    expected = train(net, create_optimizer(net, TRAIN_PARAMS), 30)
+
+    file_path = str(tmp_path / "net.npz")
+    net = create_net()
+    optimizer = create_optimizer(net, TRAIN_PARAMS)
+    checkpointer = Checkpointer(
+        file_path, optimizer, every=4, train_params=TRAIN_PARAMS
+    )
+    train(net, optimizer, 10, [checkpointer])
+
+    checkpoint = load_checkpoint(file_path)
+    assert checkpoint["epoch"] == 10
+    net = checkpoint["net"]
+    optimizer = create_optimizer(net, checkpoint["train_params"])
+    optimizer.load_state_dict(checkpoint["optimizer_state"])
+    resumed = train(net, optimizer, 30, start_epoch=checkpoint["epoch"])
+
+    np.testing.assert_array_equal(checkpoint["train_losses"] + resumed, expected)
+
+
+def test_newer_version_is_rejected(tmp_path, monkeypatch):
+    from nn_sim.net import checkpoint
+
+    file_path = str(tmp_path / "net.npz")
+    monkeypatch.setattr(checkpoint, "CHECKPOINT_VERSION", 2)
+    save_checkpoint(file_path, create_net())
+    monkeypatch.setattr(checkpoint, "CHECKPOINT_VERSION", 1)
+    with pytest.raises(AssertionError):
+        load_checkpoint(file_path)
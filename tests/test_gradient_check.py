@@ -0,0 +1,41 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from nn_sim.net import gradient_check
+from nn_sim.net.gradient_check import LOSSES, check_gradients, create_problem
+from nn_sim.net.layers import ACTIVATION_FUNCTIONS, MSELoss
+
+DTYPES = [np.float64, np.float32]
+
+
+@pytest.mark.parametrize("dtype", DTYPES, ids=lambda dtype: np.dtype(dtype).name)
+@pytest.mark.parametrize("loss_class", LOSSES, ids=lambda cls: cls.__name__)
+@pytest.mark.parametrize("activation_name", list(ACTIVATION_FUNCTIONS))
+def test_backward_matches_central_differences(activation_name, loss_class, dtype):
+    net, X, Y, loss_func = create_problem(activation_name, loss_class, dtype)
+    result = check_gradients(net, X, Y, loss_func)
+
+    assert result["passed"], (
+        f"relative error {result['relative_error']:.2e}, "
+        f"per array {result['layers']}"
+    )
+    assert net(X).dtype == dtype
+
+    # a zero derivative (Step) makes the check of the arrays before it vacuous
+    zero = result["zero_gradients"]
+    if len(zero) == len(result["layers"]):
+        pytest.skip(f"all the gradients are zero, nothing checked: {zero}")
+    if zero:
+        warnings.warn(f"{activation_name}: zero gradients, not checked: {zero}")
+
+
+def test_wrong_gradient_scale_fails(monkeypatch):
+    # the check is not vacuous: a changed derivative convention is caught
+    scales = dict(gradient_check.GRADIENT_SCALES)
+    scales[MSELoss] = lambda n, m: 1 / n
+    monkeypatch.setattr(gradient_check, "GRADIENT_SCALES", scales)
+
+    net, X, Y, loss_func = create_problem("Sigmoid", MSELoss)
+    assert not check_gradients(net, X, Y, loss_func)["passed"]
@@ -0,0 +1,176 @@
+import numpy as np
+import pytest
+
+from nn_sim.net import jit
+from nn_sim.net.callbacks import TrainCallback
+from nn_sim.net.feedfoward import FeedFowardNeuralNetwork
+from nn_sim.net.jit import JitTrainer, fit_jit
+from nn_sim.net.layers import (
+    BinaryCrossEntropyLoss,
+    CategoricalCrossEntropyLoss,
+    MAELoss,
+    MSELoss,
+    Sigmoid,
+    Softmax,
+    SSELoss,
+    Tanh,
+)
+from nn_sim.net.optimizers import SGD, SGDMomentum, Adam, RMSprop
+from nn_sim.net.population import create_population
+from nn_sim.net.schedulers import StepLR
+from nn_sim.net.train import fit
+
+OPTIMIZERS = {
+    "SGD": lambda net: SGD(net, 0.1),
+    "SGDMomentum": lambda net: SGDMomentum(net, 0.1, 0.9),
+    "Adam": lambda net: Adam(net, 0.01),
+}
+LOSSES = [
+    SSELoss,
+    MSELoss,
+    MAELoss,
+    BinaryCrossEntropyLoss,
+    CategoricalCrossEntropyLoss,
+]
+
+
+class LossRecorder(TrainCallback):
+    needs_epoch_state = False
+
+    def __init__(self) -> None:
+        self.losses = list()
+
+    def on_epoch_end(self, net, epoch, train_loss) -> bool:
+        self.losses.append(train_loss)
+        return False
+
+
+def create_net(loss_class=SSELoss) -> FeedFowardNeuralNetwork:
+    np.random.seed(0)
+    output = Softmax() if loss_class is CategoricalCrossEntropyLoss else Sigmoid()
+    return FeedFowardNeuralNetwork(3, [(5, True, Tanh()), (2, True, output)])
+
+
+@pytest.fixture
+def train(make_dataset, quiet):
+    def train(fit_func, loss_class, optim_name, epochs=50, **kwargs):
+        net = create_net(loss_class)
+        optimizer = OPTIMIZERS[optim_name](net)
+        dataset = make_dataset(one_hot=loss_class is CategoricalCrossEntropyLoss)
+        losses = quiet(
+            fit_func, net, dataset, loss_class(), optimizer, epochs, **kwargs
+        )
+        return net, optimizer, losses
+
+    return train
+
+
+def assert_same_training(expected, actual, rtol=1e-12):
+    net, optimizer, losses = expected
+    jit_net, jit_optimizer, jit_losses = actual
+    np.testing.assert_allclose(jit_losses, losses, rtol=rtol)
+    for layer, jit_layer in zip(net.layers, jit_net.layers):
+        np.testing.assert_allclose(jit_layer.weights, layer.weights, rtol=rtol)
+        np.testing.assert_allclose(jit_layer.bias, layer.bias, rtol=rtol)
+    assert jit_optimizer.t == optimizer.t
+
+
+def test_fallback_is_fit(train, monkeypatch):
+    # without Numba fit_jit runs the NumPy loop
+    monkeypatch.setattr(jit, "JIT_AVAILABLE", False)
+    assert_same_training(
+        train(fit, SSELoss, "Adam"), train(fit_jit, SSELoss, "Adam"), rtol=0
+    )
+
+
+def test_mini_batches_use_fit(train):
+    np.random.seed(1)
+    expected = train(fit, SSELoss, "SGD", 5, batch_size=8)
+    np.random.seed(1)
+    assert_same_training(expected, train(fit_jit, SSELoss, "SGD", 5, batch_size=8))
+
+
+def test_supports(monkeypatch):
+    monkeypatch.setattr(jit, "JIT_AVAILABLE", True)
+    net = create_net()
+    assert JitTrainer.supports(net, SSELoss(), Adam(net, 0.01))
+    assert not JitTrainer.supports(net, SSELoss(), RMSprop(net, 0.01))
+
+    class CustomLoss(SSELoss):
+        pass
+
+    class CustomActivation(Sigmoid):
+        pass
+
+    assert not JitTrainer.supports(net, CustomLoss(), Adam(net, 0.01))
+    custom = FeedFowardNeuralNetwork(3, [(2, True, CustomActivation())])
+    assert not JitTrainer.supports(custom, SSELoss(), Adam(custom, 0.01))
+    population = create_population(3, [(2, True, Sigmoid())], 2)
+    assert not JitTrainer.supports(population, SSELoss(), Adam(population, 0.01))
+
+    monkeypatch.setattr(jit, "JIT_AVAILABLE", False)
+    assert not JitTrainer.supports(net, SSELoss(), Adam(net, 0.01))
+
+
+@pytest.mark.parametrize("optim_name", list(OPTIMIZERS))
+@pytest.mark.parametrize("loss_class", LOSSES, ids=lambda cls: cls.__name__)
+def test_compiled_matches_fit(train, loss_class, optim_name):
+    pytest.importorskip("numba")
+    expected = train(fit, loss_class, optim_name)
+    actual = train(fit_jit, loss_class, optim_name)
+    assert_same_training(expected, actual, rtol=1e-9)
+    # the optimizer state is a view of the kernel buffers
+    for state, jit_state in zip(
+        expected[1].state_dict()["state"], actual[1].state_dict()["state"]
+    ):
+        for key in state:
+            np.testing.assert_allclose(
+                jit_state[key], state[key], rtol=1e-9, atol=1e-15
+            )
+
+
+def test_compiled_chunks_with_callbacks_and_schedule(train):
+    pytest.importorskip("numba")
+
+    def with_schedule(fit_func):
+        def fit_scheduled(net, dataset, loss_func, optimizer, epochs, **kwargs):
+            scheduler = StepLR(optimizer, 10, 0.5)
+            recorder = LossRecorder()
+            losses = fit_func(
+                net,
+                dataset,
+                loss_func,
+                optimizer,
+                epochs,
+                callbacks=[scheduler, recorder],
+                **kwargs
+            )
+            assert recorder.losses == losses
+            assert len(scheduler.learning_rates) == epochs
+            return losses
+
+        return fit_scheduled
+
+    expected = train(with_schedule(fit), SSELoss, "Adam", 200)
+    # the scheduler needs the epoch state, the recorder alone lets chunks grow
+    actual = train(with_schedule(fit_jit), SSELoss, "Adam", 200, chunk_epochs=16)
+    assert_same_training(expected, actual, rtol=1e-9)
+
+
+def test_compiled_loss_only_callbacks_run_in_chunks(train, monkeypatch):
+    pytest.importorskip("numba")
+    calls = list()
+    run = JitTrainer.run
+
+    def counted_run(self, X, Y, n_epochs):
+        calls.append(n_epochs)
+        return run(self, X, Y, n_epochs)
+
+    monkeypatch.setattr(JitTrainer, "run", counted_run)
+    recorder = LossRecorder()
+    expected = train(fit, SSELoss, "SGD", 500)
+    actual = train(fit_jit, SSELoss, "SGD", 500, callbacks=[recorder])
+    assert_same_training(expected, actual, rtol=1e-9)
+    assert recorder.losses == actual[2]
+    assert sum(calls) == 500
+    assert len(calls) < 500
@@ -0,0 +1,117 @@
+import numpy as np
+import pytest
+
+from nn_sim.net.metrics import (
+    ConfusionMatrix,
+    compute_classification_metrics,
+    confusion_matrix,
+    metrics_from_confusion_matrix,
+)
+
+
+def brute_force_confusion_matrix(pred_labels, true_labels, num_classes):
+    matrix = np.zeros((num_classes, num_classes), dtype=np.int64)
+    for true, pred in zip(true_labels, pred_labels):
+        matrix[true, pred] += 1
+    return matrix
+
+
+@pytest.mark.parametrize("num_classes", [2, 3, 7])
+def test_bincount_matches_brute_force(num_classes):
+    rng = np.random.default_rng(num_classes)
+    true_labels = rng.integers(0, num_classes, 200)
+    scores = rng.uniform(size=(200, num_classes))
+    expected = brute_force_confusion_matrix(
+        scores.argmax(axis=1), true_labels, num_classes
+    )
+
+    matrix = confusion_matrix(scores, np.eye(num_classes)[true_labels])
+    np.testing.assert_array_equal(matrix, expected)
+    matrix = confusion_matrix(
+        scores.argmax(axis=1), true_labels, num_classes=num_classes
+    )
+    np.testing.assert_array_equal(matrix, expected)
+
+
+def test_binary_scores_use_the_threshold():
+    y_true = np.array([0.0, 1.0, 1.0, 0.0, 1.0])
+    y_pred = np.array([[0.2], [0.9], [0.4], [0.7], [0.6]])
+    np.testing.assert_array_equal(confusion_matrix(y_pred, y_true), [[1, 1], [1, 2]])
+    np.testing.assert_array_equal(
+        confusion_matrix(y_pred, y_true, threshold=0.3), [[1, 1], [0, 3]]
+    )
+
+
+def test_metrics_of_a_known_matrix():
+    # rows: true class, columns: predicted class
+    matrix = np.array([[5, 1, 0], [2, 3, 1], [0, 0, 4]])
+    scores = metrics_from_confusion_matrix(matrix)
+
+    precision = np.array([5 / 7, 3 / 4, 4 / 5])
+    recall = np.array([5 / 6, 3 / 6, 4 / 4])
+    f1_score = 2 * precision * recall / (precision + recall)
+    assert scores["accuracy"] == pytest.approx(12 / 16)
+    np.testing.assert_allclose(scores["precision"], precision)
+    np.testing.assert_allclose(scores["recall"], recall)
+    np.testing.assert_allclose(scores["f1_score"], f1_score)
+    np.testing.assert_array_equal(scores["support"], [6, 6, 4])
+    assert scores["macro_precision"] == pytest.approx(precision.mean())
+    assert scores["macro_recall"] == pytest.approx(recall.mean())
+    assert scores["macro_f1_score"] == pytest.approx(f1_score.mean())
+    # single label: micro precision = micro recall = micro F1 = accuracy
+    for name in ("micro_precision", "micro_recall", "micro_f1_score"):
+        assert scores[name] == pytest.approx(12 / 16)
+
+
+def test_classes_without_samples_score_zero():
+    scores = metrics_from_confusion_matrix(np.array([[3, 0], [0, 0]]))
+    np.testing.assert_array_equal(scores["precision"], [1.0, 0.0])
+    np.testing.assert_array_equal(scores["recall"], [1.0, 0.0])
+
+
+def test_binary_metrics_of_the_positive_class():
+    y_true = np.array([1, 1, 1, 0, 0])
+    y_pred = np.array([1, 1, 0, 1, 0])
+    scores = compute_classification_metrics(y_pred, y_true)
+    assert scores["accuracy"] == pytest.approx(3 / 5)
+    assert scores["precision"] == pytest.approx(2 / 3)
+    assert scores["recall"] == pytest.approx(2 / 3)
+    assert scores["f1_score"] == pytest.approx(2 / 3)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1000])
+def test_streaming_update_matches_one_call(chunk_size):
+    rng = np.random.default_rng(0)
+    y_true = np.eye(4)[rng.integers(0, 4, 300)]
+    y_pred = rng.uniform(size=(300, 4))
+
+    confusion = ConfusionMatrix(4)
+    for start in range(0, len(y_true), chunk_size):
+        stop = start + chunk_size
+        confusion.update(y_pred[start:stop], y_true[start:stop])
+    np.testing.assert_array_equal(confusion.matrix, confusion_matrix(y_pred, y_true))
+
+    confusion.reset()
+    assert confusion.matrix.sum() == 0
+
+
+def test_empty_input():
+    np.testing.assert_array_equal(confusion_matrix([], []), np.zeros((2, 2)))
+    confusion = ConfusionMatrix(3)
+    confusion.update(np.zeros((0, 3)), np.zeros((0, 3)))
+    np.testing.assert_array_equal(confusion.matrix, np.zeros((3, 3)))
+    assert confusion.compute()["accuracy"] == 0.0
+
+
+@pytest.mark.parametrize(
+    "y_pred,y_true",
+    [([0, 2, 1], [0, 1, 1]), ([0, 1, 1], [0, 1, 5]), ([0, -1, 1], [0, 1, 1])],
+)
+def test_labels_out_of_range_are_rejected(y_pred, y_true):
+    with pytest.raises(ValueError, match="outside"):
+        confusion_matrix(np.array(y_pred), np.array(y_true), num_classes=2)
+
+
+def test_different_numbers_of_samples_are_rejected():
+    with pytest.raises(ValueError, match="same number"):
+        confusion_matrix(np.zeros(3), np.zeros(4))
@@ -0,0 +1,122 @@
+from functools import partial
+
+import numpy as np
+import pytest
+
+from nn_sim.data.dataset_loader import ArrayDataset
+from nn_sim.net.feedfoward import FeedFowardNeuralNetwork
+from nn_sim.net.gradient_check import GRADIENT_SCALES, LOSSES, create_problem
+from nn_sim.net.layers import Sigmoid, SSELoss, Tanh
+from nn_sim.net.optimizers import (
+    SGD,
+    SGDMomentum,
+    Nesterov,
+    RMSprop,
+    Adagrad,
+    Adam,
+    AdamW,
+    LBFGS,
+)
+from nn_sim.net.population import create_population, fit_population
+from nn_sim.net.train import fit, full_batch_loss
+
+OPTIMIZERS = {
+    "SGD": lambda net: SGD(net, 0.5),
+    "SGDMomentum": lambda net: SGDMomentum(net, 0.5, 0.9),
+    "Nesterov": lambda net: Nesterov(net, 0.5, 0.9),
+    "RMSprop": lambda net: RMSprop(net, 0.01),
+    "Adagrad": lambda net: Adagrad(net, 0.1),
+    "Adam": lambda net: Adam(net, 0.01),
+    "AdamW": lambda net: AdamW(net, 0.01),
+    "LBFGS": lambda net: LBFGS(net, 1.0),
+}
+
+
+XOR = ArrayDataset(
+    np.array([[0, 0], [0, 1], [1, 0], [1, 1]], dtype=np.float64),
+    np.array([[0], [1], [1], [0]], dtype=np.float64),
+)
+
+
+def create_net(seed: int = 0) -> FeedFowardNeuralNetwork:
+    np.random.seed(seed)
+    return FeedFowardNeuralNetwork(2, [(4, True, Tanh()), (1, True, Sigmoid())])
+
+
+@pytest.fixture
+def train(quiet):
+    def train(net, optimizer, epochs: int) -> list[float]:
+        return quiet(fit, net, XOR, SSELoss(), optimizer, epochs)
+
+    return train
+
+
+@pytest.mark.parametrize("name", list(OPTIMIZERS))
+def test_optimizer_decreases_the_loss(train, name):
+    net = create_net()
+    losses = train(net, OPTIMIZERS[name](net), 200)
+    assert losses[-1] < 0.5 * losses[0]
+
+
+@pytest.mark.parametrize("name", [name for name in OPTIMIZERS if name != "LBFGS"])
+def test_state_dict_resumes_the_same_steps(train, name):
+    net = create_net()
+    optimizer = OPTIMIZERS[name](net)
+    train(net, optimizer, 20)
+    resumed_net = create_net()
+    for layer, resumed in zip(net.layers, resumed_net.layers):
+        resumed.weights = layer.weights.copy()
+        resumed.bias = layer.bias.copy()
+    resumed_optimizer = OPTIMIZERS[name](resumed_net)
+    resumed_optimizer.load_state_dict(optimizer.state_dict())
+    assert not any(key.startswith("_") for key in optimizer.state_dict()["state"][0])
+
+    np.testing.assert_array_equal(
+        train(net, optimizer, 10), train(resumed_net, resumed_optimizer, 10)
+    )
+
+
+def test_lbfgs_line_search_never_increases_the_loss(train):
+    net = create_net()
+    losses = train(net, LBFGS(net, 1.0), 50)
+    assert np.all(np.diff(losses) <= 1e-12)
+    assert losses[-1] < 1e-3
+
+
+@pytest.mark.parametrize("loss_class", LOSSES, ids=lambda cls: cls.__name__)
+def test_gradient_scale_matches_gradient_check(loss_class):
+    assert loss_class().gradient_scale(8, 3) == pytest.approx(
+        GRADIENT_SCALES[loss_class](8, 3)
+    )
+
+
+@pytest.mark.parametrize("loss_class", LOSSES, ids=lambda cls: cls.__name__)
+def test_closure_slope_matches_backward(loss_class):
+    # the Armijo test compares the closure loss with grad . direction
+    net, X, Y, loss_func = create_problem("Tanh", loss_class)
+    closure = partial(full_batch_loss, net, ArrayDataset(X, Y), loss_func)
+
+    net.zero_gradients()
+    net.backward(net(X), Y, loss_func)
+    rng = np.random.default_rng(0)
+    directions = [rng.normal(size=layer.weights.shape) for layer in net.layers]
+    slope = sum(
+        float(np.sum(layer.grad_weights * direction))
+        for layer, direction in zip(net.layers, directions)
+    )
+
+    h = 1e-6
+    losses = list()
+    for sign in (1, -1):
+        for layer, direction in zip(net.layers, directions):
+            layer.weights += sign * h * direction
+        losses.append(closure())
+        for layer, direction in zip(net.layers, directions):
+            layer.weights -= sign * h * direction
+    assert (losses[0] - losses[1]) / (2 * h) == pytest.approx(slope, rel=1e-5)
+
+
+def test_population_rejects_lbfgs():
+    population = create_population(2, [(3, True, Tanh()), (1, True, Sigmoid())], 3)
+    with pytest.raises(ValueError):
+        fit_population(population, XOR, SSELoss(), LBFGS(population), 3)
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from nn_sim.net.feedfoward import FeedFowardNeuralNetwork
+from nn_sim.net.layers import SSELoss, Sigmoid, Tanh
+from nn_sim.net.optimizers import LBFGS, Adam
+from nn_sim.net.parallel import fit_data_parallel, fit_hogwild
+from nn_sim.net.train import fit, train_net
+
+
+def create_net() -> FeedFowardNeuralNetwork:
+    np.random.seed(0)
+    return FeedFowardNeuralNetwork(3, [(4, True, Tanh()), (2, True, Sigmoid())])
+
+
+@pytest.fixture
+def dataset(make_dataset):
+    return make_dataset(30)
+
+
+@pytest.fixture
+def train(dataset, quiet):
+    def train(train_func, batch_size, accumulate_steps=1, **kwargs):
+        net = create_net()
+        losses = quiet(
+            train_func,
+            net,
+            dataset,
+            SSELoss(),
+            Adam(net, 0.01),
+            8,
+            batch_size,
+            accumulate_steps=accumulate_steps,
+            **kwargs,
+        )
+        return net, losses
+
+    return train
+
+
+@pytest.mark.parametrize(
+    "batch_size,accumulate_steps", [(None, 1), (8, 1), (7, 2)], ids=str
+)
+def test_data_parallel_matches_fit(train, batch_size, accumulate_steps):
+    net, expected = train(fit, batch_size, accumulate_steps)
+    parallel_net, losses = train(
+        fit_data_parallel, batch_size, accumulate_steps, n_workers=2
+    )
+
+    np.testing.assert_allclose(losses, expected, rtol=1e-10)
+    for layer, expected_layer in zip(parallel_net.layers, net.layers):
+        np.testing.assert_allclose(layer.weights, expected_layer.weights)
+        np.testing.assert_allclose(layer.bias, expected_layer.bias)
+
+
+def test_data_parallel_rejects_lbfgs(dataset):
+    # without the closure the line search would take fixed steps
+    net = create_net()
+    with pytest.raises(ValueError):
+        fit_data_parallel(net, dataset, SSELoss(), LBFGS(net, 1.0), 2, n_workers=2)
+
+
+def test_hogwild_decreases_the_loss(dataset, quiet):
+    # the updates are asynchronous, only the convergence can be checked
+    losses = quiet(
+        fit_hogwild, create_net(), dataset, SSELoss(), 0.05, 20, 5, n_workers=2, seed=0
+    )
+    assert len(losses) == 20
+    assert losses[-1] < losses[0]
+
+
+def test_train_net_hogwild_builds_no_optimizer(dataset, quiet, monkeypatch):
+    def create_optimizer(net, train_params):
+        raise AssertionError("the Hogwild workers run their own SGD")
+
+    monkeypatch.setattr("nn_sim.net.train.create_optimizer", create_optimizer)
+    train_params = dict(
+        epochs=3,
+        batch_mode="Mini Batch",
+        batch_size=5,
+        learning_rate=0.05,
+        optim="SGD",
+        n_workers=2,
+        hogwild=True,
+    )
+    losses = quiet(train_net, create_net(), dataset, train_params, SSELoss())
+    assert len(losses) == 3
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from nn_sim.net.feedfoward import FeedFowardNeuralNetwork
+from nn_sim.net.layers import (
+    CategoricalCrossEntropyLoss,
+    SSELoss,
+    Sigmoid,
+    Softmax,
+    Tanh,
+)
+from nn_sim.net.optimizers import SGD, Adam
+from nn_sim.net.population import create_population, fit_population
+from nn_sim.net.train import fit
+
+SEEDS = [1, 2, 3]
+LEARNING_RATES = [0.01, 0.02, 0.05]
+
+
+@pytest.mark.parametrize("batch_size", [None, 8])
+@pytest.mark.parametrize(
+    "output,loss_class", [(Sigmoid, SSELoss), (Softmax, CategoricalCrossEntropyLoss)]
+)
+def test_population_matches_separate_training(
+    make_dataset, quiet, batch_size, output, loss_class
+):
+    dataset = make_dataset(one_hot=True)
+    layers = [(4, True, Tanh()), (2, True, output())]
+    population = create_population(3, layers, len(SEEDS), SEEDS)
+    optimizer = Adam(population, np.array(LEARNING_RATES).reshape(-1, 1, 1))
+    np.random.seed(0)  # samples order of the mini batches
+    losses = quiet(
+        fit_population, population, dataset, loss_class(), optimizer, 20, batch_size
+    )
+    assert losses.shape == (20, len(SEEDS))
+
+    for k, (seed, learning_rate) in enumerate(zip(SEEDS, LEARNING_RATES)):
+        np.random.seed(seed)
+        net = FeedFowardNeuralNetwork(3, layers)
+        np.random.seed(0)
+        expected = quiet(
+            fit, net, dataset, loss_class(), Adam(net, learning_rate), 20, batch_size
+        )
+        np.testing.assert_allclose(losses[:, k], expected, rtol=1e-10)
+
+        trained = population.to_networks()[k]
+        for layer, expected_layer in zip(trained.layers, net.layers):
+            np.testing.assert_allclose(layer.weights, expected_layer.weights)
+            np.testing.assert_allclose(layer.bias, expected_layer.bias)
+        np.testing.assert_allclose(
+            population.predict(dataset.X)[k], net.predict(dataset.X)
+        )
+
+
+def test_population_members_are_independent(make_dataset, quiet):
+    # a member with a learning rate of 0 keeps its initial weights
+    layers = [(4, True, Tanh()), (1, True, Sigmoid())]
+    population = create_population(3, layers, 2, SEEDS[:2])
+    initial = population.to_networks()
+    optimizer = SGD(population, np.array([0.0, 0.1]).reshape(-1, 1, 1))
+    quiet(
+        fit_population, population, make_dataset(n_outputs=1), SSELoss(), optimizer, 5
+    )
+
+    trained = population.to_networks()
+    for layer, initial_layer in zip(trained[0].layers, initial[0].layers):
+        np.testing.assert_array_equal(layer.weights, initial_layer.weights)
+    assert not np.array_equal(
+        trained[1].layers[0].weights, initial[1].layers[0].weights
+    )
@@ -0,0 +1,95 @@
+import math
+
+import numpy as np
+import pytest
+
+from nn_sim.net.feedfoward import FeedFowardNeuralNetwork
+from nn_sim.net.layers import Sigmoid
+from nn_sim.net.optimizers import SGD
+from nn_sim.net.schedulers import (
+    SCHEDULERS,
+    CosineAnnealingLR,
+    ExponentialLR,
+    LRScheduler,
+    OneCycleLR,
+    ReduceLROnPlateau,
+    StepLR,
+    create_scheduler,
+)
+
+
+def create_optimizer(learning_rate: float = 1.0) -> SGD:
+    np.random.seed(0)
+    return SGD(FeedFowardNeuralNetwork(2, [(1, True, Sigmoid())]), learning_rate)
+
+
+def rates(scheduler: LRScheduler, n_steps: int) -> list[float]:
+    return [scheduler(step) for step in range(n_steps)]
+
+
+def test_linear_warmup_then_base_rate():
+    scheduler = LRScheduler(create_optimizer(), warmup_steps=4)
+    assert rates(scheduler, 6) == pytest.approx([0.25, 0.5, 0.75, 1.0, 1.0, 1.0])
+
+
+def test_step_decay_after_the_warmup():
+    scheduler = StepLR(create_optimizer(), step_size=2, gamma=0.5, warmup_steps=1)
+    assert rates(scheduler, 6) == pytest.approx([1.0, 1.0, 1.0, 0.5, 0.5, 0.25])
+
+
+def test_exponential_decay_per_period():
+    scheduler = ExponentialLR(create_optimizer(), gamma=0.5, period=2)
+    assert rates(scheduler, 5) == pytest.approx([1.0, 0.5**0.5, 0.5, 0.5**1.5, 0.25])
+
+
+def test_cosine_reaches_the_minimum():
+    scheduler = CosineAnnealingLR(create_optimizer(), total_steps=10, min_lr=0.1)
+    values = rates(scheduler, 12)
+    assert values[0] == pytest.approx(1.0)
+    assert values[5] == pytest.approx(0.55)
+    assert values[10:] == pytest.approx([0.1, 0.1])
+    assert np.all(np.diff(values) <= 0)
+
+
+def test_one_cycle_rises_then_anneals():
+    scheduler = OneCycleLR(create_optimizer(), total_steps=10, pct_start=0.3)
+    values = rates(scheduler, 11)
+    assert values[0] == pytest.approx(1.0 / 25)
+    assert max(values) == pytest.approx(1.0)
+    assert int(np.argmax(values)) == 3
+    assert values[-1] == pytest.approx(1.0 / 25 / 1e4)
+
+
+def test_reduce_on_plateau_after_patience():
+    scheduler = ReduceLROnPlateau(create_optimizer(), factor=0.5, patience=2)
+    losses = [1.0, 0.5, 0.5, 0.5, 0.5, math.nan, 0.1]
+    for epoch, loss in enumerate(losses):
+        scheduler.on_epoch_end(None, epoch, loss)
+    assert scheduler(0) == pytest.approx(0.5)
+    assert scheduler.best_loss == pytest.approx(0.1)
+
+
+def test_optimizer_steps_follow_the_schedule():
+    # resuming from the optimizer step count continues the schedule
+    optimizer = create_optimizer()
+    StepLR(optimizer, step_size=2, gamma=0.5)
+    applied = list()
+    for _ in range(3):
+        optimizer.step()
+        applied.append(optimizer.learning_rate)
+
+    resumed = create_optimizer()
+    resumed.load_state_dict(optimizer.state_dict())
+    StepLR(resumed, step_size=2, gamma=0.5)
+    for _ in range(2):
+        resumed.step()
+        applied.append(resumed.learning_rate)
+    assert applied == pytest.approx([1.0, 1.0, 0.5, 0.5, 0.25])
+
+
+@pytest.mark.parametrize("name", SCHEDULERS)
+def test_create_scheduler(name):
+    train_params = dict(lr_scheduler=name, epochs=10, lr_warmup_epochs=1)
+    scheduler = create_scheduler(create_optimizer(0.1), train_params, 4)
+    assert scheduler is not None
+    assert scheduler(0) <= 0.1
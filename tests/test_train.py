@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from nn_sim.net.callbacks import TrainCallback
+from nn_sim.net.feedfoward import FeedFowardNeuralNetwork
+from nn_sim.net.layers import Sigmoid, SSELoss, Tanh
+from nn_sim.net.optimizers import SGD
+from nn_sim.net.telemetry import gradients_snapshot
+from nn_sim.net.train import fit
+
+
+class GradientsCallback(TrainCallback):
+    def __init__(self) -> None:
+        self.gradients = list()
+
+    def on_epoch_end(self, net, epoch, train_loss) -> bool:
+        self.gradients.append(gradients_snapshot(net))
+        return False
+
+
+@pytest.fixture
+def train_gradients(make_dataset, quiet):
+    def train_gradients(batch_size, accumulate_steps=1) -> list:
+        np.random.seed(0)
+        net = FeedFowardNeuralNetwork(3, [(4, True, Tanh()), (2, True, Sigmoid())])
+        callback = GradientsCallback()
+        quiet(
+            fit,
+            net,
+            make_dataset(12),
+            SSELoss(),
+            SGD(net, 0.0),
+            3,
+            batch_size,
+            [callback],
+            accumulate_steps=accumulate_steps,
+        )
+        return callback.gradients
+
+    return train_gradients
+
+
+@pytest.mark.parametrize("batch_size,accumulate_steps", [(4, 1), (4, 2), (5, 1)])
+def test_callbacks_see_the_gradients_of_the_last_step(
+    train_gradients, batch_size, accumulate_steps
+):
+    for epoch_gradients in train_gradients(batch_size, accumulate_steps):
+        assert all(np.any(grads > 0) for grads in epoch_gradients)
+
+
+def test_one_batch_step_gradients_equal_the_full_batch_ones(train_gradients):
+    # with a learning rate of 0 every epoch has the same gradients
+    full_batch = train_gradients(None)[-1]
+    one_batch = train_gradients(12)[-1]
+    for expected, actual in zip(full_batch, one_batch):
+        np.testing.assert_allclose(actual, expected, rtol=1e-12)